@@ -1,41 +1,107 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Literal, Optional, Union
+from datetime import datetime
 from app.core.database import get_db
+from app.core.tenancy import current_tenant
 from app.api.deps import get_current_admin
+from app.api.etag import user_etag, is_not_modified, set_etag_headers, not_modified_response
+from app.api.fields import parse_fields
 from app.repositories.user_repository import UserRepository
 from app.repositories.auth_log_repository import AuthLogRepository
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
-from app.schemas.auth import AuthLogResponse, AuthLogListResponse
+from app.repositories.purge_job_repository import PurgeJobRepository
+from app.services.purge_worker import purge_worker
+from app.services.auth_log_stream import auth_log_stream
+from app.services.directory_source import create_directory_source
+from app.services.directory_sync import DirectorySyncService
+from app.repositories.counting import CountMode
+from app.schemas.user import (
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserListResponse,
+    UserPartialResponse,
+    UserPartialListResponse,
+    UserBulkUpdate,
+    UserBulkDelete,
+    BulkOperationResponse,
+    PurgeJobResponse,
+    DirectorySyncResponse,
+)
+from app.schemas.auth import (
+    AuthLogResponse,
+    AuthLogListResponse,
+    AuthLogPartialResponse,
+    AuthLogPartialListResponse,
+)
+from app.models.principal import Principal
 from app.models.user import User
 
 router = APIRouter(prefix="/admin", tags=["管理者機能"])
 
 
-@router.get("/users", response_model=UserListResponse)
+@router.get(
+    "/users",
+    # fields 指定時は指定した項目のみを返す（未指定の項目はキーごと省略）
+    response_model=Union[UserListResponse, UserPartialListResponse],
+    response_model_exclude_unset=True,
+)
 async def get_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_admin),
+    include_total: bool = True,
+    role: Optional[int] = None,
+    class_name: Optional[str] = None,
+    last_login_before: Optional[datetime] = None,
+    never_logged_in: Optional[bool] = None,
+    sort: Literal["id", "email", "created_at", "last_login_at", "login_count"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
     ユーザー一覧を取得（管理者のみ）
+
+    Parameters:
+    - include_total: falseの場合、総数の集計を省略（totalはnull）
+    - role / class_name: ロール・クラスで絞り込み
+    - last_login_before: 指定日時より前から未ログインのユーザー（未ログイン者を含む）
+    - never_logged_in: true=一度もログインしていない / false=ログイン実績あり
+    - sort / order: 並び替え（例: sort=last_login_at&order=asc）
+    - fields: 返す項目をカンマ区切りで指定（例: fields=email,class_name、idは常に含む）
     """
+    selected = parse_fields(fields, UserResponse)
     user_repo = UserRepository(db)
-    users = await user_repo.get_all(skip=skip, limit=limit)
-    total = await user_repo.count()
+    page = await user_repo.get_page(
+        skip=skip,
+        limit=limit,
+        include_total=include_total,
+        role=role,
+        class_name=class_name,
+        last_login_before=last_login_before,
+        never_logged_in=never_logged_in,
+        sort=sort,
+        descending=order == "desc",
+        fields=selected,
+    )
 
+    if selected:
+        return UserPartialListResponse(
+            users=[UserPartialResponse(**row) for row in page.items],
+            total=page.total,
+        )
     return UserListResponse(
-        users=[UserResponse.model_validate(user) for user in users],
-        total=total,
+        users=[UserResponse.model_validate(user) for user in page.items],
+        total=page.total,
     )
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_user(
     user_data: UserCreate,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -52,12 +118,16 @@ async def create_user(
     """
     user_repo = UserRepository(db)
 
-    # メールアドレス重複チェック
-    existing_user = await user_repo.get_by_email(user_data.email)
+    # メールアドレス重複チェック（削除処理中のユーザーを含む）
+    existing_user = await user_repo.get_by_email(user_data.email, include_deleted=True)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="このメールアドレスは既に登録されています",
+            detail=(
+                "このメールアドレスのユーザーは削除処理中です"
+                if existing_user.deleted_at
+                else "このメールアドレスは既に登録されています"
+            ),
         )
 
     # ユーザー作成
@@ -73,14 +143,107 @@ async def create_user(
     return UserResponse.model_validate(created_user)
 
 
+@router.post("/users/bulk-update", response_model=BulkOperationResponse)
+async def bulk_update_users(
+    bulk_data: UserBulkUpdate,
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    ユーザーを一括更新（管理者のみ）
+
+    進級・クラス替え用。targetで対象（user_ids / role / class_name）を指定し、
+    role・class_nameを一括で変更します。
+
+    注意: ロール変更時、実行した管理者本人は対象から除外されます
+    """
+    values = {}
+    if bulk_data.role is not None:
+        values["role"] = bulk_data.role
+    if bulk_data.class_name is not None:
+        values["class_name"] = bulk_data.class_name
+
+    user_repo = UserRepository(db)
+    affected = await user_repo.bulk_update(
+        values,
+        user_ids=bulk_data.target.user_ids,
+        role=bulk_data.target.role,
+        class_name=bulk_data.target.class_name,
+        exclude_ids=[current_user.id] if "role" in values else (),
+    )
+    return BulkOperationResponse(affected=affected)
+
+
+@router.post("/users/bulk-delete", response_model=BulkOperationResponse)
+async def bulk_delete_users(
+    bulk_data: UserBulkDelete,
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    ユーザーを一括削除（管理者のみ）
+
+    卒業生の削除用。実行した管理者本人は対象から除外されます。
+    対象ユーザーは即時に論理削除され、認証ログの匿名化と物理削除は
+    ユーザーごとの削除ジョブとしてバックグラウンドで行われます。
+    """
+    user_repo = UserRepository(db)
+    affected = await user_repo.bulk_delete(
+        user_ids=bulk_data.target.user_ids,
+        role=bulk_data.target.role,
+        class_name=bulk_data.target.class_name,
+        exclude_ids=[current_user.id],
+        requested_by=current_user.id,
+    )
+    purge_worker.wake()
+    return BulkOperationResponse(affected=affected)
+
+
+@router.post("/directory-sync", response_model=DirectorySyncResponse)
+async def sync_directory(
+    full: bool = False,
+    dry_run: bool = False,
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    名簿（外部ディレクトリ）と同期（管理者のみ）
+
+    前回の同期以降の変更のみを取り込みます。
+    - full: trueの場合、前回の同期状態を使わず全件を取り込む
+    - dry_run: trueの場合、反映せずに差分のみを返す
+
+    実行した管理者本人は削除対象から除外されます。
+    """
+    tenant = current_tenant()
+    if not tenant.directory_source:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="名簿の同期元が設定されていません",
+        )
+    report = await DirectorySyncService(db).sync(
+        create_directory_source(tenant.directory_source),
+        full=full,
+        dry_run=dry_run,
+        requested_by=current_user.id,
+    )
+    if report.deleted and not dry_run:
+        purge_worker.wake()
+    return DirectorySyncResponse.model_validate(report)
+
+
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: str,
-    current_user: User = Depends(get_current_admin),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
     ユーザー詳細を取得（管理者のみ）
+
+    ETagを返し、If-None-Matchが一致する場合は304を返します。
     """
     user_repo = UserRepository(db)
     user = await user_repo.get_by_id(user_id)
@@ -91,6 +254,11 @@ async def get_user(
             detail="ユーザーが見つかりません",
         )
 
+    etag = user_etag(user.id, user.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    set_etag_headers(response, etag)
     return UserResponse.model_validate(user)
 
 
@@ -98,7 +266,7 @@ async def get_user(
 async def update_user(
     user_id: str,
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -115,9 +283,9 @@ async def update_user(
             detail="ユーザーが見つかりません",
         )
 
-    # メールアドレス変更時の重複チェック
+    # メールアドレス変更時の重複チェック（削除処理中のユーザーを含む）
     if user_data.email and user_data.email != user.email:
-        existing_user = await user_repo.get_by_email(user_data.email)
+        existing_user = await user_repo.get_by_email(user_data.email, include_deleted=True)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -139,14 +307,22 @@ async def update_user(
     return UserResponse.model_validate(updated_user)
 
 
-@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/users/{user_id}",
+    response_model=PurgeJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def delete_user(
     user_id: str,
-    current_user: User = Depends(get_current_admin),
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
     ユーザーを削除（管理者のみ）
+
+    ユーザーは即時に論理削除され（以降ログイン・参照不可）、
+    認証ログの匿名化とユーザーの物理削除はバックグラウンドの削除ジョブで行われます。
+    進捗は GET /admin/purge-jobs/{job_id} で確認できます。
     """
     user_repo = UserRepository(db)
     user = await user_repo.get_by_id(user_id)
@@ -164,16 +340,49 @@ async def delete_user(
             detail="自分自身を削除することはできません",
         )
 
-    await user_repo.delete(user)
-    return None
+    job = await user_repo.delete(user, requested_by=current_user.id)
+    if job is None:
+        # 同時に実行された別の削除が先に処理した
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ユーザーが見つかりません",
+        )
+    purge_worker.wake()
+    return PurgeJobResponse.model_validate(job)
 
 
-@router.get("/auth-logs", response_model=AuthLogListResponse)
+@router.get("/purge-jobs/{job_id}", response_model=PurgeJobResponse)
+async def get_purge_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    ユーザー削除ジョブの状態を取得（管理者のみ）
+    """
+    job = await PurgeJobRepository(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="削除ジョブが見つかりません",
+        )
+    return PurgeJobResponse.model_validate(job)
+
+
+@router.get(
+    "/auth-logs",
+    # fields 指定時は指定した項目のみを返す（未指定の項目はキーごと省略）
+    response_model=Union[AuthLogListResponse, AuthLogPartialListResponse],
+    response_model_exclude_unset=True,
+)
 async def get_auth_logs(
     skip: int = 0,
     limit: int = 100,
     event_type: Optional[str] = None,
-    current_user: User = Depends(get_current_admin),
+    include_total: bool = True,
+    count_mode: CountMode = CountMode.EXACT,
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -183,12 +392,62 @@ async def get_auth_logs(
     - skip: スキップする件数（ページネーション用）
     - limit: 取得する件数（最大100件）
     - event_type: イベントタイプでフィルタ（オプション）
+    - include_total: falseの場合、総数の集計を省略（totalはnull）
+    - count_mode: 総数の取得方法（exact / cached / approximate）
+      totalが正確な値かどうかは total_is_exact で返します
+    - fields: 返す項目をカンマ区切りで指定（例: fields=timestamp,event_type、idは常に含む）
+      user_agent を含めない場合はUser-Agent辞書を結合しません
     """
+    selected = parse_fields(fields, AuthLogResponse)
     auth_log_repo = AuthLogRepository(db)
-    logs = await auth_log_repo.get_all(skip=skip, limit=limit, event_type=event_type)
-    total = await auth_log_repo.count(event_type=event_type)
+    use_window_total = include_total and count_mode is CountMode.EXACT
+    page = await auth_log_repo.get_page(
+        skip=skip,
+        limit=limit,
+        event_type=event_type,
+        include_total=use_window_total,
+        fields=selected,
+    )
+
+    total, total_is_exact = page.total, (True if use_window_total else None)
+    if include_total and not use_window_total:
+        count = await auth_log_repo.count_by_mode(count_mode, event_type=event_type)
+        total, total_is_exact = count.value, count.exact
 
+    if selected:
+        return AuthLogPartialListResponse(
+            logs=[AuthLogPartialResponse(**row) for row in page.items],
+            total=total,
+            total_is_exact=total_is_exact,
+        )
     return AuthLogListResponse(
-        logs=[AuthLogResponse.model_validate(log) for log in logs],
+        logs=[AuthLogResponse.model_validate(log) for log in page.items],
         total=total,
+        total_is_exact=total_is_exact,
+    )
+
+
+@router.get("/auth-logs/stream")
+async def stream_auth_logs(
+    event_type: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_current_admin),
+):
+    """
+    認証ログをServer-Sent Eventsでライブ配信（管理者のみ）
+
+    Parameters:
+    - event_type: イベントタイプでフィルタ（オプション）
+    - Last-Event-ID ヘッダー: 再接続時、このID以降のログをDBから送ってから配信を再開
+
+    イベント名は auth_log（data は認証ログ一覧の各要素と同じ形）。
+    取りこぼしが多すぎる場合は reset イベントを送るため、一覧を再取得してください。
+    接続中はDB接続を保持しません。
+    """
+    return StreamingResponse(
+        auth_log_stream.stream(
+            current_tenant(), current_user.id, event_type=event_type, last_event_id=last_event_id
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,12 +1,25 @@
+import hmac
+from typing import Optional
+from urllib.parse import urlparse
 from fastapi import APIRouter, Depends, Request, Response, HTTPException, status
 from fastapi.responses import RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.oauth_state import (
+    OAUTH_STATE_COOKIE,
+    decode_oauth_state,
+    encode_oauth_state,
+    new_oauth_state,
+    safe_return_path,
+)
+from app.core.security import generate_pkce_verifier
+from app.core.tenancy import current_tenant
 from app.services.auth_service import AuthService
 from app.api.deps import get_current_user
+from app.api.etag import user_etag, is_not_modified, set_etag_headers, not_modified_response
 from app.schemas.auth import GoogleAuthURLResponse, LoginResponse
-from app.models.user import User
+from app.models.principal import Principal
 
 router = APIRouter(prefix="/auth", tags=["認証"])
 
@@ -18,6 +31,12 @@ def _get_client_info(request: Request) -> tuple[str, str]:
     return ip_address, user_agent
 
 
+def _cookie_domain() -> str | None:
+    """現在のテナントのCookieドメイン（localhostの場合は指定しない）"""
+    domain = current_tenant().cookie_domain
+    return domain if domain != "localhost" else None
+
+
 def _set_access_token_cookie(response: Response, access_token: str) -> None:
     """アクセストークンをCookieにセット"""
     response.set_cookie(
@@ -27,7 +46,7 @@ def _set_access_token_cookie(response: Response, access_token: str) -> None:
         secure=settings.COOKIE_SECURE,
         samesite=settings.COOKIE_SAMESITE,
         max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        domain=settings.COOKIE_DOMAIN if settings.COOKIE_DOMAIN != "localhost" else None,
+        domain=_cookie_domain(),
     )
 
 
@@ -35,19 +54,63 @@ def _clear_access_token_cookie(response: Response) -> None:
     """アクセストークンCookieをクリア"""
     response.delete_cookie(
         key="access_token",
-        domain=settings.COOKIE_DOMAIN if settings.COOKIE_DOMAIN != "localhost" else None,
+        domain=_cookie_domain(),
+    )
+
+
+def _oauth_state_cookie_path() -> str:
+    """state Cookieの送信先（現在のテナントのコールバックURLのパス）"""
+    return urlparse(current_tenant().google_redirect_uri).path or "/"
+
+
+def _set_oauth_state_cookie(response: Response, value: str) -> None:
+    """ログイン試行の状態をCookieにセット
+
+    Googleからのリダイレクト（別サイトからの遷移）でも送られるよう SameSite=Lax 固定。
+    コールバックでは削除せず期限切れまで残す。再読み込みや二重リダイレクトでも同じ結果を返せるよう
+    にするためで、認可コードはGoogleが2回目以降を拒否するため実質1回限りとなる。
+    """
+    response.set_cookie(
+        key=OAUTH_STATE_COOKIE,
+        value=value,
+        httponly=True,
+        secure=settings.COOKIE_SECURE,
+        samesite="lax",
+        max_age=settings.OAUTH_STATE_TTL_SECONDS,
+        path=_oauth_state_cookie_path(),
+        domain=_cookie_domain(),
     )
 
 
 @router.get("/google/login", response_model=GoogleAuthURLResponse)
-async def google_login(db: AsyncSession = Depends(get_db)):
+async def google_login(
+    response: Response,
+    return_to: Optional[str] = None,
+    redirect: bool = False,
+):
     """
     Google認証URLを取得
 
     フロントエンドはこのURLにユーザーをリダイレクトします。
+    state・PKCEのcode_verifier・ログイン後の遷移先は署名付きの短命Cookieで保持し、
+    サーバー側には保存しません（どのワーカーでもコールバックを処理できます）。
+
+    Parameters:
+    - return_to: ログイン後に遷移するフロントエンド内のパス（例: /admin/users）
+    - redirect: trueの場合、JSONではなくGoogleへ直接リダイレクト
     """
-    auth_service = AuthService(db)
-    auth_url = await auth_service.get_google_auth_url()
+    code_verifier = generate_pkce_verifier()
+    oauth_state = new_oauth_state(
+        current_tenant().id, code_verifier, return_to=safe_return_path(return_to)
+    )
+    auth_url = await AuthService.get_google_auth_url(oauth_state.state, code_verifier)
+    cookie_value = encode_oauth_state(oauth_state)
+
+    if redirect:
+        redirect_response = RedirectResponse(url=auth_url, status_code=status.HTTP_302_FOUND)
+        _set_oauth_state_cookie(redirect_response, cookie_value)
+        return redirect_response
+    _set_oauth_state_cookie(response, cookie_value)
     return GoogleAuthURLResponse(auth_url=auth_url)
 
 
@@ -55,38 +118,56 @@ async def google_login(db: AsyncSession = Depends(get_db)):
 async def google_callback(
     code: str,
     request: Request,
+    state: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Google認証コールバック
 
     Googleから認証コードを受け取り、ユーザー情報を取得してログイン処理を行います。
+    state がログイン開始時のCookieと一致しない場合は、Googleに問い合わせずに失敗とします。
     """
     ip_address, user_agent = _get_client_info(request)
     auth_service = AuthService(db)
+    tenant = current_tenant()
+    frontend_url = tenant.frontend_url
+    error_url = f"{frontend_url}/login?error=auth_failed"
+
+    oauth_state = decode_oauth_state(request.cookies.get(OAUTH_STATE_COOKIE))
+    if (
+        oauth_state is None
+        or not state
+        or oauth_state.tenant_id != tenant.id
+        or not hmac.compare_digest(oauth_state.state.encode(), state.encode())
+    ):
+        await auth_service.reject_invalid_state(ip_address=ip_address, user_agent=user_agent)
+        return RedirectResponse(url=error_url, status_code=status.HTTP_303_SEE_OTHER)
 
-    user, access_token, error_code = await auth_service.login_with_google(
+    result = await auth_service.login_with_google(
         code=code,
+        code_verifier=oauth_state.code_verifier,
         ip_address=ip_address,
         user_agent=user_agent,
     )
 
-    if error_code:
+    if result.error_code:
         # エラーページにリダイレクト
-        error_url = f"{settings.cors_origins_list[0]}/login?error=auth_failed"
         return RedirectResponse(url=error_url, status_code=status.HTTP_303_SEE_OTHER)
 
-    # ロールに応じたリダイレクト先を決定
+    # ログイン開始時の遷移先、なければロールに応じたリダイレクト先
     redirect_map = {
-        0: f"{settings.cors_origins_list[0]}/students",  # 生徒
-        1: f"{settings.cors_origins_list[0]}/teachers",  # 教員
-        2: f"{settings.cors_origins_list[0]}/admin",     # 管理者
+        0: f"{frontend_url}/students",  # 生徒
+        1: f"{frontend_url}/teachers",  # 教員
+        2: f"{frontend_url}/admin",     # 管理者
     }
-    redirect_url = redirect_map.get(user.role, settings.cors_origins_list[0])
+    if oauth_state.return_to:
+        redirect_url = f"{frontend_url}{oauth_state.return_to}"
+    else:
+        redirect_url = redirect_map.get(result.role, frontend_url)
 
     # RedirectResponseを作成してCookieを設定
     response = RedirectResponse(url=redirect_url, status_code=status.HTTP_303_SEE_OTHER)
-    _set_access_token_cookie(response, access_token)
+    _set_access_token_cookie(response, result.access_token)
 
     return response
 
@@ -95,7 +176,7 @@ async def google_callback(
 async def logout(
     request: Request,
     response: Response,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -119,10 +200,21 @@ async def logout(
 
 
 @router.get("/me")
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_user),
+):
     """
     現在のユーザー情報を取得
+
+    ETagを返し、If-None-Matchが一致する場合は304を返します。
     """
+    etag = user_etag(current_user.id, current_user.version)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    set_etag_headers(response, etag)
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -1,21 +1,26 @@
+import secrets
 from typing import Optional
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, Header, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import open_session
 from app.core.security import verify_access_token
-from app.repositories.user_repository import UserRepository
-from app.models.user import User
+from app.core.tenancy import DEFAULT_TENANT_ID, current_tenant
+from app.repositories.user_repository import UserRepository, get_cached_principal
+from app.models.principal import Principal
 
 security = HTTPBearer(auto_error=False)
 
 
 async def get_current_user(
     request: Request,
-    db: AsyncSession = Depends(get_db),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-) -> User:
-    """現在のユーザーを取得（Cookieまたはヘッダーから）"""
+) -> Principal:
+    """現在のユーザーを取得（Cookieまたはヘッダーから）
+
+    返り値は読み取り専用のPrincipal。キャッシュにない場合のみ、
+    必要な列だけを短いセッションで取得する（リクエスト用のセッションは確保しない）。
+    """
 
     # 1. Cookieからトークンを取得
     token = request.cookies.get("access_token")
@@ -38,23 +43,27 @@ async def get_current_user(
             detail="トークンが無効です",
         )
 
+    # 他テナント（学校）で発行されたトークンは受け付けない
+    # （tid のない旧形式のトークンは単一テナント運用時のみ有効）
     user_id = payload.get("user_id")
-    if not user_id:
+    if not user_id or payload.get("tid", DEFAULT_TENANT_ID) != current_tenant().id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="トークンが無効です",
         )
 
     # 4. ユーザー取得
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(user_id)
-    if not user:
+    principal = get_cached_principal(user_id)
+    if principal is None:
+        async with open_session() as session:
+            principal = await UserRepository(session).get_principal(user_id)
+    if not principal:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="ユーザーが見つかりません",
         )
 
-    return user
+    return principal
 
 
 def require_role(*allowed_roles: int):
@@ -66,7 +75,9 @@ def require_role(*allowed_roles: int):
         require_role(1, 2) -> 教員または管理者
         require_role(2) -> 管理者のみ
     """
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(
+        current_user: Principal = Depends(get_current_user),
+    ) -> Principal:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -81,3 +92,21 @@ def require_role(*allowed_roles: int):
 get_current_student = require_role(0)  # 生徒のみ
 get_current_teacher = require_role(1, 2)  # 教員または管理者
 get_current_admin = require_role(2)  # 管理者のみ
+
+
+async def require_internal_client(
+    x_internal_api_key: Optional[str] = Header(None),
+) -> None:
+    """内部サービス認証（X-Internal-Api-Key ヘッダー）"""
+    if not settings.INTERNAL_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not Found",
+        )
+    if not x_internal_api_key or not secrets.compare_digest(
+        x_internal_api_key, settings.INTERNAL_API_KEY
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="内部APIキーが無効です",
+        )
@@ -0,0 +1,38 @@
+import hashlib
+from fastapi import Request, Response, status
+
+
+def user_etag(user_id: str, version: int) -> str:
+    """ユーザーの弱いETagを生成（id と版数から算出、レスポンスのシリアライズは不要）"""
+    digest = hashlib.blake2b(f"{user_id}:{version}".encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    """弱い比較用にW/プレフィックスを除去"""
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match が現在のETagに一致するか（弱い比較）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == current for candidate in header.split(","))
+
+
+def set_etag_headers(response: Response, etag: str) -> None:
+    """ETagと再検証必須のCache-Controlをセット"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified_response(etag: str) -> Response:
+    """304 Not Modified レスポンス（ボディなし）"""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag_headers(response, etag)
+    return response
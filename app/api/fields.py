@@ -0,0 +1,23 @@
+from typing import Optional, Tuple, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """fields クエリ（例: fields=email,last_login_at）を検証してフィールド名のタプルに変換
+
+    id は常に含め、順序はレスポンススキーマの定義順に揃える。
+    未指定の場合は None（全項目）。スキーマにない名前は400。
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不明なフィールドです: {', '.join(sorted(unknown))}",
+        )
+    requested.add("id")
+    return tuple(name for name in model.model_fields if name in requested)
+
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.core.health import monitor
+
+router = APIRouter(tags=["ヘルスチェック"])
+
+
+@router.get("/health")
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness（プロセスが応答可能か）
+
+    依存先には問い合わせません。
+    """
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Readiness（トラフィックを受けられるか）
+
+    DB疎通・プール空き・Google OAuth到達性のバックグラウンドチェック結果を
+    依存先ごとのレイテンシ付きで返します。not ready の場合は503。
+    Google OAuthの失敗は報告のみで、判定には含めません。
+    外部呼び出しのサーキットブレーカー状態（circuit_breakers）も併せて返します。
+    """
+    snapshot = monitor.snapshot()
+    status_code = (
+        status.HTTP_200_OK if snapshot["status"] == "ready" else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    return JSONResponse(content=snapshot, status_code=status_code)
@@ -0,0 +1,75 @@
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.security import verify_access_token
+from app.core.tenancy import DEFAULT_TENANT_ID, get_tenant_registry, use_tenant
+from app.api.deps import require_internal_client
+from app.repositories.user_repository import UserRepository
+from app.schemas.auth import (
+    TokenIntrospectionRequest,
+    TokenIntrospectionResult,
+    TokenIntrospectionResponse,
+)
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["内部API"],
+    dependencies=[Depends(require_internal_client)],
+)
+
+
+@router.post("/introspect", response_model=TokenIntrospectionResponse)
+async def introspect_tokens(request_data: TokenIntrospectionRequest):
+    """
+    アクセストークンを一括検証（内部サービス向け）
+
+    署名・有効期限を検証し、対象ユーザーをテナント（tid）ごとに1回のクエリでまとめて取得します。
+    結果はリクエストのtokensと同じ順序で返します。
+    """
+    if len(request_data.tokens) > settings.INTROSPECT_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"一度に検証できるトークンは{settings.INTROSPECT_MAX_TOKENS}件までです",
+        )
+
+    # 重複トークンは1回だけ検証
+    payloads = {token: verify_access_token(token) for token in dict.fromkeys(request_data.tokens)}
+
+    # 存在しないテナントのトークンは無効として扱う
+    registry = get_tenant_registry()
+    user_ids_by_tenant = defaultdict(list)
+    for payload in payloads.values():
+        if payload and payload.get("user_id"):
+            tenant_id = payload.get("tid", DEFAULT_TENANT_ID)
+            if tenant_id in registry.tenants:
+                user_ids_by_tenant[tenant_id].append(payload["user_id"])
+
+    users = {}
+    for tenant_id, user_ids in user_ids_by_tenant.items():
+        with use_tenant(registry.tenants[tenant_id]):
+            async with open_session() as session:
+                found = await UserRepository(session).get_by_ids(user_ids)
+        users.update({(tenant_id, user_id): user for user_id, user in found.items()})
+
+    results = []
+    for token in request_data.tokens:
+        payload = payloads[token]
+        if not payload or not payload.get("user_id"):
+            results.append(TokenIntrospectionResult(active=False, error="invalid_token"))
+            continue
+        user = users.get((payload.get("tid", DEFAULT_TENANT_ID), payload["user_id"]))
+        if user is None:
+            results.append(TokenIntrospectionResult(active=False, error="user_not_found"))
+            continue
+        results.append(
+            TokenIntrospectionResult(
+                active=True,
+                user_id=user.id,
+                role=user.role,
+                exp=payload.get("exp"),
+                claims=payload,
+            )
+        )
+
+    return TokenIntrospectionResponse(results=results)
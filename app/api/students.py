@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
 from app.api.deps import get_current_student
-from app.models.user import User
+from app.models.principal import Principal
 
 router = APIRouter(prefix="/students", tags=["生徒機能"])
 
 
 @router.get("/dashboard")
-async def get_student_dashboard(current_user: User = Depends(get_current_student)):
+async def get_student_dashboard(current_user: Principal = Depends(get_current_student)):
     """
     生徒用ダッシュボード（サンプル）
 
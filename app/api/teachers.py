@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
 from app.api.deps import get_current_teacher
-from app.models.user import User
+from app.models.principal import Principal
 
 router = APIRouter(prefix="/teachers", tags=["教員機能"])
 
 
 @router.get("/dashboard")
-async def get_teacher_dashboard(current_user: User = Depends(get_current_teacher)):
+async def get_teacher_dashboard(current_user: Principal = Depends(get_current_teacher)):
     """
     教員用ダッシュボード（サンプル）
 
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.keys import get_keyring
+
+router = APIRouter(prefix="/.well-known", tags=["認証"])
+
+
+@router.get("/jwks.json")
+async def jwks():
+    """
+    JWT検証用の公開鍵（JWKS）
+
+    他サービスはこの鍵でアクセストークンをローカル検証できます。
+    HS256運用時は空のキーセットを返します。
+    """
+    return JSONResponse(
+        content=get_keyring().jwks(),
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"},
+    )
@@ -0,0 +1,234 @@
+"""管理コマンド
+
+使用例:
+    uv run hughigh serve
+    uv run python -m app.cli serve --workers 4
+    uv run hughigh sync-roster --dry-run
+"""
+import argparse
+import asyncio
+import importlib.util
+import math
+import os
+import sys
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from app.core.config import settings
+from app.core.tenancy import get_tenant_registry
+
+
+@dataclass(frozen=True)
+class ServePlan:
+    """本番起動時の構成（ワーカー数・プールサイズ等）"""
+
+    workers: int
+    tenants: int
+    loop: str
+    http: str
+    pool_size: int
+    max_overflow: int
+    cpu_count: int
+
+    @property
+    def connections_per_worker(self) -> int:
+        return (self.pool_size + self.max_overflow) * self.tenants
+
+    @property
+    def total_connections(self) -> int:
+        return self.workers * self.connections_per_worker
+
+
+def available_cpus() -> int:
+    """このプロセスが利用可能なCPU数（CPUアフィニティとcgroupのクォータを考慮）"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    # コンテナのCPU制限（cgroup v2）
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, count)
+
+
+def _pick_implementation(preferred: str, fallback: str) -> str:
+    """高速実装がインストールされていれば採用"""
+    return preferred if importlib.util.find_spec(preferred) else fallback
+
+
+def plan_serve(workers: Optional[int] = None) -> ServePlan:
+    """ワーカー数とワーカーごとのDBプールを決定
+
+    全ワーカー・全テナントの最大接続数（pool_size + max_overflow）の合計が
+    MySQLの接続上限から予約分を引いた値を超えないよう、プールごとの値を切り詰める。
+    テナントのDBは同一サーバー上にある前提で計算する。
+    """
+    cpus = available_cpus()
+    # 非同期ワーカーはCPUを1コアずつ使い切れるため、既定はCPU数と同数
+    workers = workers or settings.SERVER_WORKERS or cpus
+    tenants = len(get_tenant_registry().tenants)
+
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    per_pool = budget // (workers * tenants)
+    if per_pool < 1:
+        raise ValueError(
+            f"DB接続数が不足しています: 利用可能 {budget} 本に対して"
+            f"ワーカー {workers} 個 × テナント {tenants} 校"
+            "（SERVER_WORKERS を減らすか DB_MAX_CONNECTIONS を見直してください）"
+        )
+    pool_size = min(settings.DB_POOL_SIZE, per_pool)
+    max_overflow = min(settings.DB_MAX_OVERFLOW, per_pool - pool_size)
+
+    return ServePlan(
+        workers=workers,
+        tenants=tenants,
+        loop=_pick_implementation("uvloop", "asyncio"),
+        http=_pick_implementation("httptools", "h11"),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        cpu_count=cpus,
+    )
+
+
+def _print_summary(plan: ServePlan, host: str, port: int) -> None:
+    """起動構成を表示"""
+    budget = settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS
+    lines = [
+        "HugHigh Login Backend",
+        f"  bind            : http://{host}:{port}",
+        f"  workers         : {plan.workers} (cpus={plan.cpu_count})",
+        f"  event loop      : {plan.loop}",
+        f"  http parser     : {plan.http}",
+        f"  tenants         : {plan.tenants}",
+        f"  db pool/tenant  : pool_size={plan.pool_size} max_overflow={plan.max_overflow}"
+        " (per worker)",
+        f"  db connections  : max {plan.total_connections} / {budget}"
+        f" (DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}"
+        f" - reserved {settings.DB_RESERVED_CONNECTIONS})",
+        f"  max requests    : {settings.SERVER_MAX_REQUESTS or 'unlimited'} per worker",
+        f"  graceful timeout: {settings.SERVER_GRACEFUL_TIMEOUT_SECONDS}s",
+        f"  reload          : kill -HUP {os.getpid()}",
+    ]
+    if settings.DB_ECHO:
+        lines.append("  warning         : DB_ECHO=true (SQLログが出力されます)")
+    print("\n".join(lines), flush=True)
+
+
+def serve(args: argparse.Namespace) -> None:
+    """本番用のマルチプロセスサーバーを起動"""
+    import uvicorn
+
+    try:
+        plan = plan_serve(args.workers)
+    except ValueError as e:
+        sys.exit(str(e))
+
+    # ワーカーは環境変数から設定を読み直すため、決定したプールサイズを渡す
+    os.environ["DB_POOL_SIZE"] = str(plan.pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(plan.max_overflow)
+    os.environ["DB_POOL_WARMUP"] = str(min(settings.DB_POOL_WARMUP, plan.pool_size))
+
+    # main.py はパッケージ外のため、作業ディレクトリからインポートできるようにする
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    _print_summary(plan, args.host, args.port)
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=plan.workers,
+        loop=plan.loop,
+        http=plan.http,
+        limit_max_requests=settings.SERVER_MAX_REQUESTS or None,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+    )
+
+
+def _print_sync_report(tenant_id: str, report) -> None:
+    """名簿同期の結果を表示"""
+    mode = "full" if report.full else "delta"
+    if report.dry_run:
+        mode += ", dry run"
+    print(
+        f"[{tenant_id}] {report.source} ({mode})"
+        f" token {report.token_before} -> {report.token_after}:"
+        f" created={report.created} updated={report.updated} deleted={report.deleted}"
+        f" unchanged={report.unchanged} skipped={report.skipped}",
+        flush=True,
+    )
+    for change in report.changes:
+        detail = ",".join(change.fields) or change.reason or ""
+        print(f"  {change.action:<8} {change.email} {detail}".rstrip())
+
+
+def sync_roster(args: argparse.Namespace) -> None:
+    """名簿の差分同期（テナント指定なしの場合は同期元が設定された全テナント）"""
+    from app.core.database import dispose_engine
+    from app.services.directory_sync import sync_tenant
+
+    registry = get_tenant_registry()
+    if args.tenant:
+        if args.tenant not in registry.tenants:
+            sys.exit(f"テナント '{args.tenant}' が見つかりません")
+        tenants = [registry.tenants[args.tenant]]
+    else:
+        tenants = [t for t in registry.tenants.values() if t.directory_source]
+    if not tenants:
+        sys.exit("同期元（DIRECTORY_SOURCE）が設定されたテナントがありません")
+
+    async def run() -> bool:
+        ok = True
+        try:
+            for tenant in tenants:
+                try:
+                    report = await sync_tenant(tenant, full=args.full, dry_run=args.dry_run)
+                except Exception as e:
+                    print(f"[{tenant.id}] failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    ok = False
+                    continue
+                _print_sync_report(tenant.id, report)
+        finally:
+            await dispose_engine()
+        return ok
+
+    if not asyncio.run(run()):
+        sys.exit(1)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="hughigh", description="HugHigh Login Backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="本番用サーバーを起動")
+    serve_parser.add_argument("--host", default=settings.SERVER_HOST)
+    serve_parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="ワーカー数（省略時は SERVER_WORKERS またはCPU数）",
+    )
+    serve_parser.set_defaults(func=serve)
+
+    sync_parser = subparsers.add_parser("sync-roster", help="名簿（外部ディレクトリ）と差分同期")
+    sync_parser.add_argument("--tenant", default=None, help="対象テナントID（省略時は全テナント）")
+    sync_parser.add_argument(
+        "--full", action="store_true", help="前回の同期状態を使わず全件を取り込む"
+    )
+    sync_parser.add_argument("--dry-run", action="store_true", help="反映せずに差分のみ表示")
+    sync_parser.set_defaults(func=sync_roster)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
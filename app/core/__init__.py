@@ -1,19 +1,45 @@
-from app.core.config import settings
-from app.core.database import Base, get_db, engine
-from app.core.security import (
-    create_access_token,
-    verify_access_token,
-    generate_pkce_verifier,
-    generate_pkce_challenge,
-    create_google_oauth_client,
-    verify_google_id_token,
-)
+"""共通基盤
+
+サブモジュールは属性アクセス時に読み込む（`from app.core import settings` 等で
+OAuth・暗号ライブラリやDBエンジンまで読み込まれないようにする）。
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+# 再エクスポート名 -> 定義元モジュール
+_EXPORTS = {
+    "settings": "app.core.config",
+    "Base": "app.core.database",
+    "get_db": "app.core.database",
+    "get_engine": "app.core.database",
+    "current_tenant": "app.core.tenancy",
+    "create_access_token": "app.core.security",
+    "verify_access_token": "app.core.security",
+    "generate_pkce_verifier": "app.core.security",
+    "generate_pkce_challenge": "app.core.security",
+    "create_google_oauth_client": "app.core.security",
+    "verify_google_id_token": "app.core.security",
+}
+
+if TYPE_CHECKING:
+    from app.core.config import settings
+    from app.core.database import Base, get_db, get_engine
+    from app.core.tenancy import current_tenant
+    from app.core.security import (
+        create_access_token,
+        verify_access_token,
+        generate_pkce_verifier,
+        generate_pkce_challenge,
+        create_google_oauth_client,
+        verify_google_id_token,
+    )
 
 __all__ = [
     "settings",
     "Base",
     "get_db",
-    "engine",
+    "get_engine",
+    "current_tenant",
     "create_access_token",
     "verify_access_token",
     "generate_pkce_verifier",
@@ -21,3 +47,12 @@ __all__ = [
     "create_google_oauth_client",
     "verify_google_id_token",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
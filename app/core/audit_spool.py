@@ -0,0 +1,234 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".log"
+DEAD_LETTER_FILE = "dead-letter.jsonl"
+
+
+class SpoolSlot:
+    """スプールディレクトリ（1プロセスが排他ロックして使用する）
+
+    セグメントファイル（連番.log）と、送出済み位置を記録する offset ファイルを持つ。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock_fd: Optional[int] = None
+
+    def try_lock(self) -> bool:
+        """排他ロックを取得（他プロセスが使用中ならFalse）"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path / "lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def unlock(self) -> None:
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def segments(self) -> List[Path]:
+        return sorted(self.path.glob(f"*{SEGMENT_SUFFIX}"))
+
+    def next_segment_path(self) -> Path:
+        segments = self.segments()
+        seq = int(segments[-1].stem) + 1 if segments else 1
+        return self.path / f"{seq:020d}{SEGMENT_SUFFIX}"
+
+    def read_offset(self) -> Tuple[Optional[str], int]:
+        """送出済み位置（セグメント名, バイト位置）"""
+        try:
+            data = json.loads((self.path / "offset").read_text())
+            return data["segment"], data["position"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None, 0
+
+    def write_offset(self, segment: str, position: int) -> None:
+        """送出済み位置をアトミックに更新"""
+        tmp = self.path / "offset.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"segment": segment, "position": position}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path / "offset")
+
+    def read_batch(
+        self, max_events: int, active_segment: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str], int]:
+        """未送出のイベントを読み出す
+
+        Returns:
+            (イベント, 読み終えたセグメント名, 次の読み出し位置)
+        """
+        offset_segment, position = self.read_offset()
+        events: List[dict] = []
+        segment_name, next_position = offset_segment, position
+
+        for segment in self.segments():
+            if offset_segment and segment.name < offset_segment:
+                continue
+            start = position if segment.name == offset_segment else 0
+            segment_name, next_position = segment.name, start
+            with open(segment, "rb") as f:
+                f.seek(start)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # 書き込み途中（または異常終了で切れた）行
+                        if segment.name == active_segment:
+                            return events, segment_name, next_position
+                        logger.warning("skipping truncated spool record in %s", segment)
+                        next_position += len(line)
+                        break
+                    next_position += len(line)
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        logger.warning("skipping corrupt spool record in %s", segment)
+                    if len(events) >= max_events:
+                        return events, segment_name, next_position
+        return events, segment_name, next_position
+
+    def append_dead_letters(self, events: List[dict], reason: str) -> None:
+        """送出できないイベントを退避ファイルに追記（セグメントとは別に残し、手動で対処する）"""
+        with open(self.path / DEAD_LETTER_FILE, "a", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps({"reason": reason, "event": event}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove_segments_before(self, segment_name: str) -> None:
+        """送出済みのセグメントを削除"""
+        for segment in self.segments():
+            if segment.name < segment_name:
+                segment.unlink(missing_ok=True)
+
+    def has_pending(self, active_segment: Optional[str] = None) -> bool:
+        events, _, _ = self.read_batch(1, active_segment)
+        return bool(events)
+
+
+class AuditSpool:
+    """監査イベントの追記型ローカルスプール
+
+    append() は同じ書き込み間隔内のイベントをまとめて書き込み、1回のfsync後に
+    全員を完了させる（グループコミット）。DBが停止していてもログイン処理は
+    ローカルディスクの書き込み時間だけで完了する。
+    """
+
+    def __init__(self, directory: str, fsync_interval_ms: int, max_segment_bytes: int):
+        self.directory = Path(directory)
+        self.fsync_interval = fsync_interval_ms / 1000
+        self.max_segment_bytes = max_segment_bytes
+        self.slot: Optional[SpoolSlot] = None
+        self.segment: Optional[Path] = None
+        self._pending: List[Tuple[bytes, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._task is not None
+
+    def slots(self) -> List[SpoolSlot]:
+        """既存のスロット一覧"""
+        if not self.directory.exists():
+            return []
+        return [SpoolSlot(p) for p in sorted(self.directory.glob("slot-*")) if p.is_dir()]
+
+    def open(self) -> None:
+        """空いているスロットを確保して書き込みを開始"""
+        index = 0
+        while True:
+            slot = SpoolSlot(self.directory / f"slot-{index}")
+            if slot.try_lock():
+                break
+            index += 1
+        self.slot = slot
+        self.segment = slot.next_segment_path()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info("audit spool opened: %s", slot.path)
+
+    async def append(self, event: dict) -> None:
+        """イベントを追記（fsync完了まで待機）"""
+        line = (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((line, future))
+        self._wakeup.set()
+        await future
+
+    async def _flush_loop(self) -> None:
+        while not self._closing:
+            await self._wakeup.wait()
+            if not self._closing:
+                # 書き込み間隔の間に到着したイベントをまとめる
+                await asyncio.sleep(self.fsync_interval)
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        error: Optional[BaseException] = None
+        try:
+            await asyncio.to_thread(self._write_and_sync, b"".join(line for line, _ in batch))
+        except Exception as e:
+            error = e
+        except asyncio.CancelledError:
+            error = RuntimeError("audit spool flush was cancelled")
+            raise
+        finally:
+            # 中断された場合も待機中の呼び出し元を残さない
+            for _, future in batch:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+    def _write_and_sync(self, data: bytes) -> None:
+        with open(self.segment, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        if size >= self.max_segment_bytes:
+            self.segment = self.slot.next_segment_path()
+
+    async def close(self) -> None:
+        """書き込み中・未書き込みのイベントを書き出して停止"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await task
+        finally:
+            # 停止前に追加されたイベント（ループ終了後の到着分）を書き出す
+            await self._flush()
+
+
+audit_spool = AuditSpool(
+    directory=settings.AUDIT_SPOOL_DIR,
+    fsync_interval_ms=settings.AUDIT_SPOOL_FSYNC_INTERVAL_MS,
+    max_segment_bytes=settings.AUDIT_SPOOL_SEGMENT_BYTES,
+)
@@ -0,0 +1,72 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """件数上限付きLRUキャッシュ（プロセス内・asyncioの単一スレッド前提）"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """値を取得（ヒット時は最新として扱う）"""
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """値を登録（上限超過時は最も古いものを破棄）"""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """値を削除"""
+        return self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """全件削除"""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TTLCache:
+    """有効期限付きキャッシュ（件数上限を超えた場合はLRUで破棄）"""
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(maxsize=maxsize)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """有効期限内の値を取得"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """値を登録"""
+        self._entries.set(key, (time.monotonic() + self.ttl_seconds, value))
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """値を削除"""
+        entry = self._entries.pop(key)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        """全件削除"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
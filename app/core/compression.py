@@ -0,0 +1,157 @@
+import zlib
+from functools import lru_cache
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 圧縮しても効果の小さい（または逐次配信が必要な）Content-Type
+_SKIP_CONTENT_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip")
+
+
+@lru_cache
+def _brotli():
+    """brotli モジュール（未インストールの場合は None、gzip のみ使用）"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _accepted(accept_encoding: str, coding: str) -> bool:
+    """Accept-Encoding で指定の符号化が受け入れられているか（q=0 は拒否）"""
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if name.strip() != coding:
+            continue
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """br（brotliが利用可能な場合）を優先し、なければ gzip"""
+    if _brotli() is not None and _accepted(accept_encoding, "br"):
+        return "br"
+    if _accepted(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """gzip / brotli の逐次圧縮"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = _brotli().Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """レスポンスを gzip / brotli で圧縮するASGIミドルウェア
+
+    本文が minimum_size バイト未満のレスポンス、符号化済みのレスポンス、
+    SSE（逐次配信が必要）や画像等は圧縮しない。
+    brotli は `brotli` パッケージがインストールされている場合のみ使用する。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if "content-encoding" in headers or content_type.startswith(
+                    _SKIP_CONTENT_TYPES
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # 本文の大きさが分かるまで開始メッセージを保留
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    await send(start)
+                else:
+                    # 本文が1回で送られる場合（通常のJSON応答）はまとめて圧縮
+                    compressed = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(compressed))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
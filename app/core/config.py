@@ -7,7 +7,10 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
-    # データベース設定
+    # テナント（学校）設定ファイル（JSON、未設定の場合は以下の設定のみで1校として動作）
+    TENANTS_FILE: str = ""
+
+    # データベース設定（テナント設定で未指定の項目の既定値）
     DB_USER: str
     DB_PASSWORD: str
     DB_HOST: str
@@ -15,6 +18,16 @@ class Settings(BaseSettings):
     DB_NAME: str
     SSL_CA_PATH: str = "./DigiCertGlobalRootG2.crt.pem"
 
+    # コネクションプール設定
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_WARMUP: int = 5  # 起動時に事前接続する本数（DB_POOL_SIZEが上限）
+    DB_ECHO: bool = True  # 開発時はSQLログを出力
+    # MySQLの max_connections と、マイグレーション・管理作業用に残す本数
+    # （serve コマンドは全ワーカーの最大接続数の合計がこの差を超えないようプールを調整）
+    DB_MAX_CONNECTIONS: int = 150
+    DB_RESERVED_CONNECTIONS: int = 10
+
     @property
     def database_url(self) -> str:
         """データベース接続URL"""
@@ -26,28 +39,57 @@ class Settings(BaseSettings):
 
     # JWT設定
     JWT_SECRET: str
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = "HS256"  # HS256 または RS256 / ES256
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    JWT_ISSUER: str = ""  # 設定時は iss を付与・検証
+    # RS256 / ES256 用: <kid>.pem を置くディレクトリと署名に使うkid
+    JWT_KEYS_DIR: str = "./keys"
+    JWT_ACTIVE_KID: str = ""
+    JWKS_MAX_AGE_SECONDS: int = 300  # JWKSのキャッシュ許容期間
+
+    # 内部API設定（未設定の場合は内部APIを無効化）
+    INTERNAL_API_KEY: str = ""
+    INTROSPECT_MAX_TOKENS: int = 500
 
     # Google OAuth設定
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
 
+    # 同一認可コードのコールバック結果を保持する秒数
+    OAUTH_CODE_DEDUP_TTL_SECONDS: float = 30.0
+
+    # ログイン開始からコールバックまでの state・PKCE を保持する署名付きCookie
+    OAUTH_STATE_TTL_SECONDS: int = 600
+    OAUTH_STATE_SECRET: str = ""  # 未設定時は JWT_SECRET から導出
+
+    # Googleエンドポイント（ローカルスタブでの検証時に差し替え可能）
+    GOOGLE_AUTH_ENDPOINT: str = "https://accounts.google.com/o/oauth2/v2/auth"
+    GOOGLE_TOKEN_ENDPOINT: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_USERINFO_ENDPOINT: str = "https://www.googleapis.com/oauth2/v3/userinfo"
+
+    # Google呼び出しのタイムアウト・リトライ・サーキットブレーカー
+    GOOGLE_TOKEN_TIMEOUT_SECONDS: float = 5.0
+    GOOGLE_USERINFO_TIMEOUT_SECONDS: float = 3.0
+    GOOGLE_USERINFO_MAX_RETRIES: int = 2  # userinfoは冪等なためリトライ可（トークン交換は不可）
+    GOOGLE_RETRY_BUDGET_RATIO: float = 0.2  # 通常呼び出しに対するリトライ量の上限割合
+    GOOGLE_BREAKER_FAILURE_THRESHOLD: int = 5
+    GOOGLE_BREAKER_RESET_SECONDS: float = 30.0
+
     @property
     def google_auth_endpoint(self) -> str:
         """Google認証エンドポイント"""
-        return "https://accounts.google.com/o/oauth2/v2/auth"
+        return self.GOOGLE_AUTH_ENDPOINT
 
     @property
     def google_token_endpoint(self) -> str:
         """Googleトークンエンドポイント"""
-        return "https://oauth2.googleapis.com/token"
+        return self.GOOGLE_TOKEN_ENDPOINT
 
     @property
     def google_userinfo_endpoint(self) -> str:
         """Googleユーザー情報エンドポイント"""
-        return "https://www.googleapis.com/oauth2/v3/userinfo"
+        return self.GOOGLE_USERINFO_ENDPOINT
 
     # CORS設定
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -72,5 +114,87 @@ class Settings(BaseSettings):
             return []
         return [email.strip() for email in self.INITIAL_ADMIN_EMAILS.split(",")]
 
+    # 一括操作設定（1トランザクションあたりの最大行数）
+    BULK_CHUNK_SIZE: int = 500
+
+    # User-Agent辞書のプロセス内キャッシュ件数
+    USER_AGENT_CACHE_SIZE: int = 1024
+
+    # 認証済みユーザー（Principal）のキャッシュ
+    # 他プロセスでのロール変更・削除は最大この秒数遅れて反映される
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # ユーザー削除ジョブ（認証ログの匿名化をバッチごとにコミットし、間隔を空けて実行）
+    PURGE_BATCH_SIZE: int = 500
+    PURGE_BATCH_PAUSE_MS: int = 100
+    PURGE_POLL_INTERVAL_SECONDS: float = 5.0
+    PURGE_LEASE_SECONDS: float = 60.0  # 処理中のプロセスが停止した場合、この秒数後に再開
+    PURGE_MAX_ATTEMPTS: int = 5
+
+    # ログイン失敗の抑止
+    # 未登録メールアドレスの否定キャッシュ（他プロセスでの登録はこの秒数以内に反映）
+    UNREGISTERED_EMAIL_CACHE_TTL_SECONDS: float = 60.0
+    UNREGISTERED_EMAIL_CACHE_SIZE: int = 10000
+    # 直近 WINDOW 秒の失敗回数が上限に達した接続元IP・メールアドレスは
+    # Google・DBに問い合わせずに拒否する（0で無効。学校のNAT配下では同一IPを共有する点に注意）
+    LOGIN_FAILURE_WINDOW_SECONDS: int = 300
+    LOGIN_FAILURE_LIMIT_PER_IP: int = 100
+    LOGIN_FAILURE_LIMIT_PER_EMAIL: int = 5
+    # 設定時は回数をRedisで全ワーカー共有（redis パッケージが必要）、未設定時はプロセス内
+    RATE_LIMIT_REDIS_URL: str = ""
+    RATE_LIMIT_MEMORY_SIZE: int = 100000
+
+    # 名簿（外部ディレクトリ）の差分同期
+    # 同期元の指定（例: file:./var/roster.jsonl）。空の場合は同期しない
+    DIRECTORY_SOURCE: str = ""
+    DIRECTORY_SYNC_BATCH_SIZE: int = 500
+    DIRECTORY_SYNC_REPORT_LIMIT: int = 100  # 結果に含める変更内容の最大件数
+
+    # レスポンス圧縮（brotli は brotli パッケージがある場合のみ、なければ gzip）
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # 認証ログのライブ配信（SSE）
+    # 他プロセスで書き込まれたログは直近 WINDOW 秒分をこの間隔で取り込む（0で無効）
+    STREAM_POLL_INTERVAL_SECONDS: float = 2.0
+    STREAM_POLL_WINDOW_SECONDS: float = 5.0
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STREAM_RETRY_MS: int = 3000
+    STREAM_RESUME_MAX_EVENTS: int = 1000  # 再接続時にDBから送り直す最大件数
+
+    # 件数キャッシュの有効期限（count_mode=cached）
+    COUNT_CACHE_TTL_SECONDS: int = 60
+    # 件数カウンタの分割数（ログ書き込みの同時実行がカウンタ行のロックで直列化しないよう分散）
+    AUTH_LOG_COUNTER_SHARDS: int = 16
+
+    # 監査ログのローカルスプール設定（有効時はDBより先にローカルへ追記し、非同期でDBへ送出）
+    # 永続ボリューム上のディレクトリを指定すること
+    AUDIT_SPOOL_ENABLED: bool = False
+    AUDIT_SPOOL_DIR: str = "./var/audit-spool"
+    AUDIT_SPOOL_FSYNC_INTERVAL_MS: int = 5  # グループコミットの待ち時間
+    AUDIT_SPOOL_SEGMENT_BYTES: int = 16 * 1024 * 1024
+    AUDIT_SPOOL_SHIP_INTERVAL_SECONDS: float = 1.0
+    AUDIT_SPOOL_SHIP_BATCH_SIZE: int = 500
+
+    # サーバー設定（serve コマンド）
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 の場合は利用可能なCPU数
+    SERVER_MAX_REQUESTS: int = 10000  # ワーカーを再起動するまでのリクエスト数（0で無制限）
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30  # SHUTDOWN_DRAIN_TIMEOUT_SECONDS より長くする
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # 起動・終了設定
+    HTTP_WARMUP_ENABLED: bool = True  # 起動時に外部HTTP接続を事前確立
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS: float = 20.0  # 処理中リクエストの完了待ち上限
+
+    # ヘルスチェック設定
+    HEALTH_CHECK_INTERVAL_SECONDS: float = 5.0  # バックグラウンドチェック間隔
+    HEALTH_CHECK_TIMEOUT_SECONDS: float = 2.0  # 依存先ごとのタイムアウト
+    HEALTH_STALE_AFTER_SECONDS: float = 30.0  # これより古い結果は not ready
+    HEALTH_POOL_MIN_HEADROOM: int = 1  # プールの最低空き接続数
+
 
 settings = Settings()
@@ -1,30 +1,121 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
-
-# 非同期エンジンの作成
-engine = create_async_engine(
-    settings.database_url,
-    echo=True,  # 開発時はSQLログを出力
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
-
-# セッションファクトリ
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
+from app.core.tenancy import Tenant, current_tenant, get_tenant_registry
 
 # ベースクラス
 Base = declarative_base()
 
 
+@dataclass
+class TenantDatabase:
+    """テナントごとのエンジン（接続プール）とセッションファクトリ"""
+
+    tenant: Tenant
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker
+
+
+# テナントID -> エンジン（初回使用時に作成）
+# プールをテナントごとに分けるため、1校の負荷で他校の接続が枯渇しない
+_databases: Dict[str, TenantDatabase] = {}
+
+
+def _use_utc_session(dbapi_connection, connection_record) -> None:
+    """接続ごとにセッションのタイムゾーンをUTCに固定
+
+    NOW()（server_default・onupdate）とアプリ側の datetime.utcnow() を同じ基準にする。
+    サーバーのタイムゾーンがUTCでない場合も、時刻の比較や並び順がずれない。
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET time_zone = '+00:00'")
+    finally:
+        cursor.close()
+
+
+def get_database(tenant: Optional[Tenant] = None) -> TenantDatabase:
+    """テナントのエンジン・セッションファクトリを取得（省略時は現在のテナント）"""
+    tenant = tenant or current_tenant()
+    database = _databases.get(tenant.id)
+    if database is None:
+        engine = create_async_engine(
+            tenant.database_url,
+            echo=settings.DB_ECHO,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            pool_size=tenant.pool_size,
+            max_overflow=tenant.max_overflow,
+        )
+        if engine.dialect.name == "mysql":
+            event.listen(engine.sync_engine, "connect", _use_utc_session)
+        database = TenantDatabase(
+            tenant=tenant,
+            engine=engine,
+            sessionmaker=async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        )
+        _databases[tenant.id] = database
+    return database
+
+
+def get_engine(tenant: Optional[Tenant] = None) -> AsyncEngine:
+    """テナントのエンジンを取得（省略時は現在のテナント）"""
+    return get_database(tenant).engine
+
+
+def open_session(tenant: Optional[Tenant] = None) -> AsyncSession:
+    """テナントのセッションを作成（省略時は現在のテナント）"""
+    return get_database(tenant).sessionmaker()
+
+
 async def get_db() -> AsyncSession:
-    """データベースセッション依存性"""
-    async with AsyncSessionLocal() as session:
+    """データベースセッション依存性（リクエストのテナントのDB）"""
+    async with open_session() as session:
         try:
             yield session
         finally:
             await session.close()
+
+
+async def _warm_up_tenant(tenant: Tenant, connections: int) -> int:
+    engine = get_engine(tenant)
+    connections = min(connections, tenant.pool_size)
+    if connections <= 0:
+        return 0
+
+    async def _open():
+        conn = await engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    # 同時に保持してから返却し、別々の接続がプールに残るようにする
+    conns = await asyncio.gather(*(_open() for _ in range(connections)))
+    for conn in conns:
+        await conn.close()
+    return len(conns)
+
+
+async def warm_up_pool(connections: int) -> int:
+    """全テナントのプールに接続を事前確立（TLSハンドシェイク・認証を起動時に済ませる）
+
+    Returns:
+        確立した接続数
+    """
+    tenants = get_tenant_registry().tenants.values()
+    opened = await asyncio.gather(*(_warm_up_tenant(t, connections) for t in tenants))
+    return sum(opened)
+
+
+async def dispose_engine() -> None:
+    """全テナントのプール内の接続を閉じる"""
+    for database in list(_databases.values()):
+        await database.engine.dispose()
@@ -0,0 +1,171 @@
+import asyncio
+import contextlib
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.http import fetch_status, GOOGLE_DISCOVERY_URL
+from app.core.lifecycle import tracker, register_startup_hook, register_drain_hook
+from app.core.resilience import breaker_metrics
+from app.core.tenancy import Tenant, get_tenant_registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CheckResult:
+    """依存先チェック結果"""
+
+    name: str
+    ok: bool
+    critical: bool
+    latency_ms: float
+    detail: Optional[str] = None
+
+
+async def _check_tenants(check: Callable[[Tenant], Awaitable[str]]) -> Optional[str]:
+    """全テナントに対してチェックを実行
+
+    1校のDB障害・混雑で他校を処理できるPodまで振り分けから外さないよう、
+    全テナントが失敗した場合のみ失敗とし、一部の失敗は詳細として報告する。
+    """
+    tenants = list(get_tenant_registry().tenants.values())
+    results = await asyncio.gather(*(check(t) for t in tenants), return_exceptions=True)
+    details = []
+    for tenant, result in zip(tenants, results):
+        if isinstance(result, BaseException):
+            details.append(f"{tenant.id}: NG {type(result).__name__}: {result}")
+        elif result:
+            details.append(f"{tenant.id}: {result}")
+    detail = "; ".join(details) or None
+    if all(isinstance(result, BaseException) for result in results):
+        raise RuntimeError(detail)
+    return detail
+
+
+async def _ping_tenant(tenant: Tenant) -> str:
+    async with get_engine(tenant).connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return ""
+
+
+async def _pool_headroom(tenant: Tenant) -> str:
+    pool = get_engine(tenant).pool
+    capacity = tenant.pool_size + tenant.max_overflow
+    headroom = capacity - pool.checkedout()
+    detail = f"checked_out={pool.checkedout()} capacity={capacity}"
+    if headroom < settings.HEALTH_POOL_MIN_HEADROOM:
+        raise RuntimeError(detail)
+    return detail
+
+
+async def check_database() -> Optional[str]:
+    """DB疎通確認（テナントごと）"""
+    return await _check_tenants(_ping_tenant)
+
+
+async def check_pool_headroom() -> Optional[str]:
+    """プールの空き確認（使用中の接続数が上限に近い場合は失敗、テナントごと）"""
+    return await _check_tenants(_pool_headroom)
+
+
+async def check_oauth() -> Optional[str]:
+    """Google OAuthエンドポイントへの到達確認"""
+    status_code = await fetch_status(
+        GOOGLE_DISCOVERY_URL, timeout_seconds=settings.HEALTH_CHECK_TIMEOUT_SECONDS
+    )
+    if status_code >= 500:
+        raise RuntimeError(f"status={status_code}")
+    return None
+
+
+class HealthMonitor:
+    """依存先チェックをバックグラウンドで定期実行し、結果を保持する
+
+    プローブは保持済みの結果を返すだけなので、プローブ頻度に関わらず
+    DB負荷はチェック間隔で決まる。
+    """
+
+    def __init__(self):
+        # (名前, チェック関数, 失敗時にreadyを落とすか)
+        self.checks: List[tuple[str, Callable[[], Awaitable[Optional[str]]], bool]] = [
+            ("database", check_database, True),
+            ("db_pool", check_pool_headroom, True),
+            # Google障害は全Podに共通するため、Podを振り分けから外す理由にしない
+            ("oauth", check_oauth, False),
+        ]
+        self.results: Dict[str, CheckResult] = {}
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run_check(self, name, check, critical) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(check(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+            ok = True
+        except Exception as e:
+            detail, ok = f"{type(e).__name__}: {e}"[:200], False
+        latency_ms = (time.perf_counter() - started) * 1000
+        return CheckResult(
+            name=name, ok=ok, critical=critical, latency_ms=round(latency_ms, 1), detail=detail
+        )
+
+    async def run_once(self) -> None:
+        """全チェックを並行実行して結果を更新"""
+        results = await asyncio.gather(*(self._run_check(*c) for c in self.checks))
+        self.results = {r.name: r for r in results}
+        self.checked_at = time.time()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("health check failed")
+            await asyncio.sleep(settings.HEALTH_CHECK_INTERVAL_SECONDS)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """チェックを停止（実行中のチェックの終了を待ち、DB接続の破棄と競合させない）"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    def snapshot(self) -> dict:
+        """readiness判定結果（チェック結果が古い場合・終了処理中は not ready）"""
+        stale = (
+            self.checked_at is None
+            or time.time() - self.checked_at > settings.HEALTH_STALE_AFTER_SECONDS
+        )
+        ready = (
+            not stale
+            and not tracker.draining
+            and all(r.ok for r in self.results.values() if r.critical)
+        )
+        checked_at = (
+            datetime.fromtimestamp(self.checked_at, tz=timezone.utc).isoformat()
+            if self.checked_at
+            else None
+        )
+        return {
+            "status": "ready" if ready else "not_ready",
+            "draining": tracker.draining,
+            "checked_at": checked_at,
+            "checks": {name: asdict(r) for name, r in self.results.items()},
+            "circuit_breakers": breaker_metrics(),
+        }
+
+
+monitor = HealthMonitor()
+register_startup_hook(monitor.start)
+register_drain_hook(monitor.stop)
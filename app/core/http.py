@@ -0,0 +1,45 @@
+from typing import Optional
+import httpx
+
+# 外部HTTP呼び出しで共有するコネクションプール
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
+
+
+def get_http_transport() -> httpx.AsyncHTTPTransport:
+    """共有トランスポートを取得
+
+    クライアントごとに接続を張り直さないよう、OAuthクライアント等は
+    このトランスポートを使って生成する（クライアント側では閉じないこと）。
+    """
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _transport
+
+
+async def fetch_status(url: str, timeout_seconds: float = 5.0) -> int:
+    """共有トランスポートでGETし、ステータスコードのみ返す（本文は読まずに接続を返却）"""
+    # クライアントを閉じると共有トランスポートも閉じるため、トランスポートで直接リクエストする
+    request = httpx.Request(
+        "GET", url, extensions={"timeout": httpx.Timeout(timeout_seconds).as_dict()}
+    )
+    response = await get_http_transport().handle_async_request(request)
+    await response.aclose()
+    return response.status_code
+
+
+async def warm_up_http() -> None:
+    """Googleへの接続（DNS解決・TLS）を事前に確立"""
+    await fetch_status(GOOGLE_DISCOVERY_URL)
+
+
+async def close_http_transport() -> None:
+    """共有トランスポートを閉じる"""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
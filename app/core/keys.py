@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+from app.core.config import settings
+
+# 公開鍵で検証できる署名アルゴリズム
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+
+@dataclass
+class KeyRing:
+    """JWT署名鍵の集合
+
+    JWT_KEYS_DIR 内の `<kid>.pem` をすべて検証・JWKS公開の対象とし、
+    JWT_ACTIVE_KID の鍵のみで署名する。ローテーションは
+    「新しい鍵を追加（公開）→ JWKSキャッシュ期間経過後に署名鍵を切替 →
+    旧鍵で署名したトークンの有効期限経過後に旧鍵を削除」の順で行う。
+    """
+
+    algorithm: str
+    active_kid: Optional[str] = None
+    private_pems: Dict[str, str] = field(default_factory=dict)
+    public_jwks: Dict[str, dict] = field(default_factory=dict)
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    @classmethod
+    def load(cls, algorithm: str, keys_dir: str, active_kid: str) -> "KeyRing":
+        """鍵ディレクトリから読み込み（HS系では空の鍵リング）"""
+        ring = cls(algorithm=algorithm)
+        if not ring.is_asymmetric:
+            return ring
+
+        from jose import jwk
+
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            kid = path.stem
+            pem = path.read_text()
+            public = jwk.construct(pem, algorithm).public_key().to_dict()
+            public.update({"kid": kid, "use": "sig", "alg": algorithm})
+            ring.public_jwks[kid] = public
+            if "PRIVATE KEY" in pem:
+                ring.private_pems[kid] = pem
+
+        if active_kid not in ring.private_pems:
+            raise ValueError(f"JWT_ACTIVE_KID '{active_kid}' の秘密鍵が {keys_dir} にありません")
+        ring.active_kid = active_kid
+        return ring
+
+    def signing_key(self) -> str:
+        """署名用の秘密鍵（PEM）"""
+        return self.private_pems[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]) -> Optional[dict]:
+        """kidに対応する検証用公開鍵（JWK）"""
+        return self.public_jwks.get(kid) if kid else None
+
+    def jwks(self) -> dict:
+        """公開用JWKS"""
+        return {"keys": list(self.public_jwks.values())}
+
+
+@lru_cache
+def get_keyring() -> KeyRing:
+    """設定から鍵リングを読み込み（プロセス内で1回）"""
+    return KeyRing.load(settings.JWT_ALGORITHM, settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID)
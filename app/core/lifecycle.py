@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import warm_up_pool, dispose_engine
+from app.core.http import warm_up_http, close_http_transport
+from app.core.keys import get_keyring
+from app.core.security import preload_heavy_modules
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[None]]
+
+# 起動時の事前準備・終了時の書き出し処理（各モジュールが登録する）
+_startup_hooks: List[Hook] = []
+_drain_hooks: List[Hook] = []
+
+
+def register_startup_hook(hook: Hook) -> Hook:
+    """起動時に実行する処理を登録"""
+    _startup_hooks.append(hook)
+    return hook
+
+
+def register_drain_hook(hook: Hook) -> Hook:
+    """終了時（処理中リクエスト完了後、DB切断前）に実行する処理を登録"""
+    _drain_hooks.append(hook)
+    return hook
+
+
+class RequestTracker:
+    """処理中リクエスト数と終了処理中フラグの管理"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def enter(self) -> None:
+        self.in_flight += 1
+        self._idle.clear()
+
+    def exit(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """処理中リクエストが0になるまで待機（タイムアウト時はFalse）"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+tracker = RequestTracker()
+
+
+class InFlightMiddleware:
+    """処理中リクエストを数えるASGIミドルウェア
+
+    終了時の新規接続の受付停止はサーバー（uvicorn）が行うため、ここでは断らない。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tracker.enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            tracker.exit()
+
+
+async def _run_hook(hook: Hook, phase: str) -> None:
+    """フックを実行（失敗しても起動・終了処理は継続）"""
+    try:
+        await hook()
+    except Exception:
+        logger.exception("%s hook %s failed", phase, getattr(hook, "__name__", hook))
+
+
+async def startup() -> None:
+    """起動処理: プール・外部HTTP接続の事前確立と登録済みフックの実行"""
+    started = time.perf_counter()
+    # 重いモジュールの読み込み（CPU処理）をDB接続の確立（I/O待ち）と並行して行う
+    preload = asyncio.create_task(asyncio.to_thread(preload_heavy_modules))
+    try:
+        opened = await warm_up_pool(settings.DB_POOL_WARMUP)
+        logger.info("DB pool warmed up: %d connections", opened)
+    except Exception:
+        logger.exception("DB pool warm-up failed")
+    await preload
+
+    # 署名鍵・JWKSの読み込み（設定不備はここで起動失敗させる）
+    get_keyring()
+
+    tasks = [_run_hook(hook, "startup") for hook in _startup_hooks]
+    if settings.HTTP_WARMUP_ENABLED:
+        tasks.append(_run_hook(warm_up_http, "startup"))
+    await asyncio.gather(*tasks)
+    logger.info("startup completed in %.0f ms", (time.perf_counter() - started) * 1000)
+
+
+async def shutdown() -> None:
+    """終了処理: 処理中リクエストの完了待ち → 書き出し → 切断
+
+    サーバーは新規接続の受付を止めてからこの処理を呼ぶ。draining は
+    長時間の接続（SSE等）に終了を知らせ、完了待ちを妨げないようにするためのもの。
+    """
+    tracker.draining = True
+    if not await tracker.wait_idle(settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS):
+        logger.warning("shutdown drain timed out with %d requests in flight", tracker.in_flight)
+
+    for hook in _drain_hooks:
+        await _run_hook(hook, "drain")
+
+    await close_http_transport()
+    await dispose_engine()
@@ -0,0 +1,105 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+from app.core.config import settings
+
+# ログイン開始からコールバックまでの状態を保持するCookie
+OAUTH_STATE_COOKIE = "oauth_state"
+
+
+@dataclass(frozen=True)
+class OAuthState:
+    """ログイン試行の状態（サーバー側には保存せず、署名付きCookieで持ち回る）"""
+
+    state: str
+    code_verifier: str
+    return_to: Optional[str]
+    tenant_id: str
+    expires_at: int
+
+
+@lru_cache
+def _signing_key() -> bytes:
+    """署名鍵（OAUTH_STATE_SECRET、未設定時は JWT_SECRET から用途別に導出）"""
+    if settings.OAUTH_STATE_SECRET:
+        return settings.OAUTH_STATE_SECRET.encode("utf-8")
+    return hmac.new(settings.JWT_SECRET.encode("utf-8"), b"oauth-state", hashlib.sha256).digest()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_signing_key(), payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def new_oauth_state(
+    tenant_id: str, code_verifier: str, return_to: Optional[str] = None
+) -> OAuthState:
+    """新しいログイン試行の状態を作成（state はランダム値）"""
+    return OAuthState(
+        state=secrets.token_urlsafe(24),
+        code_verifier=code_verifier,
+        return_to=return_to,
+        tenant_id=tenant_id,
+        expires_at=int(time.time()) + settings.OAUTH_STATE_TTL_SECONDS,
+    )
+
+
+def encode_oauth_state(oauth_state: OAuthState) -> str:
+    """Cookie値に変換（<base64url(JSON)>.<base64url(HMAC-SHA256)>）"""
+    body = json.dumps(
+        {
+            "s": oauth_state.state,
+            "v": oauth_state.code_verifier,
+            "r": oauth_state.return_to,
+            "t": oauth_state.tenant_id,
+            "e": oauth_state.expires_at,
+        },
+        separators=(",", ":"),
+    )
+    payload = _b64encode(body.encode("utf-8"))
+    return f"{payload}.{_sign(payload)}"
+
+
+def decode_oauth_state(value: Optional[str]) -> Optional[OAuthState]:
+    """Cookie値を検証して復元（署名不正・期限切れ・形式不正の場合は None）"""
+    if not value:
+        return None
+    payload, _, signature = value.partition(".")
+    try:
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        data = json.loads(_b64decode(payload))
+        oauth_state = OAuthState(
+            state=data["s"],
+            code_verifier=data["v"],
+            return_to=data["r"],
+            tenant_id=data["t"],
+            expires_at=int(data["e"]),
+        )
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        return None
+    if oauth_state.expires_at <= time.time():
+        return None
+    return oauth_state
+
+
+def safe_return_path(return_to: Optional[str]) -> Optional[str]:
+    """ログイン後の遷移先として許可するパス（フロントエンド内の相対パスのみ）"""
+    if not return_to or not return_to.startswith("/") or return_to.startswith("//"):
+        return None
+    if "\\" in return_to or any(ord(c) < 0x20 for c in return_to) or len(return_to) > 512:
+        return None
+    return return_to
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Dict, Hashable, Set
+from app.core.cache import LRUCache
+
+
+class Subscription:
+    """購読者ごとの受信キュー
+
+    キューが溢れた場合はメッセージを捨てて lagged を立てる（書き込み側を待たせない）。
+    購読者は lagged を検知したら、永続化された側から取りこぼし分を取得する。
+    """
+
+    def __init__(self, topic: Hashable, maxsize: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.lagged = False
+
+
+class Broadcaster:
+    """プロセス内のpub/sub（asyncioの単一スレッド前提）
+
+    同じIDのメッセージは一度だけ配信する（ローカルの書き込みと
+    他プロセス分の取り込みが重なっても重複しない）。購読者がいない場合の publish はほぼ無負荷。
+    """
+
+    def __init__(self, queue_size: int = 1000, dedup_size: int = 10000):
+        self.queue_size = queue_size
+        self._subscribers: Dict[Hashable, Set[Subscription]] = {}
+        self._published = LRUCache(maxsize=dedup_size)
+
+    def subscribe(self, topic: Hashable) -> Subscription:
+        subscription = Subscription(topic, self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.topic]
+
+    def subscriber_count(self, topic: Hashable) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def publish(self, topic: Hashable, message_id: Hashable, message: Any) -> bool:
+        """メッセージを配信（配信済みのIDは無視）
+
+        Returns:
+            配信した場合True
+        """
+        subscribers = self._subscribers.get(topic)
+        if not subscribers:
+            return False
+        key = (topic, message_id)
+        if self._published.get(key) is not None:
+            return False
+        self._published.set(key, True)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.lagged = True
+        return True
+
+
+# 認証ログ（トピックはテナントID、メッセージIDはログID）
+auth_log_events = Broadcaster()
@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import time
+from functools import lru_cache
+from typing import List, Protocol, Sequence
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.tenancy import current_tenant
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBackend(Protocol):
+    """期限付きカウンタの保存先"""
+
+    async def incr(self, key: str, ttl_seconds: int) -> None:
+        """カウンタを1加算（ttl_seconds 後に消える）"""
+        ...
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        """カウンタの値を取得（存在しないものは0）"""
+        ...
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        """カウンタを削除"""
+        ...
+
+
+class MemoryRateLimitBackend:
+    """プロセス内のカウンタ（件数上限を超えた場合は古いキーから破棄）"""
+
+    def __init__(self, maxsize: int):
+        self._counters = LRUCache(maxsize=maxsize)
+
+    async def incr(self, key: str, ttl_seconds: int) -> None:
+        now = time.monotonic()
+        entry = self._counters.get(key)
+        if entry is None or entry[0] <= now:
+            self._counters.set(key, (now + ttl_seconds, 1))
+        else:
+            self._counters.set(key, (entry[0], entry[1] + 1))
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            entry = self._counters.get(key)
+            values.append(entry[1] if entry is not None and entry[0] > now else 0)
+        return values
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        for key in keys:
+            self._counters.pop(key)
+
+
+class RedisRateLimitBackend:
+    """Redisのカウンタ（全ワーカー・全ホストで共有、redis パッケージが必要）"""
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self._redis = redis.asyncio.Redis.from_url(url)
+
+    async def incr(self, key: str, ttl_seconds: int) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.incr(key)
+            pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        return [int(value or 0) for value in await self._redis.mget(list(keys))]
+
+    async def delete(self, keys: Sequence[str]) -> None:
+        await self._redis.delete(*keys)
+
+
+@lru_cache
+def get_rate_limit_backend() -> RateLimitBackend:
+    """RATE_LIMIT_REDIS_URL が設定されていればRedis、なければプロセス内"""
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    return MemoryRateLimitBackend(maxsize=settings.RATE_LIMIT_MEMORY_SIZE)
+
+
+def tenant_limiter_key(value: str) -> str:
+    """回数制限のキー（テナント別、共有バックエンドに生のメールアドレス・IPを置かない）"""
+    raw = f"{current_tenant().id}\0{value}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class SlidingWindowLimiter:
+    """スライディングウィンドウ（直前と現在の固定窓の加重和）による回数制限
+
+    キーごとに窓2つ分のカウンタのみを持つため、記録する回数が多くてもメモリは一定。
+    保存先の障害時は制限しない（ログインを止めない）。
+    """
+
+    def __init__(self, name: str, limit: int, window_seconds: int):
+        self.name = name
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    def _keys(self, key: str, now: float) -> tuple:
+        window = int(now // self.window_seconds)
+        prefix = f"rl:{self.name}:{key}:"
+        return prefix + str(window - 1), prefix + str(window)
+
+    async def count(self, key: str) -> float:
+        """直近 window_seconds 秒の推定回数"""
+        now = time.time()
+        previous, current = await get_rate_limit_backend().get_many(self._keys(key, now))
+        elapsed = (now % self.window_seconds) / self.window_seconds
+        return previous * (1 - elapsed) + current
+
+    async def is_limited(self, key: str) -> bool:
+        """上限に達しているか"""
+        if self.limit <= 0:
+            return False
+        try:
+            return await self.count(key) >= self.limit
+        except Exception:
+            logger.exception("rate limiter %s is unavailable", self.name)
+            return False
+
+    async def hit(self, key: str) -> None:
+        """1回分を記録"""
+        if self.limit <= 0:
+            return
+        try:
+            await get_rate_limit_backend().incr(
+                self._keys(key, time.time())[1], self.window_seconds * 2
+            )
+        except Exception:
+            logger.exception("rate limiter %s is unavailable", self.name)
+
+    async def reset_many(self, keys: Sequence[str]) -> None:
+        """記録した回数を消去（状況が変わり、過去の失敗を数える理由がなくなった場合）"""
+        if self.limit <= 0 or not keys:
+            return
+        now = time.time()
+        try:
+            await get_rate_limit_backend().delete(
+                [name for key in keys for name in self._keys(key, now)]
+            )
+        except Exception:
+            logger.exception("rate limiter %s is unavailable", self.name)
+
+
+# ログイン失敗の回数制限（上限に達した接続元・メールアドレスはGoogle・DBに問い合わせずに拒否）
+# メールアドレス側はユーザーの作成・更新時にリポジトリが消去するため、ここで共有する
+login_ip_failures = SlidingWindowLimiter(
+    "login_fail_ip", settings.LOGIN_FAILURE_LIMIT_PER_IP, settings.LOGIN_FAILURE_WINDOW_SECONDS
+)
+login_email_failures = SlidingWindowLimiter(
+    "login_fail_email",
+    settings.LOGIN_FAILURE_LIMIT_PER_EMAIL,
+    settings.LOGIN_FAILURE_WINDOW_SECONDS,
+)
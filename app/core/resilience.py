@@ -0,0 +1,152 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+
+class UpstreamError(Exception):
+    """外部サービスの一時的な障害（5xx等、リトライ・遮断の対象）"""
+
+
+class CircuitOpenError(UpstreamError):
+    """サーキットブレーカーが開いているため呼び出しを行わなかった"""
+
+
+class CircuitBreaker:
+    """連続失敗でリクエストを遮断するサーキットブレーカー
+
+    closed: 通常 / open: 即時失敗 / half_open: 1件だけ試行し、成功で closed に戻る
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        # メトリクス
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """呼び出し可否を判定"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.total_rejected += 1
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.total_rejected += 1
+                return False
+            self._probe_in_flight = True
+        self.total_calls += 1
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def record_ignored(self) -> None:
+        """成否の判定対象外として終了（半開状態の試行枠を解放）"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+class RetryBudget:
+    """リトライ予算（通常リクエストの ratio 割合までリトライを許可する）
+
+    障害時にリトライが負荷を増幅させないよう、リトライ総量を通常の呼び出し量に比例させる。
+    """
+
+    def __init__(self, ratio: float, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+
+    def deposit(self) -> None:
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+async def call_with_resilience(
+    breaker: CircuitBreaker,
+    fn: Callable[[], Awaitable[T]],
+    retryable: Tuple[Type[BaseException], ...] = (UpstreamError,),
+    max_retries: int = 0,
+    budget: Optional[RetryBudget] = None,
+    base_delay: float = 0.1,
+    max_delay: float = 1.0,
+) -> T:
+    """ブレーカー・リトライ予算・ジッター付きバックオフで呼び出す
+
+    max_retries は冪等な呼び出しの場合のみ指定すること。
+    """
+    if budget is not None:
+        budget.deposit()
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.name)
+        try:
+            result = await fn()
+        except retryable:
+            breaker.record_failure()
+            if attempt >= max_retries or (budget is not None and not budget.withdraw()):
+                raise
+            # Full Jitter
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
+            attempt += 1
+            continue
+        except BaseException:
+            # 呼び出し側の誤り（4xx等）はブレーカーの判定に含めない
+            breaker.record_ignored()
+            raise
+        breaker.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, failure_threshold: int, reset_timeout: float) -> CircuitBreaker:
+    """名前付きブレーカーを取得（プロセス内で共有）"""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+    return _breakers[name]
+
+
+def breaker_metrics() -> Dict[str, dict]:
+    """全ブレーカーの状態"""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
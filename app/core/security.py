@@ -1,15 +1,35 @@
 import secrets
 import hashlib
 import base64
+import importlib
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from authlib.integrations.httpx_client import AsyncOAuth2Client
+from typing import TYPE_CHECKING, Optional
 from app.core.config import settings
+from app.core.http import get_http_transport
+from app.core.keys import get_keyring
+from app.core.tenancy import current_tenant
+
+if TYPE_CHECKING:
+    from authlib.integrations.httpx_client import AsyncOAuth2Client
+
+# 初回使用時に読み込む重いモジュール（暗号バックエンド・OAuthクライアント）
+# インポート時には読み込まず、起動処理でDB接続の確立と並行して読み込む
+HEAVY_MODULES = ("jose.jwt", "jose.jwk", "authlib.integrations.httpx_client")
+
+
+def preload_heavy_modules() -> None:
+    """重いモジュールを事前に読み込み（起動処理からスレッドで呼び出す）"""
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """JWTアクセストークンを生成"""
+    """JWTアクセストークンを生成
+
+    RS256/ES256等ではアクティブな秘密鍵で署名し、ヘッダーにkidを付与する。
+    """
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -17,15 +37,40 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    if settings.JWT_ISSUER:
+        to_encode["iss"] = settings.JWT_ISSUER
+
+    keyring = get_keyring()
+    if keyring.is_asymmetric:
+        return jwt.encode(
+            to_encode,
+            keyring.signing_key(),
+            algorithm=keyring.algorithm,
+            headers={"kid": keyring.active_kid},
+        )
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
 def verify_access_token(token: str) -> Optional[dict]:
-    """JWTアクセストークンを検証"""
+    """JWTアクセストークンを検証（非対称鍵の場合はkidで検証鍵を選択）"""
+    from jose import JWTError, jwt
+
+    options = {"verify_iss": bool(settings.JWT_ISSUER)}
     try:
+        keyring = get_keyring()
+        if keyring.is_asymmetric:
+            key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if key is None:
+                return None
+        else:
+            key = settings.JWT_SECRET
         payload = jwt.decode(
-            token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
+            token,
+            key,
+            algorithms=[settings.JWT_ALGORITHM],
+            issuer=settings.JWT_ISSUER or None,
+            options=options,
         )
         return payload
     except JWTError:
@@ -43,13 +88,17 @@ def generate_pkce_challenge(verifier: str) -> str:
     return base64.urlsafe_b64encode(digest).decode("utf-8").rstrip("=")
 
 
-def create_google_oauth_client() -> AsyncOAuth2Client:
-    """Google OAuth2クライアントを作成"""
+def create_google_oauth_client() -> "AsyncOAuth2Client":
+    """現在のテナントのGoogle OAuth2クライアントを作成"""
+    from authlib.integrations.httpx_client import AsyncOAuth2Client
+
+    tenant = current_tenant()
     return AsyncOAuth2Client(
-        client_id=settings.GOOGLE_CLIENT_ID,
-        client_secret=settings.GOOGLE_CLIENT_SECRET,
-        redirect_uri=settings.GOOGLE_REDIRECT_URI,
+        client_id=tenant.google_client_id,
+        client_secret=tenant.google_client_secret,
+        redirect_uri=tenant.google_redirect_uri,
         scope="openid email profile",
+        transport=get_http_transport(),
     )
 
 
@@ -59,16 +108,19 @@ async def verify_google_id_token(id_token: str) -> Optional[dict]:
     以下を厳密にチェック:
     - 署名検証（Googleの公開鍵）
     - iss == "https://accounts.google.com" or "accounts.google.com"
-    - aud == GOOGLE_CLIENT_ID
+    - aud == 現在のテナントの GOOGLE_CLIENT_ID
     - exp > 現在時刻
     - email_verified == True
     """
+    from jose import JWTError, jwt
+
+    client_id = current_tenant().google_client_id
     try:
         # JWTデコード（署名検証は省略、本番では実装必須）
         # TODO: Googleの公開鍵を取得して署名検証を実装
         payload = jwt.decode(
             id_token,
-            settings.GOOGLE_CLIENT_ID,
+            client_id,
             algorithms=["RS256"],
             options={"verify_signature": False},  # 開発時のみ
         )
@@ -81,7 +133,7 @@ async def verify_google_id_token(id_token: str) -> Optional[dict]:
             return None
 
         # audチェック
-        if payload.get("aud") != settings.GOOGLE_CLIENT_ID:
+        if payload.get("aud") != client_id:
             return None
 
         # expチェック
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.core.cache import TTLCache
+
+
+class SingleFlight:
+    """同一キーの処理をまとめるユーティリティ
+
+    - 実行中のキーに対する呼び出しは、新たに実行せず同じ結果を待つ
+    - 完了後も ttl_seconds の間は結果を保持し、再呼び出しにそのまま返す
+    例外と、cacheable が False を返した結果は保持しない（次の呼び出しで再実行される）。
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 1024):
+        self._results = TTLCache(ttl_seconds=ttl_seconds, maxsize=maxsize)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        cached = self._results.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            # 先行する呼び出しがキャンセルされても待機側は影響を受けない
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 待機者がいない場合の未取得警告を抑止
+            raise
+        else:
+            if cacheable is None or cacheable(result):
+                self._results.set(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+
+_MISSING = object()
@@ -0,0 +1,210 @@
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+from sqlalchemy.engine import make_url
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+
+# TENANTS_FILE 未設定時（1校のみの運用）のテナントID
+DEFAULT_TENANT_ID = "default"
+
+
+class UnknownTenantError(LookupError):
+    """リクエストのテナントを特定できない"""
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """テナント（学校）ごとの設定
+
+    DBはテナントごとに分離し（同一サーバー上の別データベースを想定）、
+    接続プール・Google OAuthクライアント・プロセス内キャッシュもテナント単位で持つ。
+    """
+
+    id: str
+    hosts: Tuple[str, ...]
+    database_url: str
+    pool_size: int
+    max_overflow: int
+    google_client_id: str
+    google_client_secret: str
+    google_redirect_uri: str
+    frontend_url: str
+    cookie_domain: str
+    initial_admin_emails: Tuple[str, ...]
+    directory_source: str
+
+
+@dataclass(frozen=True)
+class TenantRegistry:
+    """テナント一覧とホスト名からの逆引き（先頭のテナントが既定）"""
+
+    tenants: Dict[str, Tenant]
+    by_host: Dict[str, Tenant]
+
+    @property
+    def default(self) -> Tenant:
+        return next(iter(self.tenants.values()))
+
+    @property
+    def single(self) -> bool:
+        return len(self.tenants) == 1
+
+    def get(self, tenant_id: Optional[str]) -> Tenant:
+        """IDでテナントを取得（None の場合は既定のテナント）"""
+        if tenant_id is None:
+            return self.default
+        try:
+            return self.tenants[tenant_id]
+        except KeyError:
+            raise UnknownTenantError(tenant_id) from None
+
+    def for_host(self, host: Optional[str]) -> Optional[Tenant]:
+        """Hostヘッダーからテナントを取得（ポートは無視）"""
+        if not host:
+            return None
+        return self.by_host.get(host.rsplit(":", 1)[0].lower())
+
+
+def _tenant_from_entry(entry: dict) -> Tenant:
+    """設定ファイルの1エントリからテナントを作成（未指定の項目はSettingsの値）"""
+    url = make_url(settings.database_url).set(
+        username=entry.get("db_user", settings.DB_USER),
+        password=entry.get("db_password", settings.DB_PASSWORD),
+        host=entry.get("db_host", settings.DB_HOST),
+        port=entry.get("db_port", settings.DB_PORT),
+        database=entry.get("db_name", settings.DB_NAME),
+    )
+    return Tenant(
+        id=entry["id"],
+        hosts=tuple(host.lower() for host in entry.get("hosts", [])),
+        database_url=url.render_as_string(hide_password=False),
+        # プロセス全体の接続数の上限を守るため、Settingsの値より大きくはしない
+        pool_size=min(entry.get("pool_size", settings.DB_POOL_SIZE), settings.DB_POOL_SIZE),
+        max_overflow=min(
+            entry.get("max_overflow", settings.DB_MAX_OVERFLOW), settings.DB_MAX_OVERFLOW
+        ),
+        google_client_id=entry.get("google_client_id", settings.GOOGLE_CLIENT_ID),
+        google_client_secret=entry.get("google_client_secret", settings.GOOGLE_CLIENT_SECRET),
+        google_redirect_uri=entry.get("google_redirect_uri", settings.GOOGLE_REDIRECT_URI),
+        frontend_url=entry.get("frontend_url", settings.cors_origins_list[0]),
+        cookie_domain=entry.get("cookie_domain", settings.COOKIE_DOMAIN),
+        initial_admin_emails=tuple(
+            entry.get("initial_admin_emails", settings.initial_admin_emails_list)
+        ),
+        directory_source=entry.get("directory_source", settings.DIRECTORY_SOURCE),
+    )
+
+
+@lru_cache
+def get_tenant_registry() -> TenantRegistry:
+    """テナント設定を読み込み（プロセス内で1回）
+
+    TENANTS_FILE が未設定の場合は、Settingsの値のみを持つ単一テナントとして動作する。
+    """
+    if settings.TENANTS_FILE:
+        with open(settings.TENANTS_FILE, encoding="utf-8") as f:
+            entries = json.load(f)["tenants"]
+        if not entries:
+            raise ValueError(f"{settings.TENANTS_FILE} にテナントがありません")
+    else:
+        entries = [{"id": DEFAULT_TENANT_ID}]
+
+    tenants: Dict[str, Tenant] = {}
+    by_host: Dict[str, Tenant] = {}
+    for entry in entries:
+        tenant = _tenant_from_entry(entry)
+        if tenant.id in tenants:
+            raise ValueError(f"テナントID '{tenant.id}' が重複しています")
+        tenants[tenant.id] = tenant
+        for host in tenant.hosts:
+            if host in by_host:
+                raise ValueError(f"ホスト '{host}' が複数のテナントに設定されています")
+            by_host[host] = tenant
+    return TenantRegistry(tenants=tenants, by_host=by_host)
+
+
+# 処理中のリクエスト（またはバックグラウンド処理）のテナント
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+
+def current_tenant() -> Tenant:
+    """現在のテナント（特定できない場合は UnknownTenantError）"""
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant
+    registry = get_tenant_registry()
+    if registry.single:
+        return registry.default
+    raise UnknownTenantError("tenant is not resolved")
+
+
+@contextmanager
+def use_tenant(tenant: Tenant) -> Iterator[Tenant]:
+    """指定テナントとして処理を実行（バックグラウンド処理・CLI用）"""
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
+
+
+def _token_from_scope(scope: Scope) -> Optional[str]:
+    """Cookie または Authorization ヘッダーからアクセストークンを取得"""
+    conn = HTTPConnection(scope)
+    token = conn.cookies.get("access_token")
+    if token:
+        return token
+    scheme, _, credentials = conn.headers.get("authorization", "").partition(" ")
+    return credentials if scheme.lower() == "bearer" and credentials else None
+
+
+def resolve_tenant(scope: Scope) -> Optional[Tenant]:
+    """リクエストのテナントを特定
+
+    Hostヘッダーを優先し、一致しない場合（共通のAPIホスト等）は
+    アクセストークンの tid クレームを使う。
+    """
+    registry = get_tenant_registry()
+    if registry.single:
+        return registry.default
+
+    host = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"host"), None)
+    tenant = registry.for_host(host)
+    if tenant is not None:
+        return tenant
+
+    token = _token_from_scope(scope)
+    if token:
+        from app.core.security import verify_access_token
+
+        payload = verify_access_token(token)
+        if payload and payload.get("tid") in registry.tenants:
+            return registry.tenants[payload["tid"]]
+    return None
+
+
+class TenantMiddleware:
+    """リクエストのテナントを特定し、処理中はコンテキストに設定するASGIミドルウェア
+
+    特定できない場合もリクエストは通し、DBやテナント設定を使う時点で
+    UnknownTenantError（404）とする（ヘルスチェック・JWKS等はテナント非依存）。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _current_tenant.set(resolve_tenant(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_tenant.reset(token)
@@ -1,4 +1,9 @@
 from app.models.user import User
 from app.models.auth_log import AuthLog
+from app.models.user_agent import UserAgent
+from app.models.auth_log_counter import AuthLogCounter
+from app.models.purge_job import PurgeJob
+from app.models.principal import Principal
+from app.models.sync_state import SyncState
 
-__all__ = ["User", "AuthLog"]
+__all__ = ["User", "AuthLog", "UserAgent", "AuthLogCounter", "PurgeJob", "Principal", "SyncState"]
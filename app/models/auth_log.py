@@ -1,13 +1,9 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
-from sqlalchemy.dialects.mysql import CHAR
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer
+from sqlalchemy.ext.associationproxy import association_proxy
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
-import uuid
-
-
-def generate_uuid():
-    """UUID文字列を生成（ハイフンなし）"""
-    return uuid.uuid4().hex
+from app.models.types import HexUUID, generate_uuid7
 
 
 class AuthLog(Base):
@@ -15,15 +11,19 @@ class AuthLog(Base):
 
     __tablename__ = "auth_logs"
 
-    id = Column(CHAR(32), primary_key=True, default=generate_uuid)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid7)
     user_id = Column(
-        CHAR(32), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
+        HexUUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
     timestamp = Column(DateTime, server_default=func.now(), index=True)
     event_type = Column(String(50), nullable=False, index=True)
     ip_address = Column(String(45), nullable=True)
-    user_agent = Column(Text, nullable=True)
+    user_agent_id = Column(Integer, ForeignKey("user_agents.id"), nullable=True)
     error_code = Column(String(50), nullable=True)
 
+    # User-Agent文字列は辞書テーブルから常に結合して解決する
+    user_agent_entry = relationship("UserAgent", lazy="joined")
+    user_agent = association_proxy("user_agent_entry", "user_agent")
+
     def __repr__(self):
         return f"<AuthLog(id={self.id}, event_type={self.event_type}, user_id={self.user_id})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, BigInteger, SmallInteger
+from app.core.database import Base
+
+
+class AuthLogCounter(Base):
+    """イベント種別ごとの認証ログ件数（ログ書き込み時にランダムな分割行へ加算し、読み取り時に合計）"""
+
+    __tablename__ = "auth_log_counters"
+
+    event_type = Column(String(50), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True, default=0)
+    row_count = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<AuthLogCounter(event_type={self.event_type}, shard={self.shard}, "
+            f"row_count={self.row_count})>"
+        )
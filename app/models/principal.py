@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Any, Optional
+
+
+class Principal:
+    """認証済みユーザーの軽量な読み取り専用表現
+
+    ORMのUserと異なり、属性の計装やセッションへの紐付けを持たないため
+    生成コストが小さく、リクエストをまたいでキャッシュできる。
+    更新が必要な処理では UserRepository から User を取得すること。
+    """
+
+    __slots__ = ("id", "email", "role", "name", "student_id", "class_name", "updated_at", "version")
+
+    id: str
+    email: str
+    role: int
+    name: Optional[str]
+    student_id: Optional[str]
+    class_name: Optional[str]
+    updated_at: Optional[datetime]
+    version: int
+
+    def __init__(
+        self,
+        id: str,
+        email: str,
+        role: int,
+        name: Optional[str],
+        student_id: Optional[str],
+        class_name: Optional[str],
+        updated_at: Optional[datetime],
+        version: int = 1,
+    ):
+        setter = object.__setattr__
+        setter(self, "id", id)
+        setter(self, "email", email)
+        setter(self, "role", role)
+        setter(self, "name", name)
+        setter(self, "student_id", student_id)
+        setter(self, "class_name", class_name)
+        setter(self, "updated_at", updated_at)
+        setter(self, "version", version)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Principal is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Principal is immutable")
+
+    def __repr__(self):
+        return f"<Principal(id={self.id}, email={self.email}, role={self.role})>"
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.models.types import HexUUID, generate_uuid7
+
+
+class PurgeJob(Base):
+    """ユーザー削除ジョブ
+
+    ユーザーは依頼時に論理削除し、認証ログの匿名化・切り離しと
+    ユーザー行の物理削除はバックグラウンドでバッチごとにコミットしながら行う。
+    """
+
+    __tablename__ = "purge_jobs"
+
+    # 状態
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    id = Column(HexUUID, primary_key=True, default=generate_uuid7)
+    # 削除完了後も参照できるよう外部キーにはしない
+    user_id = Column(HexUUID, nullable=False, index=True)
+    requested_by = Column(HexUUID, nullable=True)
+    status = Column(String(20), nullable=False, default=PENDING, index=True)
+    logs_processed = Column(Integer, nullable=False, default=0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(String(255), nullable=True)  # 直近の失敗内容
+    # 処理中のプロセスとリース期限（期限切れのジョブは他プロセス・再起動後に再開）
+    lease_owner = Column(String(64), nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<PurgeJob(id={self.id}, user_id={self.user_id}, status={self.status})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SyncState(Base):
+    """外部ディレクトリ（名簿）との同期状態（前回同期時の差分トークン）"""
+
+    __tablename__ = "sync_states"
+
+    source = Column(String(255), primary_key=True)
+    token = Column(String(255), nullable=True)
+    synced_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SyncState(source={self.source}, token={self.token})>"
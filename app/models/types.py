@@ -0,0 +1,57 @@
+import os
+import time
+import uuid
+from typing import Optional
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.mysql import BINARY
+
+
+def generate_uuid7() -> str:
+    """UUIDv7文字列を生成（ハイフンなし）
+
+    先頭48ビットがUnixミリ秒のため、生成順にほぼ昇順となり
+    InnoDBのクラスタインデックスへの挿入が末尾追記になる。
+    """
+    unix_ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = rand >> 68  # 12ビット
+    rand_b = rand & ((1 << 62) - 1)  # 62ビット
+
+    value = (unix_ts_ms & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76  # version
+    value |= rand_a << 64
+    value |= 0b10 << 62  # variant
+    value |= rand_b
+    return f"{value:032x}"
+
+
+def uuid7_lower_bound(unix_ts_ms: int) -> str:
+    """指定時刻（Unixミリ秒）以降に生成されたUUIDv7より小さい最小値
+
+    `id > uuid7_lower_bound(t)` で、主キー範囲検索として時刻以降の行を取得できる。
+    """
+    return f"{(unix_ts_ms & ((1 << 48) - 1)) << 80:032x}"
+
+
+class HexUUID(TypeDecorator):
+    """UUID型（DBではBINARY(16)、アプリケーションでは32桁の16進文字列）
+
+    APIやJWTに現れるIDは従来通り16進文字列のまま扱える。
+    不正な文字列はNULLとしてバインドされるため、検索では一致なしとなる。
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> Optional[bytes]:
+        if value is None or isinstance(value, bytes):
+            return value
+        try:
+            return uuid.UUID(hex=value).bytes
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    def process_result_value(self, value, dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return bytes(value).hex()
@@ -1,13 +1,7 @@
 from sqlalchemy import Column, String, Integer, DateTime
-from sqlalchemy.dialects.mysql import CHAR
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
-import uuid
-
-
-def generate_uuid():
-    """UUID文字列を生成（ハイフンなし）"""
-    return uuid.uuid4().hex
+from app.models.types import HexUUID, generate_uuid7
 
 
 class User(Base):
@@ -15,7 +9,7 @@ class User(Base):
 
     __tablename__ = "users"
 
-    id = Column(CHAR(32), primary_key=True, default=generate_uuid)
+    id = Column(HexUUID, primary_key=True, default=generate_uuid7)
     email = Column(String(255), unique=True, nullable=False, index=True)
     role = Column(Integer, nullable=False, index=True)  # 0:生徒, 1:教員, 2:管理者
     google_sub = Column(String(255), unique=True, nullable=True)
@@ -24,6 +18,15 @@ class User(Base):
     class_name = Column(String(50), nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    last_login_at = Column(DateTime, nullable=True, index=True)
+    login_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # 論理削除日時（削除ジョブの完了時に行ごと削除される）
+    deleted_at = Column(DateTime, nullable=True, index=True)
+    # 行の版数（UPDATEのたびに加算、ETagに使用）
+    # updated_at は秒精度のため同じ秒内の更新を区別できない
+    version = Column(
+        Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1")
+    )
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email}, role={self.role})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Text
+from sqlalchemy.dialects.mysql import BINARY
+from app.core.database import Base
+
+
+class UserAgent(Base):
+    """User-Agent辞書モデル（auth_logsからはIDで参照）"""
+
+    __tablename__ = "user_agents"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ua_hash = Column(BINARY(32), unique=True, nullable=False)  # SHA-256
+    user_agent = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<UserAgent(id={self.id}, user_agent={self.user_agent[:40]!r})>"
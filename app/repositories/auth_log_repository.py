@@ -1,7 +1,64 @@
+import random
+from collections import Counter
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
-from typing import Optional, List
+from sqlalchemy import select, desc, func, insert as orm_insert
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List, Sequence
+from app.core.audit_spool import audit_spool
+from app.core.config import settings
+from app.core.pubsub import auth_log_events
+from app.core.tenancy import current_tenant
 from app.models.auth_log import AuthLog
+from app.models.types import generate_uuid7
+from app.models.user import User
+from app.models.user_agent import UserAgent
+from app.models.auth_log_counter import AuthLogCounter
+from app.repositories.base import Page, fetch_page
+from app.repositories.counting import CountMode, CountResult, count_with_mode
+from app.repositories.user_agent_repository import UserAgentRepository
+
+
+def auth_log_event(
+    id: str,
+    user_id: Optional[str],
+    timestamp: datetime,
+    event_type: str,
+    ip_address: Optional[str],
+    user_agent: Optional[str],
+    error_code: Optional[str],
+) -> dict:
+    """配信用の認証ログイベント（AuthLogResponse と同じ形）"""
+    return {
+        "id": id,
+        "user_id": user_id,
+        "timestamp": timestamp.isoformat() if timestamp else None,
+        "event_type": event_type,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "error_code": error_code,
+    }
+
+
+def publish_auth_log(log: AuthLog) -> None:
+    """コミット済みの認証ログを購読者へ配信"""
+    tenant_id = current_tenant().id
+    if not auth_log_events.subscriber_count(tenant_id):
+        return
+    auth_log_events.publish(
+        tenant_id,
+        log.id,
+        auth_log_event(
+            log.id,
+            log.user_id,
+            log.timestamp,
+            log.event_type,
+            log.ip_address,
+            log.user_agent,
+            log.error_code,
+        ),
+    )
 
 
 class AuthLogRepository:
@@ -9,6 +66,7 @@ class AuthLogRepository:
 
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.user_agent_repo = UserAgentRepository(db)
 
     async def create(
         self,
@@ -18,17 +76,54 @@ class AuthLogRepository:
         user_agent: Optional[str] = None,
         error_code: Optional[str] = None,
     ) -> AuthLog:
-        """認証ログを作成"""
+        """認証ログを作成（User-Agentは辞書IDとして保存）
+
+        スプール有効時は、セッションの未コミット分をコミットしたうえで
+        ログをローカルスプールに追記する（DBへの書き込みは非同期に行われる）。
+        スプールは全テナント共通のため、イベントには送出先のテナントIDを含める。
+        """
+        if audit_spool.is_open:
+            if self.db.in_transaction():
+                await self.db.commit()
+            event = {
+                "tenant_id": current_tenant().id,
+                "id": generate_uuid7(),
+                "user_id": user_id,
+                "event_type": event_type,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "error_code": error_code,
+                # 直接登録時の NOW()（UTCに固定したセッション・秒精度）と同じ基準で記録する
+                "timestamp": datetime.utcnow().replace(microsecond=0).isoformat(),
+            }
+            await audit_spool.append(event)
+            return AuthLog(
+                id=event["id"],
+                user_id=user_id,
+                event_type=event_type,
+                ip_address=ip_address,
+                error_code=error_code,
+                timestamp=datetime.fromisoformat(event["timestamp"]),
+            )
+
+        user_agent_id = None
+        if user_agent:
+            user_agent_id = await self.user_agent_repo.get_or_create_id(user_agent)
+
         auth_log = AuthLog(
             user_id=user_id,
             event_type=event_type,
             ip_address=ip_address,
-            user_agent=user_agent,
+            user_agent_id=user_agent_id,
             error_code=error_code,
         )
         self.db.add(auth_log)
+        await self._increment_counter(event_type)
         await self.db.commit()
+        if user_agent_id is not None:
+            self.user_agent_repo.remember(user_agent, user_agent_id)
         await self.db.refresh(auth_log)
+        publish_auth_log(auth_log)
         return auth_log
 
     async def get_all(
@@ -42,6 +137,62 @@ class AuthLogRepository:
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        event_type: Optional[str] = None,
+        include_total: bool = True,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """認証ログ一覧と総数を1クエリで取得
+
+        fields を指定した場合はそのカラムのみをSELECTし、各行を dict で返す
+        （user_agent を含まない場合は User-Agent辞書を結合しない）。
+        """
+        if fields:
+            query = select(
+                *(
+                    UserAgent.user_agent.label("user_agent")
+                    if name == "user_agent"
+                    else getattr(AuthLog, name)
+                    for name in fields
+                )
+            ).select_from(AuthLog)
+            if "user_agent" in fields:
+                query = query.outerjoin(UserAgent, AuthLog.user_agent_id == UserAgent.id)
+        else:
+            query = select(AuthLog)
+        if event_type:
+            query = query.where(AuthLog.event_type == event_type)
+        query = query.order_by(desc(AuthLog.timestamp))
+        return await fetch_page(
+            self.db, query, skip, limit, include_total, as_mappings=bool(fields)
+        )
+
+    async def get_since(
+        self,
+        after_id: str,
+        since: datetime,
+        event_type: Optional[str] = None,
+        limit: int = 1000,
+    ) -> List[AuthLog]:
+        """指定IDより後、かつ指定日時以降の認証ログをID順（ほぼ発生順）に取得
+
+        UUIDv7導入前の行のID（UUIDv4）は時刻順ではなく大半が新しいIDより大きいため、
+        IDの範囲に加えて timestamp（インデックス）で対象を直近の行に限定する。
+        """
+        query = select(AuthLog).where(AuthLog.id > after_id, AuthLog.timestamp >= since)
+        if event_type:
+            query = query.where(AuthLog.event_type == event_type)
+        result = await self.db.execute(query.order_by(AuthLog.id).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_timestamp(self, log_id: str) -> Optional[datetime]:
+        """認証ログの発生日時を取得（存在しない場合はNone）"""
+        result = await self.db.execute(select(AuthLog.timestamp).where(AuthLog.id == log_id))
+        return result.scalar()
+
     async def count(self, event_type: Optional[str] = None) -> int:
         """認証ログの総数を取得"""
         query = select(func.count(AuthLog.id))
@@ -49,3 +200,107 @@ class AuthLogRepository:
             query = query.where(AuthLog.event_type == event_type)
         result = await self.db.execute(query)
         return result.scalar() or 0
+
+    async def insert_spooled(self, events: List[dict]) -> int:
+        """スプールから送出されたイベントを一括登録（冪等）
+
+        既に登録済みのIDはスキップするため、同じイベントを再送しても重複しない。
+        送出までの間に削除されたユーザーのIDは、ON DELETE SET NULLと同様にNULLにする。
+
+        Returns:
+            新規に登録した件数
+        """
+        ids = [event["id"] for event in events]
+        result = await self.db.execute(select(AuthLog.id).where(AuthLog.id.in_(ids)))
+        existing = set(result.scalars().all())
+        new_events = [event for event in events if event["id"] not in existing]
+        if not new_events:
+            return 0
+
+        try:
+            await self._insert_events(new_events)
+        except IntegrityError:
+            await self.db.rollback()
+            user_ids = {e["user_id"] for e in new_events if e.get("user_id")}
+            result = await self.db.execute(select(User.id).where(User.id.in_(user_ids)))
+            alive = set(result.scalars().all())
+            for event in new_events:
+                if event.get("user_id") not in alive:
+                    event["user_id"] = None
+            await self._insert_events(new_events)
+        return len(new_events)
+
+    async def _insert_events(self, events: List[dict]) -> None:
+        """イベントを1トランザクションで登録しコミット"""
+        user_agent_ids = {}
+        for event in events:
+            user_agent = event.get("user_agent")
+            if user_agent and user_agent not in user_agent_ids:
+                user_agent_ids[user_agent] = await self.user_agent_repo.get_or_create_id(
+                    user_agent
+                )
+
+        rows = [
+            {
+                "id": event["id"],
+                "user_id": event.get("user_id"),
+                "event_type": event["event_type"],
+                "ip_address": event.get("ip_address"),
+                "user_agent_id": user_agent_ids.get(event.get("user_agent")),
+                "error_code": event.get("error_code"),
+                "timestamp": datetime.fromisoformat(event["timestamp"]),
+            }
+            for event in events
+        ]
+        await self.db.execute(orm_insert(AuthLog), rows)
+        for event_type, n in Counter(event["event_type"] for event in events).items():
+            await self._increment_counter(event_type, n)
+        await self.db.commit()
+        for user_agent, user_agent_id in user_agent_ids.items():
+            self.user_agent_repo.remember(user_agent, user_agent_id)
+        tenant_id = current_tenant().id
+        if not auth_log_events.subscriber_count(tenant_id):
+            return
+        for row, event in zip(rows, events):
+            auth_log_events.publish(
+                tenant_id,
+                row["id"],
+                auth_log_event(
+                    row["id"],
+                    row["user_id"],
+                    row["timestamp"],
+                    row["event_type"],
+                    row["ip_address"],
+                    event.get("user_agent"),
+                    row["error_code"],
+                ),
+            )
+
+    async def _increment_counter(self, event_type: str, n: int = 1) -> None:
+        """イベント種別ごとの件数カウンタを加算（コミットは呼び出し側）
+
+        同時に書き込むトランザクションが同じ行のロックを待たないよう、加算先の分割行はランダムに選ぶ。
+        """
+        shard = random.randrange(max(settings.AUTH_LOG_COUNTER_SHARDS, 1))
+        stmt = insert(AuthLogCounter).values(event_type=event_type, shard=shard, row_count=n)
+        stmt = stmt.on_duplicate_key_update(row_count=AuthLogCounter.row_count + n)
+        await self.db.execute(stmt)
+
+    async def approximate_count(self, event_type: Optional[str] = None) -> int:
+        """カウンタ行（全分割の合計）から認証ログの概算件数を取得"""
+        query = select(func.coalesce(func.sum(AuthLogCounter.row_count), 0))
+        if event_type:
+            query = query.where(AuthLogCounter.event_type == event_type)
+        result = await self.db.execute(query)
+        return int(result.scalar() or 0)
+
+    async def count_by_mode(
+        self, mode: CountMode, event_type: Optional[str] = None
+    ) -> CountResult:
+        """指定モード（exact / cached / approximate）で認証ログの件数を取得"""
+        return await count_with_mode(
+            mode,
+            cache_key=("auth_logs", event_type),
+            exact=lambda: self.count(event_type=event_type),
+            approximate=lambda: self.approximate_count(event_type=event_type),
+        )
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Generic, List, Optional, TypeVar
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """ページング結果（include_total=False の場合 total は None）"""
+
+    items: List[T]
+    total: Optional[int]
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    skip: int = 0,
+    limit: int = 100,
+    include_total: bool = True,
+    as_mappings: bool = False,
+) -> Page:
+    """1ページ分の行と総件数を1往復で取得
+
+    総件数はウィンドウ集約 COUNT(*) OVER () で同じSELECTに含める。
+    skipが末尾を超えて行が返らなかった場合のみ、件数を別クエリで取得する。
+    as_mappings=True の場合、カラムを指定したSELECTの各行を dict で返す。
+    """
+    if not include_total:
+        result = await db.execute(query.offset(skip).limit(limit))
+        if as_mappings:
+            return Page(items=[dict(row) for row in result.mappings()], total=None)
+        return Page(items=list(result.scalars().all()), total=None)
+
+    total_column = func.count().over().label("_total")
+    result = await db.execute(query.add_columns(total_column).offset(skip).limit(limit))
+    rows = result.all()
+    if rows:
+        if as_mappings:
+            items = [
+                {key: value for key, value in row._mapping.items() if key != "_total"}
+                for row in rows
+            ]
+        else:
+            items = [row[0] for row in rows]
+        return Page(items=items, total=rows[0]._total)
+    if skip == 0:
+        return Page(items=[], total=0)
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    total = (await db.execute(count_query)).scalar() or 0
+    return Page(items=[], total=total)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Hashable
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.tenancy import current_tenant
+
+
+class CountMode(str, Enum):
+    """件数取得モード"""
+
+    EXACT = "exact"  # 毎回COUNTを実行
+    CACHED = "cached"  # COUNT結果をTTL付きでキャッシュ
+    APPROXIMATE = "approximate"  # 集計済みカウンタ・統計情報から取得
+
+
+@dataclass
+class CountResult:
+    """件数取得結果"""
+
+    value: int
+    exact: bool
+
+
+# (テナントID, (テーブル, 絞り込み条件)) -> 件数
+_count_cache = TTLCache(ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS, maxsize=256)
+
+
+async def count_with_mode(
+    mode: CountMode,
+    cache_key: Hashable,
+    exact: Callable[[], Awaitable[int]],
+    approximate: Callable[[], Awaitable[int]],
+) -> CountResult:
+    """指定モードで件数を取得
+
+    CACHEDでキャッシュにヒットした場合は、取得時点以降の増減を
+    反映していないため exact=False として返す。
+    """
+    if mode is CountMode.APPROXIMATE:
+        return CountResult(value=await approximate(), exact=False)
+
+    if mode is CountMode.CACHED:
+        cache_key = (current_tenant().id, cache_key)
+        cached = _count_cache.get(cache_key)
+        if cached is not None:
+            return CountResult(value=cached, exact=False)
+        value = await exact()
+        _count_cache.set(cache_key, value)
+        return CountResult(value=value, exact=True)
+
+    return CountResult(value=await exact(), exact=True)
@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func, or_
+from typing import Optional, List, Sequence
+from app.models.auth_log import AuthLog
+from app.models.purge_job import PurgeJob
+
+
+class PurgeJobRepository:
+    """ユーザー削除ジョブリポジトリ"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def add_many(self, user_ids: Sequence[str], requested_by: Optional[str]) -> List[PurgeJob]:
+        """ジョブを登録（コミットは呼び出し側、論理削除と同一トランザクション）"""
+        jobs = [
+            PurgeJob(user_id=user_id, requested_by=requested_by, status=PurgeJob.PENDING)
+            for user_id in user_ids
+        ]
+        self.db.add_all(jobs)
+        return jobs
+
+    async def get_by_id(self, job_id: str) -> Optional[PurgeJob]:
+        """IDでジョブを取得"""
+        result = await self.db.execute(select(PurgeJob).where(PurgeJob.id == job_id))
+        return result.scalar_one_or_none()
+
+    async def get_runnable_ids(self, limit: int) -> List[str]:
+        """処理待ち・リース切れのジョブIDを古い順に取得"""
+        now = datetime.utcnow()
+        result = await self.db.execute(
+            select(PurgeJob.id)
+            .where(
+                PurgeJob.status.in_([PurgeJob.PENDING, PurgeJob.RUNNING]),
+                or_(PurgeJob.lease_until.is_(None), PurgeJob.lease_until < now),
+            )
+            .order_by(PurgeJob.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """ジョブのリースを取得（他プロセスが処理中の場合はFalse）"""
+        now = datetime.utcnow()
+        result = await self.db.execute(
+            update(PurgeJob)
+            .where(
+                PurgeJob.id == job_id,
+                PurgeJob.status.in_([PurgeJob.PENDING, PurgeJob.RUNNING]),
+                or_(
+                    PurgeJob.lease_until.is_(None),
+                    PurgeJob.lease_until < now,
+                    PurgeJob.lease_owner == owner,
+                ),
+            )
+            .values(
+                status=PurgeJob.RUNNING,
+                attempts=PurgeJob.attempts + 1,
+                lease_owner=owner,
+                lease_until=now + timedelta(seconds=lease_seconds),
+                started_at=func.coalesce(PurgeJob.started_at, now),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def detach_logs_batch(
+        self, job_id: str, user_id: str, batch_size: int, owner: str, lease_seconds: float
+    ) -> Optional[int]:
+        """ユーザーの認証ログを1バッチ分匿名化・切り離してコミット
+
+        user_id・IPアドレス・User-Agentを消去する。進捗とリース延長も同一トランザクションで記録する。
+
+        Returns:
+            処理した行数（リースが切れて他のプロセスに移っていた場合はロールバックしてNone）
+        """
+        result = await self.db.execute(
+            update(AuthLog)
+            .where(AuthLog.user_id == user_id)
+            .values(user_id=None, ip_address=None, user_agent_id=None)
+            .with_dialect_options(mysql_limit=batch_size)
+            .execution_options(synchronize_session=False)
+        )
+        processed = result.rowcount
+        lease = await self.db.execute(
+            update(PurgeJob)
+            .where(PurgeJob.id == job_id, PurgeJob.lease_owner == owner)
+            .values(
+                logs_processed=PurgeJob.logs_processed + processed,
+                lease_until=datetime.utcnow() + timedelta(seconds=lease_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if lease.rowcount == 0:
+            await self.db.rollback()
+            return None
+        await self.db.commit()
+        return processed
+
+    async def finish(self, job_id: str) -> None:
+        """ジョブを完了にしてリースを解放（コミットは呼び出し側）"""
+        await self.db.execute(
+            update(PurgeJob)
+            .where(PurgeJob.id == job_id)
+            .values(
+                status=PurgeJob.COMPLETED,
+                error=None,
+                lease_owner=None,
+                lease_until=None,
+                finished_at=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def fail(
+        self, job_id: str, error: str, max_attempts: int, retry_after_seconds: float
+    ) -> None:
+        """失敗を記録してコミット
+
+        試行回数が上限未満の場合は retry_after_seconds 後に再試行され、
+        上限に達した場合は失敗として終了する（ユーザーは論理削除のまま残る）。
+        """
+        now = datetime.utcnow()
+        job = await self.get_by_id(job_id)
+        job.error = error[:255]
+        job.lease_owner = None
+        if job.attempts >= max_attempts:
+            job.status = PurgeJob.FAILED
+            job.lease_until = None
+            job.finished_at = now
+        else:
+            job.lease_until = now + timedelta(seconds=retry_after_seconds)
+        await self.db.commit()
@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from sqlalchemy.dialects.mysql import insert
+from typing import Optional
+from app.models.sync_state import SyncState
+
+
+class SyncStateRepository:
+    """ディレクトリ同期状態リポジトリ"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_token(self, source: str) -> Optional[str]:
+        """前回同期時の差分トークンを取得（未同期の場合は None）"""
+        result = await self.db.execute(select(SyncState.token).where(SyncState.source == source))
+        return result.scalar_one_or_none()
+
+    async def save_token(self, source: str, token: Optional[str]) -> None:
+        """差分トークンを保存してコミット"""
+        stmt = insert(SyncState).values(source=source, token=token)
+        stmt = stmt.on_duplicate_key_update(token=stmt.inserted.token, synced_at=func.now())
+        await self.db.execute(stmt)
+        await self.db.commit()
@@ -0,0 +1,45 @@
+import hashlib
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.tenancy import current_tenant
+from app.models.user_agent import UserAgent
+
+# (テナントID, User-Agentハッシュ) -> ID（コミット済みのもののみ保持）
+_user_agent_ids = LRUCache(maxsize=settings.USER_AGENT_CACHE_SIZE)
+
+
+def hash_user_agent(user_agent: str) -> bytes:
+    """User-Agent文字列の辞書キー（SHA-256）"""
+    return hashlib.sha256(user_agent.encode("utf-8")).digest()
+
+
+class UserAgentRepository:
+    """User-Agent辞書リポジトリ"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_or_create_id(self, user_agent: str) -> int:
+        """User-Agent文字列に対応するIDを取得（未登録なら登録）
+
+        キャッシュミス時は INSERT ... ON DUPLICATE KEY UPDATE の1往復で
+        既存IDの取得と新規登録を兼ねる。コミットは呼び出し側で行う。
+        """
+        ua_hash = hash_user_agent(user_agent)
+        cached: Optional[int] = _user_agent_ids.get((current_tenant().id, ua_hash))
+        if cached is not None:
+            return cached
+
+        stmt = insert(UserAgent).values(ua_hash=ua_hash, user_agent=user_agent)
+        stmt = stmt.on_duplicate_key_update(id=func.last_insert_id(UserAgent.id))
+        result = await self.db.execute(stmt)
+        return result.lastrowid
+
+    @staticmethod
+    def remember(user_agent: str, user_agent_id: int) -> None:
+        """コミット済みのIDをキャッシュに登録"""
+        _user_agent_ids.set((current_tenant().id, hash_user_agent(user_agent)), user_agent_id)
@@ -1,7 +1,78 @@
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import select, update, delete, or_, bindparam, func
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Optional, List, Dict, Sequence, AsyncIterator, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.rate_limit import login_email_failures, tenant_limiter_key
+from app.core.tenancy import current_tenant
+from app.models.principal import Principal
+from app.models.purge_job import PurgeJob
 from app.models.user import User
+from app.repositories.base import Page, fetch_page
+from app.repositories.purge_job_repository import PurgeJobRepository
+
+
+# 固定形のホットクエリは事前構築しておき、実行時はパラメータのみ渡す。
+# 同一の文オブジェクトを再利用するため、文の構築とキャッシュキー生成が呼び出しごとに発生しない。
+# 論理削除済み（削除ジョブ処理中）のユーザーは存在しないものとして扱う。
+_NOT_DELETED = User.deleted_at.is_(None)
+_SELECT_BY_ID = select(User).where(User.id == bindparam("user_id"), _NOT_DELETED)
+_SELECT_BY_EMAIL = select(User).where(User.email == bindparam("email"), _NOT_DELETED)
+_SELECT_BY_EMAIL_ANY = select(User).where(User.email == bindparam("email"))
+_SELECT_BY_GOOGLE_SUB = select(User).where(
+    User.google_sub == bindparam("google_sub"), _NOT_DELETED
+)
+# 認証用の射影（ORMエンティティを生成せず、必要な列のみ取得）
+_SELECT_PRINCIPAL = select(
+    User.id,
+    User.email,
+    User.role,
+    User.name,
+    User.student_id,
+    User.class_name,
+    User.updated_at,
+    User.version,
+).where(User.id == bindparam("user_id"), _NOT_DELETED)
+
+# (テナントID, ユーザーID) -> Principal
+# このプロセスでの更新・削除時に無効化し、他プロセス分はTTLで反映
+_principal_cache = TTLCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS, maxsize=settings.PRINCIPAL_CACHE_SIZE
+)
+
+
+def get_cached_principal(user_id: str) -> Optional[Principal]:
+    """キャッシュ済みのPrincipalを取得（DBには問い合わせない）"""
+    return _principal_cache.get((current_tenant().id, user_id))
+
+
+def invalidate_principals(user_ids: Sequence[str]) -> None:
+    """Principalキャッシュから指定ユーザーを削除"""
+    tenant_id = current_tenant().id
+    for user_id in user_ids:
+        _principal_cache.pop((tenant_id, user_id))
+
+
+# (テナントID, メールアドレス) -> True（未登録と確認済み）
+# ログイン失敗の繰り返しでDBを検索しないための否定キャッシュ。このプロセスでの作成・更新時に無効化
+_unregistered_emails = TTLCache(
+    ttl_seconds=settings.UNREGISTERED_EMAIL_CACHE_TTL_SECONDS,
+    maxsize=settings.UNREGISTERED_EMAIL_CACHE_SIZE,
+)
+
+
+async def forget_unregistered(emails: Sequence[str]) -> None:
+    """否定キャッシュとログイン失敗の回数から指定メールアドレスを削除
+
+    登録前に失敗を重ねたメールアドレスでも、登録直後からログインできるようにする。
+    """
+    tenant_id = current_tenant().id
+    for email in emails:
+        _unregistered_emails.pop((tenant_id, email))
+    await login_email_failures.reset_many([tenant_limiter_key(email) for email in emails])
 
 
 class UserRepository:
@@ -12,43 +83,340 @@ class UserRepository:
 
     async def get_by_id(self, user_id: str) -> Optional[User]:
         """IDでユーザーを取得"""
-        result = await self.db.execute(select(User).where(User.id == user_id))
+        result = await self.db.execute(_SELECT_BY_ID, {"user_id": user_id})
         return result.scalar_one_or_none()
 
-    async def get_by_email(self, email: str) -> Optional[User]:
-        """メールアドレスでユーザーを取得"""
-        result = await self.db.execute(select(User).where(User.email == email))
+    async def get_principal(self, user_id: str) -> Optional[Principal]:
+        """IDでPrincipalを取得（キャッシュ優先）"""
+        principal = get_cached_principal(user_id)
+        if principal is not None:
+            return principal
+
+        result = await self.db.execute(_SELECT_PRINCIPAL, {"user_id": user_id})
+        row = result.one_or_none()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        _principal_cache.set((current_tenant().id, user_id), principal)
+        return principal
+
+    async def get_by_ids(self, user_ids: Sequence[str]) -> Dict[str, User]:
+        """複数IDのユーザーを1回のIN検索で取得"""
+        ids = list(dict.fromkeys(user_ids))
+        if not ids:
+            return {}
+        result = await self.db.execute(select(User).where(User.id.in_(ids), _NOT_DELETED))
+        return {user.id: user for user in result.scalars().all()}
+
+    async def get_by_email(self, email: str, include_deleted: bool = False) -> Optional[User]:
+        """メールアドレスでユーザーを取得（include_deleted=True で削除処理中のユーザーも対象）"""
+        stmt = _SELECT_BY_EMAIL_ANY if include_deleted else _SELECT_BY_EMAIL
+        result = await self.db.execute(stmt, {"email": email})
         return result.scalar_one_or_none()
 
+    async def get_by_email_for_login(self, email: str) -> Tuple[Optional[User], bool]:
+        """ログイン用にメールアドレスでユーザーを取得
+
+        未登録と確認済みのメールアドレスは否定キャッシュの有効期間中DBを検索しない。
+
+        Returns:
+            (ユーザー, 否定キャッシュで判定したか)
+        """
+        key = (current_tenant().id, email)
+        if _unregistered_emails.get(key):
+            return None, True
+        user = await self.get_by_email(email)
+        if user is None:
+            _unregistered_emails.set(key, True)
+        return user, False
+
     async def get_by_google_sub(self, google_sub: str) -> Optional[User]:
         """Google SubでユーザーをUser"""
-        result = await self.db.execute(select(User).where(User.google_sub == google_sub))
+        result = await self.db.execute(_SELECT_BY_GOOGLE_SUB, {"google_sub": google_sub})
         return result.scalar_one_or_none()
 
+    async def get_by_emails_or_google_subs(
+        self, emails: Sequence[str], google_subs: Sequence[str]
+    ) -> List[User]:
+        """メールアドレスまたはGoogle Subが一致するユーザーを1回の検索で取得（削除処理中を含む）"""
+        conditions = []
+        if emails:
+            conditions.append(User.email.in_(list(emails)))
+        if google_subs:
+            conditions.append(User.google_sub.in_(list(google_subs)))
+        if not conditions:
+            return []
+        result = await self.db.execute(select(User).where(or_(*conditions)))
+        return list(result.scalars().all())
+
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
         """全ユーザーを取得"""
-        result = await self.db.execute(select(User).offset(skip).limit(limit))
+        result = await self.db.execute(select(User).where(_NOT_DELETED).offset(skip).limit(limit))
         return list(result.scalars().all())
 
+    # 一覧で指定可能な並び替えキー
+    SORTABLE_COLUMNS = {
+        "id": User.id,
+        "email": User.email,
+        "created_at": User.created_at,
+        "last_login_at": User.last_login_at,
+        "login_count": User.login_count,
+    }
+
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include_total: bool = True,
+        role: Optional[int] = None,
+        class_name: Optional[str] = None,
+        last_login_before: Optional[datetime] = None,
+        never_logged_in: Optional[bool] = None,
+        sort: str = "id",
+        descending: bool = False,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Page:
+        """ユーザー一覧と総数を1クエリで取得
+
+        last_login_before を指定した場合、一度もログインしていないユーザーも含む。
+        fields を指定した場合はそのカラムのみをSELECTし、各行を dict で返す。
+        """
+        if fields:
+            query = select(*(getattr(User, name) for name in fields)).where(_NOT_DELETED)
+        else:
+            query = select(User).where(_NOT_DELETED)
+        if role is not None:
+            query = query.where(User.role == role)
+        if class_name is not None:
+            query = query.where(User.class_name == class_name)
+        if last_login_before is not None:
+            query = query.where(
+                or_(User.last_login_at < last_login_before, User.last_login_at.is_(None))
+            )
+        if never_logged_in is True:
+            query = query.where(User.last_login_at.is_(None))
+        elif never_logged_in is False:
+            query = query.where(User.last_login_at.is_not(None))
+
+        sort_column = self.SORTABLE_COLUMNS[sort]
+        query = query.order_by(sort_column.desc() if descending else sort_column.asc(), User.id)
+        return await fetch_page(
+            self.db, query, skip, limit, include_total, as_mappings=bool(fields)
+        )
+
     async def count(self) -> int:
         """ユーザー数をカウント"""
-        result = await self.db.execute(select(User))
+        result = await self.db.execute(select(User).where(_NOT_DELETED))
         return len(list(result.scalars().all()))
 
     async def create(self, user: User) -> User:
         """ユーザーを作成"""
         self.db.add(user)
         await self.db.commit()
+        await forget_unregistered([user.email])
         await self.db.refresh(user)
         return user
 
     async def update(self, user: User) -> User:
         """ユーザーを更新"""
         await self.db.commit()
+        invalidate_principals([user.id])
+        await forget_unregistered([user.email])
         await self.db.refresh(user)
         return user
 
-    async def delete(self, user: User) -> None:
-        """ユーザーを削除"""
-        await self.db.delete(user)
+    async def record_login(self, user: User, google_sub: Optional[str] = None) -> None:
+        """ログイン日時・回数を記録（コミットは呼び出し側、ログ書き込みと同一トランザクション）
+
+        回数の加算はDB側で行うため、同一ユーザーの同時ログインでも取りこぼさない。
+        """
+        now = datetime.utcnow()
+        values = {"last_login_at": now, "login_count": User.login_count + 1}
+        if google_sub is not None:
+            values["google_sub"] = google_sub
+        await self.db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        invalidate_principals([user.id])
+        # セッション内のオブジェクトにも反映（変更扱いにはしない）
+        set_committed_value(user, "last_login_at", now)
+        set_committed_value(user, "login_count", (user.login_count or 0) + 1)
+        if google_sub is not None:
+            set_committed_value(user, "google_sub", google_sub)
+
+    async def upsert_many(self, rows: Sequence[dict]) -> None:
+        """ユーザーを一括で作成・更新してコミット（1文の INSERT ... ON DUPLICATE KEY UPDATE）
+
+        各行は id, email, role, name, student_id, class_name, google_sub を持つ
+        （既存ユーザーは既存のID、新規は採番済みのID）。google_sub が None の場合は既存の値を残す。
+        """
+        if not rows:
+            return
+        stmt = insert(User).values(list(rows))
+        stmt = stmt.on_duplicate_key_update(
+            email=stmt.inserted.email,
+            role=stmt.inserted.role,
+            name=stmt.inserted.name,
+            student_id=stmt.inserted.student_id,
+            class_name=stmt.inserted.class_name,
+            google_sub=func.coalesce(stmt.inserted.google_sub, User.google_sub),
+            updated_at=func.now(),
+            # ON DUPLICATE KEY UPDATE では列の onupdate が適用されないため明示する
+            version=User.version + 1,
+        )
+        await self.db.execute(stmt)
         await self.db.commit()
+        invalidate_principals([row["id"] for row in rows])
+        await forget_unregistered([row["email"] for row in rows])
+
+    async def soft_delete(
+        self, user_ids: Sequence[str], requested_by: Optional[str] = None
+    ) -> List[PurgeJob]:
+        """ユーザーを論理削除し、削除ジョブを登録してコミット
+
+        認証ログの匿名化とユーザー行の物理削除は削除ジョブがバックグラウンドで行う。
+        既に論理削除済みのユーザーは対象外。
+
+        Returns:
+            登録した削除ジョブ
+        """
+        result = await self.db.execute(
+            select(User.id).where(User.id.in_(list(user_ids)), _NOT_DELETED).with_for_update()
+        )
+        ids = list(result.scalars().all())
+        if not ids:
+            await self.db.rollback()
+            return []
+        await self.db.execute(
+            update(User)
+            .where(User.id.in_(ids))
+            .values(deleted_at=datetime.utcnow())
+            .execution_options(synchronize_session="evaluate")
+        )
+        jobs = PurgeJobRepository(self.db).add_many(ids, requested_by)
+        await self.db.commit()
+        invalidate_principals(ids)
+        return jobs
+
+    async def delete(self, user: User, requested_by: Optional[str] = None) -> Optional[PurgeJob]:
+        """ユーザーを削除（論理削除して削除ジョブを登録）
+
+        同時に実行された別の削除が先に論理削除していた場合はNone。
+        """
+        jobs = await self.soft_delete([user.id], requested_by)
+        if not jobs:
+            return None
+        await self.db.refresh(jobs[0])
+        return jobs[0]
+
+    async def purge(self, user_id: str) -> None:
+        """論理削除済みのユーザー行を物理削除（コミットは呼び出し側）"""
+        await self.db.execute(
+            delete(User)
+            .where(User.id == user_id, User.deleted_at.is_not(None))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _iter_id_chunks(
+        self,
+        user_ids: Optional[Sequence[str]],
+        conditions: list,
+        chunk_size: int,
+    ) -> AsyncIterator[list[str]]:
+        """一括操作対象のIDをチャンク単位で列挙
+
+        ID指定時はリストを分割し、条件指定のみの場合は主キー順の
+        キーセットページングで対象IDを取得する。
+        """
+        if user_ids is not None:
+            ids = list(dict.fromkeys(user_ids))
+            for i in range(0, len(ids), chunk_size):
+                yield ids[i : i + chunk_size]
+            return
+
+        last_id: Optional[str] = None
+        while True:
+            query = select(User.id).where(*conditions)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            result = await self.db.execute(query.order_by(User.id).limit(chunk_size))
+            ids = list(result.scalars().all())
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
+
+    @staticmethod
+    def _bulk_conditions(
+        role: Optional[int],
+        class_name: Optional[str],
+        exclude_ids: Sequence[str],
+    ) -> list:
+        """一括操作の絞り込み条件を組み立て"""
+        conditions = [_NOT_DELETED]
+        if role is not None:
+            conditions.append(User.role == role)
+        if class_name is not None:
+            conditions.append(User.class_name == class_name)
+        if exclude_ids:
+            conditions.append(User.id.not_in(list(exclude_ids)))
+        return conditions
+
+    async def bulk_update(
+        self,
+        values: dict,
+        user_ids: Optional[Sequence[str]] = None,
+        role: Optional[int] = None,
+        class_name: Optional[str] = None,
+        exclude_ids: Sequence[str] = (),
+        chunk_size: Optional[int] = None,
+    ) -> int:
+        """条件に一致するユーザーを一括更新
+
+        チャンクごとに集合演算のUPDATEを発行してコミットするため、
+        ロック保持時間は1チャンク分に制限される。
+
+        Returns:
+            更新対象となった行数
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        conditions = self._bulk_conditions(role, class_name, exclude_ids)
+        affected = 0
+        async for ids in self._iter_id_chunks(user_ids, conditions, chunk_size):
+            # synchronize_session="evaluate" でセッション内の既読込オブジェクトも更新
+            result = await self.db.execute(
+                update(User)
+                .where(User.id.in_(ids), *conditions)
+                .values(**values)
+                .execution_options(synchronize_session="evaluate")
+            )
+            await self.db.commit()
+            invalidate_principals(ids)
+            affected += result.rowcount
+        return affected
+
+    async def bulk_delete(
+        self,
+        user_ids: Optional[Sequence[str]] = None,
+        role: Optional[int] = None,
+        class_name: Optional[str] = None,
+        exclude_ids: Sequence[str] = (),
+        chunk_size: Optional[int] = None,
+        requested_by: Optional[str] = None,
+    ) -> int:
+        """条件に一致するユーザーを一括削除（チャンクごとに論理削除して削除ジョブを登録）
+
+        Returns:
+            削除対象となった行数
+        """
+        chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+        conditions = self._bulk_conditions(role, class_name, exclude_ids)
+        affected = 0
+        async for ids in self._iter_id_chunks(user_ids, conditions, chunk_size):
+            result = await self.db.execute(select(User.id).where(User.id.in_(ids), *conditions))
+            jobs = await self.soft_delete(list(result.scalars().all()), requested_by)
+            affected += len(jobs)
+        return affected
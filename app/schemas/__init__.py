@@ -1,9 +1,27 @@
-from app.schemas.user import UserBase, UserCreate, UserUpdate, UserResponse, UserListResponse
+from app.schemas.user import (
+    UserBase,
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserListResponse,
+    UserPartialResponse,
+    UserPartialListResponse,
+    UserBulkTarget,
+    UserBulkUpdate,
+    UserBulkDelete,
+    BulkOperationResponse,
+    PurgeJobResponse,
+    DirectorySyncChange,
+    DirectorySyncResponse,
+)
 from app.schemas.auth import (
     GoogleAuthURLResponse,
     TokenResponse,
     TokenPayload,
     LoginResponse,
+    TokenIntrospectionRequest,
+    TokenIntrospectionResult,
+    TokenIntrospectionResponse,
 )
 
 __all__ = [
@@ -12,8 +30,20 @@ __all__ = [
     "UserUpdate",
     "UserResponse",
     "UserListResponse",
+    "UserPartialResponse",
+    "UserPartialListResponse",
+    "UserBulkTarget",
+    "UserBulkUpdate",
+    "UserBulkDelete",
+    "BulkOperationResponse",
+    "PurgeJobResponse",
+    "DirectorySyncChange",
+    "DirectorySyncResponse",
     "GoogleAuthURLResponse",
     "TokenResponse",
     "TokenPayload",
     "LoginResponse",
+    "TokenIntrospectionRequest",
+    "TokenIntrospectionResult",
+    "TokenIntrospectionResponse",
 ]
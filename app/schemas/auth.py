@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Any, Dict
 from datetime import datetime
 
 
@@ -51,4 +51,48 @@ class AuthLogListResponse(BaseModel):
     """認証ログリストレスポンス"""
 
     logs: List[AuthLogResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_exact: Optional[bool] = None
+
+
+class AuthLogPartialResponse(BaseModel):
+    """fields 指定時の認証ログ（指定した項目と id のみを含む）"""
+
+    id: str
+    user_id: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    event_type: Optional[str] = None
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class AuthLogPartialListResponse(BaseModel):
+    """fields 指定時の認証ログリストレスポンス"""
+
+    logs: List[AuthLogPartialResponse]
+    total: Optional[int] = None
+    total_is_exact: Optional[bool] = None
+
+
+class TokenIntrospectionRequest(BaseModel):
+    """一括トークンイントロスペクションリクエスト"""
+
+    tokens: List[str] = Field(..., min_length=1)
+
+
+class TokenIntrospectionResult(BaseModel):
+    """トークンごとの検証結果"""
+
+    active: bool
+    user_id: Optional[str] = None
+    role: Optional[int] = None  # DB上の現在のロール
+    exp: Optional[int] = None
+    claims: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None  # invalid_token / user_not_found
+
+
+class TokenIntrospectionResponse(BaseModel):
+    """一括トークンイントロスペクションレスポンス（リクエストと同じ順序）"""
+
+    results: List[TokenIntrospectionResult]
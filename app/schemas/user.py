@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from typing import Optional
 from datetime import datetime
 
@@ -36,6 +36,8 @@ class UserResponse(UserBase):
     google_sub: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    last_login_at: Optional[datetime] = None
+    login_count: int = 0
 
     model_config = {"from_attributes": True}
 
@@ -44,4 +46,116 @@ class UserListResponse(BaseModel):
     """ユーザー一覧レスポンス"""
 
     users: list[UserResponse]
-    total: int
+    total: Optional[int] = None
+
+
+class UserPartialResponse(BaseModel):
+    """fields 指定時のユーザー（指定した項目と id のみを含む）"""
+
+    id: str
+    email: Optional[str] = None
+    role: Optional[int] = None
+    name: Optional[str] = None
+    student_id: Optional[str] = None
+    class_name: Optional[str] = None
+    google_sub: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    last_login_at: Optional[datetime] = None
+    login_count: Optional[int] = None
+
+
+class UserPartialListResponse(BaseModel):
+    """fields 指定時のユーザー一覧レスポンス"""
+
+    users: list[UserPartialResponse]
+    total: Optional[int] = None
+
+
+class UserBulkTarget(BaseModel):
+    """一括操作の対象指定（ID指定・条件指定のいずれか、または両方）"""
+
+    user_ids: Optional[list[str]] = Field(None, max_length=10000)
+    role: Optional[int] = Field(None, ge=0, le=2, description="0:生徒, 1:教員, 2:管理者")
+    class_name: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        # 条件なしの全件更新・全件削除を防ぐ
+        if self.user_ids is None and self.role is None and self.class_name is None:
+            raise ValueError("user_ids, role, class_name のいずれかを指定してください")
+        return self
+
+
+class UserBulkUpdate(BaseModel):
+    """ユーザー一括更新スキーマ（進級・クラス替え用）"""
+
+    target: UserBulkTarget
+    role: Optional[int] = Field(None, ge=0, le=2, description="0:生徒, 1:教員, 2:管理者")
+    class_name: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_has_changes(self):
+        if self.role is None and self.class_name is None:
+            raise ValueError("role, class_name のいずれかを指定してください")
+        return self
+
+
+class UserBulkDelete(BaseModel):
+    """ユーザー一括削除スキーマ（卒業生削除用）"""
+
+    target: UserBulkTarget
+
+
+class BulkOperationResponse(BaseModel):
+    """一括操作レスポンス"""
+
+    affected: int
+
+
+class PurgeJobResponse(BaseModel):
+    """ユーザー削除ジョブレスポンス"""
+
+    id: str
+    user_id: str
+    status: str = Field(..., description="pending / running / completed / failed")
+    logs_processed: int = Field(..., description="匿名化した認証ログの件数")
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+
+class DirectorySyncChange(BaseModel):
+    """名簿同期での1ユーザー分の変更"""
+
+    action: str = Field(..., description="created / updated / deleted / skipped")
+    email: str
+    fields: list[str] = Field(default_factory=list, description="updated の場合の変更項目")
+    reason: Optional[str] = Field(
+        None,
+        description="skipped の理由（email_conflict / pending_delete / invalid_role / requester）",
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class DirectorySyncResponse(BaseModel):
+    """名簿同期結果"""
+
+    source: str
+    full: bool = Field(..., description="差分ではなく全件を取得した場合true")
+    dry_run: bool
+    token_before: Optional[str] = None
+    token_after: Optional[str] = None
+    created: int
+    updated: int
+    deleted: int
+    unchanged: int
+    skipped: int
+    changes: list[DirectorySyncChange] = Field(..., description="変更内容（先頭から上限件数まで）")
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,129 @@
+import asyncio
+import contextlib
+import logging
+from collections import defaultdict
+from typing import List, Optional
+from app.core.audit_spool import audit_spool, SpoolSlot
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.lifecycle import register_startup_hook, register_drain_hook
+from app.core.tenancy import UnknownTenantError, get_tenant_registry, use_tenant
+from app.repositories.auth_log_repository import AuthLogRepository
+
+logger = logging.getLogger(__name__)
+
+
+class AuditShipper:
+    """スプールの監査イベントを auth_logs へ送出するバックグラウンド処理
+
+    送出済み位置はDBコミット後に記録するため、途中で停止しても
+    再送となるだけでイベントは失われない（登録は冪等）。
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def insert_events(slot: SpoolSlot, events: List[dict]) -> None:
+        """イベントをテナントごとのDBへ登録（tenant_id のない旧形式は既定テナント）
+
+        設定から削除されたテナントのイベントは、送出が止まらないよう退避ファイルに移す。
+        """
+        registry = get_tenant_registry()
+        by_tenant = defaultdict(list)
+        for event in events:
+            by_tenant[event.get("tenant_id")].append(event)
+        for tenant_id, tenant_events in by_tenant.items():
+            try:
+                tenant = registry.get(tenant_id)
+            except UnknownTenantError:
+                logger.error(
+                    "dead-lettering %d audit events for unknown tenant %s",
+                    len(tenant_events),
+                    tenant_id,
+                )
+                slot.append_dead_letters(tenant_events, reason="unknown_tenant")
+                continue
+            with use_tenant(tenant):
+                async with open_session() as session:
+                    await AuthLogRepository(session).insert_spooled(tenant_events)
+
+    async def ship_slot(self, slot: SpoolSlot, active_segment: Optional[str] = None) -> int:
+        """スロット内の未送出イベントをすべて送出
+
+        Returns:
+            送出したイベント数
+        """
+        shipped = 0
+        while True:
+            events, segment, position = slot.read_batch(
+                settings.AUDIT_SPOOL_SHIP_BATCH_SIZE, active_segment
+            )
+            if segment is None:
+                return shipped
+            if events:
+                await self.insert_events(slot, events)
+            if (segment, position) != slot.read_offset():
+                slot.write_offset(segment, position)
+                slot.remove_segments_before(segment)
+            shipped += len(events)
+            if len(events) < settings.AUDIT_SPOOL_SHIP_BATCH_SIZE:
+                return shipped
+
+    async def ship_orphans(self) -> None:
+        """他プロセスが残したスロット（使用中でないもの）を引き取って送出"""
+        for slot in audit_spool.slots():
+            if slot.path == audit_spool.slot.path or not slot.try_lock():
+                continue
+            try:
+                await self.ship_slot(slot)
+            finally:
+                slot.unlock()
+
+    async def ship_once(self) -> None:
+        active = audit_spool.segment.name if audit_spool.segment else None
+        await self.ship_slot(audit_spool.slot, active)
+        await self.ship_orphans()
+
+    async def _loop(self) -> None:
+        delay = settings.AUDIT_SPOOL_SHIP_INTERVAL_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.ship_once()
+                delay = settings.AUDIT_SPOOL_SHIP_INTERVAL_SECONDS
+            except Exception:
+                # DB障害中は間隔を広げて再試行（イベントはスプールに残る）
+                logger.exception("audit spool shipping failed")
+                delay = min(delay * 2, 60.0)
+
+    async def start(self) -> None:
+        if not settings.AUDIT_SPOOL_ENABLED:
+            return
+        audit_spool.open()
+        self._task = asyncio.create_task(self._loop())
+
+    async def drain(self) -> None:
+        """スプールを書き出し、残りのイベントを送出してから停止"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        # 送出中のバッチと並行して同じスロットを送出しないよう、停止を待つ
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await audit_spool.close()
+        try:
+            await asyncio.wait_for(
+                self.ship_slot(audit_spool.slot), timeout=settings.SHUTDOWN_DRAIN_TIMEOUT_SECONDS
+            )
+        except Exception:
+            # 未送出分はスプールに残り、次回起動時（または他プロセス）が送出する
+            logger.exception("audit spool drain incomplete")
+        finally:
+            audit_spool.slot.unlock()
+
+
+shipper = AuditShipper()
+register_startup_hook(shipper.start)
+register_drain_hook(shipper.drain)
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.lifecycle import tracker
+from app.core.pubsub import auth_log_events
+from app.core.tenancy import Tenant, use_tenant
+from app.models.types import uuid7_lower_bound
+from app.repositories.auth_log_repository import (
+    AuthLogRepository,
+    auth_log_event,
+    publish_auth_log,
+)
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+_LOG_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+def _format(event: dict) -> str:
+    """SSEのメッセージ形式に変換"""
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: auth_log\ndata: {data}\n\n"
+
+
+class AuthLogStream:
+    """認証ログのServer-Sent Events配信
+
+    同一プロセスでの書き込みは AuthLogRepository から即時に配信される。
+    他プロセス（マルチワーカー）の書き込みは、購読者がいるテナントについてのみ
+    プロセスごとに1つのポーリングで直近のログを取り込み、IDで重複を除いて配信する。
+    """
+
+    def __init__(self):
+        self._pollers: Dict[str, asyncio.Task] = {}
+
+    def _ensure_poller(self, tenant: Tenant) -> None:
+        if settings.STREAM_POLL_INTERVAL_SECONDS <= 0:
+            return
+        poller = self._pollers.get(tenant.id)
+        if poller is None or poller.done():
+            self._pollers[tenant.id] = asyncio.create_task(self._poll(tenant))
+
+    async def _poll(self, tenant: Tenant) -> None:
+        """他プロセスで書き込まれたログを取り込み（購読者がいなくなったら終了）"""
+        with use_tenant(tenant):
+            while auth_log_events.subscriber_count(tenant.id):
+                await asyncio.sleep(settings.STREAM_POLL_INTERVAL_SECONDS)
+                # コミットの遅れを考慮し、直近の一定時間分を毎回読み直す（配信済みは除外される）
+                window = settings.STREAM_POLL_WINDOW_SECONDS
+                after = uuid7_lower_bound(_now_ms() - int(window * 1000))
+                # timestamp はUTCに固定したセッションの NOW() で記録されるため utcnow と比較できる
+                since = datetime.utcnow() - timedelta(seconds=window)
+                try:
+                    while True:
+                        async with open_session() as session:
+                            logs = await AuthLogRepository(session).get_since(
+                                after, since, limit=500
+                            )
+                        for log in logs:
+                            publish_auth_log(log)
+                        if len(logs) < 500:
+                            break
+                        after = logs[-1].id
+                except Exception:
+                    logger.exception("auth log stream polling failed for tenant %s", tenant.id)
+
+    async def _catch_up(
+        self,
+        tenant: Tenant,
+        after_id: str,
+        since: Optional[datetime],
+        event_type: Optional[str],
+    ) -> Optional[List[dict]]:
+        """指定IDより後のログをDBから取得（上限を超える場合はNone）
+
+        since を省略した場合は after_id のログの発生日時以降とする（ログがなければNone）。
+        """
+        events: List[dict] = []
+        with use_tenant(tenant):
+            async with open_session() as session:
+                repo = AuthLogRepository(session)
+                if since is None:
+                    since = await repo.get_timestamp(after_id)
+                    if since is None:
+                        return None
+                while True:
+                    logs = await repo.get_since(
+                        after_id, since, event_type=event_type, limit=500
+                    )
+                    events.extend(
+                        auth_log_event(
+                            log.id,
+                            log.user_id,
+                            log.timestamp,
+                            log.event_type,
+                            log.ip_address,
+                            log.user_agent,
+                            log.error_code,
+                        )
+                        for log in logs
+                    )
+                    if len(events) > settings.STREAM_RESUME_MAX_EVENTS:
+                        return None
+                    if len(logs) < 500:
+                        return events
+                    after_id = logs[-1].id
+
+    async def _is_admin(self, tenant: Tenant, user_id: str) -> bool:
+        """配信中も権限を持ち続けているか（キャッシュ優先）"""
+        with use_tenant(tenant):
+            async with open_session() as session:
+                principal = await UserRepository(session).get_principal(user_id)
+        return principal is not None and principal.role == 2
+
+    async def stream(
+        self,
+        tenant: Tenant,
+        user_id: str,
+        event_type: Optional[str] = None,
+        last_event_id: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """SSEメッセージを生成
+
+        Last-Event-ID 指定時は、それより後のログをDBから送ってからライブ配信に切り替える。
+        取りこぼし（再接続・受信キューの溢れ）が上限を超える場合は reset イベントを送り、
+        クライアントに一覧の再取得を促す。
+        """
+        subscription = auth_log_events.subscribe(tenant.id)
+        self._ensure_poller(tenant)
+        # DBから送った（またはライブで送った）ID。ライブ配信との重複を除く
+        sent = LRUCache(maxsize=settings.STREAM_RESUME_MAX_EVENTS * 2)
+        # 最後に送ったログのIDと発生日時（取りこぼし時はここからDBを読み直す）
+        cursor = uuid7_lower_bound(_now_ms())
+        cursor_time = datetime.utcnow()
+
+        def advance(event: dict) -> None:
+            nonlocal cursor, cursor_time
+            sent.set(event["id"], True)
+            cursor = max(cursor, event["id"])
+            if event["timestamp"]:
+                cursor_time = max(cursor_time, datetime.fromisoformat(event["timestamp"]))
+
+        async def catch_up(after_id: str, since: Optional[datetime]) -> AsyncIterator[str]:
+            nonlocal cursor, cursor_time
+            events = await self._catch_up(tenant, after_id, since, event_type)
+            if events is None:
+                yield 'event: reset\ndata: {"reason": "too_many_missed_events"}\n\n'
+                cursor = uuid7_lower_bound(_now_ms())
+                cursor_time = datetime.utcnow()
+                return
+            for event in events:
+                advance(event)
+                yield _format(event)
+
+        try:
+            yield f"retry: {settings.STREAM_RETRY_MS}\n\n"
+            if last_event_id and _LOG_ID.match(last_event_id):
+                async for message in catch_up(last_event_id, None):
+                    yield message
+
+            last_heartbeat = time.monotonic()
+            while not tracker.draining:
+                if subscription.lagged:
+                    # 溢れた分は破棄し、最後に送ったID以降をDBから送り直す
+                    subscription.lagged = False
+                    while not subscription.queue.empty():
+                        subscription.queue.get_nowait()
+                    since = cursor_time - timedelta(seconds=settings.STREAM_POLL_WINDOW_SECONDS)
+                    async for message in catch_up(cursor, since):
+                        yield message
+
+                try:
+                    # 終了処理（ドレイン）を検知できるよう短い間隔で待つ
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if time.monotonic() - last_heartbeat >= settings.STREAM_HEARTBEAT_SECONDS:
+                        if not await self._is_admin(tenant, user_id):
+                            return
+                        last_heartbeat = time.monotonic()
+                        yield ": ping\n\n"
+                    continue
+
+                if event_type and event["event_type"] != event_type:
+                    continue
+                if sent.get(event["id"]) is not None:
+                    continue
+                advance(event)
+                yield _format(event)
+        finally:
+            auth_log_events.unsubscribe(subscription)
+
+
+auth_log_stream = AuthLogStream()
@@ -1,11 +1,81 @@
-from typing import Optional, Tuple
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.security import create_google_oauth_client, verify_google_id_token, create_access_token
+from app.core.security import (
+    create_google_oauth_client,
+    verify_google_id_token,
+    create_access_token,
+    generate_pkce_challenge,
+)
 from app.core.config import settings
+from app.core.rate_limit import (
+    login_email_failures,
+    login_ip_failures,
+    tenant_limiter_key,
+)
+from app.core.singleflight import SingleFlight
+from app.core.tenancy import current_tenant
+from app.core.resilience import (
+    UpstreamError,
+    RetryBudget,
+    call_with_resilience,
+    get_breaker,
+)
 from app.repositories.user_repository import UserRepository
 from app.repositories.auth_log_repository import AuthLogRepository
+from app.models.principal import Principal
 from app.models.user import User
 
+# 認可コード単位のログイン処理の重複排除（二重リダイレクト・再読み込み対策）
+_login_flights = SingleFlight(ttl_seconds=settings.OAUTH_CODE_DEDUP_TTL_SECONDS)
+
+# Googleエンドポイントごとのサーキットブレーカーとuserinfoのリトライ予算
+_token_breaker = get_breaker(
+    "google_token",
+    settings.GOOGLE_BREAKER_FAILURE_THRESHOLD,
+    settings.GOOGLE_BREAKER_RESET_SECONDS,
+)
+_userinfo_breaker = get_breaker(
+    "google_userinfo",
+    settings.GOOGLE_BREAKER_FAILURE_THRESHOLD,
+    settings.GOOGLE_BREAKER_RESET_SECONDS,
+)
+_userinfo_retry_budget = RetryBudget(ratio=settings.GOOGLE_RETRY_BUDGET_RATIO)
+
+# 接続元の失敗として数えるエラー（Google側の障害・内部エラーは数えない）
+_IP_COUNTED_ERRORS = frozenset(
+    {"TOKEN_EXCHANGE_FAILED", "EMAIL_NOT_VERIFIED", "USER_NOT_REGISTERED"}
+)
+
+# 通信障害として扱う例外（タイムアウト・接続失敗・5xx）
+_UPSTREAM_ERRORS = (UpstreamError, httpx.TransportError)
+
+
+@dataclass(frozen=True)
+class LoginResult:
+    """ログイン結果
+
+    重複排除で他のリクエストと共有・保持されるため、セッションに紐付くORMオブジェクトは持たない。
+    """
+
+    user_id: Optional[str] = None
+    role: Optional[int] = None
+    access_token: Optional[str] = None
+    error_code: Optional[str] = None
+
+    @classmethod
+    def failed(cls, error_code: str) -> "LoginResult":
+        return cls(error_code=error_code)
+
+
+def _raise_for_upstream_status(response: httpx.Response) -> httpx.Response:
+    """5xx応答を通信障害として扱う"""
+    if response.status_code >= 500:
+        raise UpstreamError(f"{response.request.url.host} returned {response.status_code}")
+    return response
+
 
 class AuthService:
     """認証サービス"""
@@ -15,11 +85,15 @@ class AuthService:
         self.user_repo = UserRepository(db)
         self.auth_log_repo = AuthLogRepository(db)
 
-    async def get_google_auth_url(self) -> str:
-        """Google認証URLを取得"""
+    @staticmethod
+    async def get_google_auth_url(state: str, code_verifier: str) -> str:
+        """Google認証URLを取得（state と PKCE の code_challenge を付与、DBは使用しない）"""
         oauth_client = create_google_oauth_client()
         authorization_url, _ = oauth_client.create_authorization_url(
-            "https://accounts.google.com/o/oauth2/v2/auth",
+            settings.google_auth_endpoint,
+            state=state,
+            code_challenge=generate_pkce_challenge(code_verifier),
+            code_challenge_method="S256",
             prompt="select_account",
         )
         return authorization_url
@@ -27,22 +101,68 @@ class AuthService:
     async def login_with_google(
         self,
         code: str,
+        code_verifier: str,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
-    ) -> Tuple[Optional[User], Optional[str], Optional[str]]:
+    ) -> LoginResult:
         """
         Googleコードでログイン
 
+        同じ認可コードでのコールバックが同時に届いた場合は1回のみ処理し、
+        成功した場合は完了後しばらく同じ結果を返す（Googleへの再問い合わせを発生させない）。
+        失敗した結果は保持せず、再度のコールバックはそのまま処理する。
+        キーにはテナントと接続元も含め、別テナント・別クライアントからの同一コードは共有しない。
+        直近の失敗回数が上限に達した接続元は、Google・DBに問い合わせず RATE_LIMITED とする。
+
         Returns:
-            (user, access_token, error_code)
+            ログイン結果（失敗時は error_code のみ）
         """
+        ip_key = tenant_limiter_key(ip_address) if ip_address else None
+        if ip_key and await login_ip_failures.is_limited(ip_key):
+            return LoginResult.failed("RATE_LIMITED")
+
+        key = hashlib.sha256(
+            "\0".join(
+                (current_tenant().id, code, ip_address or "", user_agent or "")
+            ).encode("utf-8")
+        ).digest()
+        result = await _login_flights.run(
+            key,
+            lambda: self._login_with_google(code, code_verifier, ip_address, user_agent),
+            cacheable=lambda result: result.error_code is None,
+        )
+        if ip_key and result.error_code in _IP_COUNTED_ERRORS:
+            await login_ip_failures.hit(ip_key)
+        return result
+
+    async def _login_with_google(
+        self,
+        code: str,
+        code_verifier: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> LoginResult:
+        """Googleコードでログイン（重複排除なしの本体）"""
         try:
             # 1. アクセストークン取得
             oauth_client = create_google_oauth_client()
-            token = await oauth_client.fetch_token(
-                "https://oauth2.googleapis.com/token",
-                code=code,
+            oauth_client.register_compliance_hook(
+                "access_token_response", _raise_for_upstream_status
             )
+            try:
+                # 認可コードは1回限りのためリトライしない
+                token = await call_with_resilience(
+                    _token_breaker,
+                    lambda: oauth_client.fetch_token(
+                        settings.google_token_endpoint,
+                        code=code,
+                        code_verifier=code_verifier,
+                        timeout=settings.GOOGLE_TOKEN_TIMEOUT_SECONDS,
+                    ),
+                    retryable=_UPSTREAM_ERRORS,
+                )
+            except _UPSTREAM_ERRORS as e:
+                return await self._login_upstream_failure(e, ip_address, user_agent)
 
             if not token:
                 await self.auth_log_repo.create(
@@ -52,12 +172,19 @@ class AuthService:
                     user_agent=user_agent,
                     error_code="TOKEN_EXCHANGE_FAILED",
                 )
-                return None, None, "TOKEN_EXCHANGE_FAILED"
+                return LoginResult.failed("TOKEN_EXCHANGE_FAILED")
 
             # 2. ユーザー情報取得
-            user_info_response = await oauth_client.get(
-                "https://www.googleapis.com/oauth2/v3/userinfo"
-            )
+            try:
+                user_info_response = await call_with_resilience(
+                    _userinfo_breaker,
+                    lambda: self._get_userinfo(oauth_client),
+                    retryable=_UPSTREAM_ERRORS,
+                    max_retries=settings.GOOGLE_USERINFO_MAX_RETRIES,
+                    budget=_userinfo_retry_budget,
+                )
+            except _UPSTREAM_ERRORS as e:
+                return await self._login_upstream_failure(e, ip_address, user_agent)
             user_info = user_info_response.json()
 
             email = user_info.get("email")
@@ -73,13 +200,18 @@ class AuthService:
                     user_agent=user_agent,
                     error_code="EMAIL_NOT_VERIFIED",
                 )
-                return None, None, "EMAIL_NOT_VERIFIED"
+                return LoginResult.failed("EMAIL_NOT_VERIFIED")
+
+            # 失敗を繰り返しているメールアドレスはDBに問い合わせず拒否（ログも記録しない）
+            email_key = tenant_limiter_key(email)
+            if await login_email_failures.is_limited(email_key):
+                return LoginResult.failed("RATE_LIMITED")
 
-            # 4. DBでユーザー照合
-            user = await self.user_repo.get_by_email(email)
+            # 4. DBでユーザー照合（未登録と確認済みのメールアドレスは否定キャッシュで判定）
+            user, cached = await self.user_repo.get_by_email_for_login(email)
             if not user:
                 # 初期管理者リストをチェック
-                if email in settings.initial_admin_emails_list:
+                if email in current_tenant().initial_admin_emails:
                     # 初期管理者として自動登録
                     user = User(
                         email=email,
@@ -97,27 +229,31 @@ class AuthService:
                         user_agent=user_agent,
                     )
                 else:
-                    # 未登録ユーザー
-                    await self.auth_log_repo.create(
-                        user_id=None,
-                        event_type="LOGIN_FAIL_NOT_REGISTERED",
-                        ip_address=ip_address,
-                        user_agent=user_agent,
-                        error_code="USER_NOT_REGISTERED",
-                    )
-                    return None, None, "USER_NOT_REGISTERED"
+                    # 未登録ユーザー（否定キャッシュでの判定も数える。登録時に消去される）
+                    await login_email_failures.hit(email_key)
+                    # 否定キャッシュの有効期間中の繰り返しはDBに書き込まない
+                    # （DBで確認した初回のみ記録）
+                    if not cached:
+                        await self.auth_log_repo.create(
+                            user_id=None,
+                            event_type="LOGIN_FAIL_NOT_REGISTERED",
+                            ip_address=ip_address,
+                            user_agent=user_agent,
+                            error_code="USER_NOT_REGISTERED",
+                        )
+                    return LoginResult.failed("USER_NOT_REGISTERED")
 
-            # 5. google_sub を保存（初回ログイン時）
-            if not user.google_sub:
-                user.google_sub = google_sub
-                await self.user_repo.update(user)
+            # 5. ログイン日時・回数と google_sub（初回ログイン時）を記録
+            await self.user_repo.record_login(
+                user, google_sub=google_sub if not user.google_sub else None
+            )
 
             # 6. JWTトークン発行
             access_token = create_access_token(
-                data={"user_id": user.id, "role": user.role}
+                data={"user_id": user.id, "role": user.role, "tid": current_tenant().id}
             )
 
-            # 7. ログイン成功ログ
+            # 7. ログイン成功ログ（5の更新と同一トランザクションでコミット）
             await self.auth_log_repo.create(
                 user_id=user.id,
                 event_type="LOGIN_SUCCESS",
@@ -125,10 +261,11 @@ class AuthService:
                 user_agent=user_agent,
             )
 
-            return user, access_token, None
+            return LoginResult(user_id=user.id, role=user.role, access_token=access_token)
 
         except Exception as e:
-            # エラーログ
+            # 途中まで実行された更新（ログイン記録等）を破棄してからエラーログ
+            await self.db.rollback()
             await self.auth_log_repo.create(
                 user_id=None,
                 event_type="LOGIN_FAIL_OTHER",
@@ -136,11 +273,58 @@ class AuthService:
                 user_agent=user_agent,
                 error_code=str(e)[:50],
             )
-            return None, None, "UNKNOWN_ERROR"
+            return LoginResult.failed("UNKNOWN_ERROR")
+
+    @staticmethod
+    async def _get_userinfo(oauth_client) -> httpx.Response:
+        """Googleユーザー情報を取得（5xxは通信障害として例外）"""
+        response = await oauth_client.get(
+            settings.google_userinfo_endpoint,
+            timeout=settings.GOOGLE_USERINFO_TIMEOUT_SECONDS,
+        )
+        return _raise_for_upstream_status(response)
+
+    async def reject_invalid_state(
+        self,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> None:
+        """state を検証できないコールバック（期限切れ・改ざん・別の試行）を記録
+
+        失敗回数が上限に達した接続元の場合は記録しない。
+        """
+        if ip_address:
+            ip_key = tenant_limiter_key(ip_address)
+            if await login_ip_failures.is_limited(ip_key):
+                return
+            await login_ip_failures.hit(ip_key)
+        await self.auth_log_repo.create(
+            user_id=None,
+            event_type="LOGIN_FAIL_INVALID_STATE",
+            ip_address=ip_address,
+            user_agent=user_agent,
+            error_code="INVALID_STATE",
+        )
+
+    async def _login_upstream_failure(
+        self,
+        error: Exception,
+        ip_address: Optional[str],
+        user_agent: Optional[str],
+    ) -> LoginResult:
+        """Google側の障害・遮断によるログイン失敗を記録"""
+        await self.auth_log_repo.create(
+            user_id=None,
+            event_type="LOGIN_FAIL_UPSTREAM",
+            ip_address=ip_address,
+            user_agent=user_agent,
+            error_code=type(error).__name__[:50],
+        )
+        return LoginResult.failed("UPSTREAM_UNAVAILABLE")
 
     async def logout(
         self,
-        user: User,
+        user: Principal,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
     ) -> None:
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Protocol
+
+
+class SyncTokenExpiredError(Exception):
+    """差分トークンが同期元で無効になった（全件同期からやり直す）"""
+
+
+@dataclass(frozen=True)
+class DirectoryUser:
+    """同期元の1ユーザー分の変更（deleted=True は削除）"""
+
+    email: str
+    role: int = 0
+    name: Optional[str] = None
+    student_id: Optional[str] = None
+    class_name: Optional[str] = None
+    google_sub: Optional[str] = None
+    deleted: bool = False
+
+
+@dataclass(frozen=True)
+class DirectoryChanges:
+    """前回のトークン以降の変更と、次回の同期に使うトークン
+
+    full=True の場合は差分ではなく全件（初回・トークン失効時）。
+    """
+
+    users: List[DirectoryUser]
+    next_token: Optional[str]
+    full: bool
+
+
+class DirectorySource(Protocol):
+    """名簿の同期元（学校の名簿システム・Google Workspace等）"""
+
+    # 同期状態（sync_states）のキー
+    name: str
+
+    async def fetch_changes(self, token: Optional[str]) -> DirectoryChanges:
+        """token 以降の変更を取得（None の場合は全件）
+
+        トークンが古すぎる等で差分を返せない場合は SyncTokenExpiredError。
+        """
+        ...
+
+
+class FileDirectorySource:
+    """JSON Lines の変更履歴ファイルを同期元とする（開発・テスト用）
+
+    各行が1件の変更で、単調増加の seq を持つ:
+        {"seq": 1, "email": "a@example.jp", "role": 0, "class_name": "1-A"}
+        {"seq": 2, "email": "b@example.jp", "deleted": true}
+    トークンは適用済みの最大の seq。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{path}"
+
+    def _read(self) -> List[dict]:
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    async def fetch_changes(self, token: Optional[str]) -> DirectoryChanges:
+        records = await asyncio.to_thread(self._read)
+        last_seq = max((record["seq"] for record in records), default=0)
+        after = int(token) if token is not None else 0
+        if after > last_seq:
+            # ファイルが作り直された
+            raise SyncTokenExpiredError(token)
+
+        users = [
+            DirectoryUser(
+                email=record["email"],
+                role=record.get("role", 0),
+                name=record.get("name"),
+                student_id=record.get("student_id"),
+                class_name=record.get("class_name"),
+                google_sub=record.get("google_sub"),
+                deleted=record.get("deleted", False),
+            )
+            for record in sorted(records, key=lambda r: r["seq"])
+            if record["seq"] > after
+        ]
+        return DirectoryChanges(users=users, next_token=str(last_seq), full=token is None)
+
+
+# スキーム（"file:..." の file）ごとの同期元の生成関数
+_source_factories: Dict[str, Callable[[str], DirectorySource]] = {
+    "file": FileDirectorySource,
+}
+
+
+def register_directory_source(scheme: str, factory: Callable[[str], DirectorySource]) -> None:
+    """同期元の種類を追加（factory は "scheme:" より後の文字列を受け取る）"""
+    _source_factories[scheme] = factory
+
+
+def create_directory_source(spec: str) -> DirectorySource:
+    """設定値（例: file:./var/roster.jsonl）から同期元を生成"""
+    scheme, sep, value = spec.partition(":")
+    if not sep or scheme not in _source_factories:
+        raise ValueError(f"不明な同期元です: {spec}")
+    return _source_factories[scheme](value)
@@ -0,0 +1,194 @@
+import logging
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.tenancy import Tenant, use_tenant
+from app.models.types import generate_uuid7
+from app.repositories.sync_state_repository import SyncStateRepository
+from app.repositories.user_repository import UserRepository
+from app.services.directory_source import (
+    DirectorySource,
+    DirectoryUser,
+    SyncTokenExpiredError,
+    create_directory_source,
+)
+
+logger = logging.getLogger(__name__)
+
+# 同期元の値で上書きする項目（google_sub は同期元が持つ場合のみ）
+_SYNCED_FIELDS = ("email", "role", "name", "student_id", "class_name")
+
+
+@dataclass(frozen=True)
+class SyncChange:
+    """1ユーザー分の同期結果"""
+
+    action: str  # created / updated / deleted / skipped
+    email: str
+    fields: Tuple[str, ...] = ()
+    reason: Optional[str] = None  # skipped の理由
+
+
+@dataclass
+class SyncReport:
+    """同期結果（changes は DIRECTORY_SYNC_REPORT_LIMIT 件まで）"""
+
+    source: str
+    full: bool
+    dry_run: bool
+    token_before: Optional[str]
+    token_after: Optional[str]
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    changes: List[SyncChange] = field(default_factory=list)
+
+    def record(self, change: SyncChange) -> None:
+        setattr(self, change.action, getattr(self, change.action) + 1)
+        if len(self.changes) < settings.DIRECTORY_SYNC_REPORT_LIMIT:
+            self.changes.append(change)
+
+
+class DirectorySyncService:
+    """名簿の差分同期
+
+    前回保存した差分トークン以降の変更のみを同期元から取得し、
+    バッチごとに1回の検索と1文のUPSERTで反映する（処理量は名簿全体ではなく変更件数に比例）。
+    ユーザーは google_sub、なければメールアドレスで照合する。メールアドレスはDBの照合順序と同じく
+    大文字・小文字を区別せずに照合し、作成・更新時は小文字に揃えて保存する。
+    トークンは全バッチの反映後に保存するため、途中で失敗した場合は次回同じ変更から再適用される。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.user_repo = UserRepository(db)
+        self.sync_state_repo = SyncStateRepository(db)
+
+    async def sync(
+        self,
+        source: DirectorySource,
+        full: bool = False,
+        dry_run: bool = False,
+        requested_by: Optional[str] = None,
+    ) -> SyncReport:
+        """同期を実行（dry_run=True の場合は差分の算出のみ）
+
+        Args:
+            full: 保存済みのトークンを使わず全件を取得
+            requested_by: 実行した管理者（本人は削除対象から除外）
+        """
+        token = None if full else await self.sync_state_repo.get_token(source.name)
+        try:
+            changes = await source.fetch_changes(token)
+        except SyncTokenExpiredError:
+            logger.warning("sync token for %s expired, falling back to full sync", source.name)
+            changes = await source.fetch_changes(None)
+
+        report = SyncReport(
+            source=source.name,
+            full=changes.full,
+            dry_run=dry_run,
+            token_before=token,
+            token_after=changes.next_token,
+        )
+        # 同じユーザー（google_sub、なければメールアドレス）への変更が複数ある場合は最後のものを適用
+        entries = [replace(user, email=user.email.casefold()) for user in changes.users]
+        users = list({user.google_sub or user.email: user for user in entries}.values())
+        batch_size = settings.DIRECTORY_SYNC_BATCH_SIZE
+        for i in range(0, len(users), batch_size):
+            await self._apply_batch(users[i : i + batch_size], report, dry_run, requested_by)
+
+        if not dry_run:
+            await self.sync_state_repo.save_token(source.name, changes.next_token)
+        return report
+
+    async def _apply_batch(
+        self,
+        entries: Sequence[DirectoryUser],
+        report: SyncReport,
+        dry_run: bool,
+        requested_by: Optional[str],
+    ) -> None:
+        existing = await self.user_repo.get_by_emails_or_google_subs(
+            [entry.email for entry in entries],
+            [entry.google_sub for entry in entries if entry.google_sub],
+        )
+        by_email = {user.email.casefold(): user for user in existing}
+        by_google_sub = {user.google_sub: user for user in existing if user.google_sub}
+
+        rows, delete_ids = [], []
+        for entry in entries:
+            user = by_google_sub.get(entry.google_sub) if entry.google_sub else None
+            email_owner = by_email.get(entry.email)
+            if user is None:
+                user = email_owner
+            elif email_owner is not None and email_owner is not user:
+                # メールアドレスの変更先が別のユーザーで使われている
+                report.record(SyncChange("skipped", entry.email, reason="email_conflict"))
+                continue
+
+            if user is not None and user.deleted_at is not None:
+                report.record(SyncChange("skipped", entry.email, reason="pending_delete"))
+                continue
+
+            if entry.deleted:
+                if user is None:
+                    report.unchanged += 1
+                elif user.id == requested_by:
+                    report.record(SyncChange("skipped", entry.email, reason="requester"))
+                else:
+                    delete_ids.append(user.id)
+                    report.record(SyncChange("deleted", entry.email))
+                continue
+
+            if entry.role not in (0, 1, 2):
+                report.record(SyncChange("skipped", entry.email, reason="invalid_role"))
+                continue
+
+            if user is None:
+                rows.append(self._row(generate_uuid7(), entry))
+                report.record(SyncChange("created", entry.email))
+                continue
+
+            current = {f: getattr(user, f) for f in _SYNCED_FIELDS}
+            current["email"] = user.email.casefold()
+            changed = tuple(f for f in _SYNCED_FIELDS if getattr(entry, f) != current[f])
+            if entry.google_sub and entry.google_sub != user.google_sub:
+                changed += ("google_sub",)
+            if not changed:
+                report.unchanged += 1
+                continue
+            rows.append(self._row(user.id, entry))
+            report.record(SyncChange("updated", entry.email, fields=changed))
+
+        if dry_run:
+            return
+        await self.user_repo.upsert_many(rows)
+        if delete_ids:
+            await self.user_repo.soft_delete(delete_ids, requested_by)
+
+    @staticmethod
+    def _row(user_id: str, entry: DirectoryUser) -> dict:
+        return {
+            "id": user_id,
+            "email": entry.email,
+            "role": entry.role,
+            "name": entry.name,
+            "student_id": entry.student_id,
+            "class_name": entry.class_name,
+            "google_sub": entry.google_sub,
+        }
+
+
+async def sync_tenant(tenant: Tenant, full: bool = False, dry_run: bool = False) -> SyncReport:
+    """テナントの名簿を同期（CLI・定期実行用）"""
+    if not tenant.directory_source:
+        raise ValueError(f"テナント '{tenant.id}' に同期元（DIRECTORY_SOURCE）が設定されていません")
+    source = create_directory_source(tenant.directory_source)
+    with use_tenant(tenant):
+        async with open_session() as session:
+            return await DirectorySyncService(session).sync(source, full=full, dry_run=dry_run)
@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+from typing import Optional
+from app.core.config import settings
+from app.core.database import open_session
+from app.core.lifecycle import register_startup_hook, register_drain_hook
+from app.core.tenancy import Tenant, get_tenant_registry, use_tenant
+from app.repositories.purge_job_repository import PurgeJobRepository
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeWorker:
+    """削除ジョブを処理するバックグラウンド処理
+
+    認証ログの匿名化・切り離しを小さなバッチごとにコミットし、バッチ間で待機する。
+    ログがなくなった時点でユーザー行を物理削除する（外部キーの ON DELETE SET NULL で
+    大量の行が1トランザクションで更新されることはない）。
+    ジョブはリースで排他し、停止したプロセスのジョブはリース切れ後に他プロセス・再起動後に再開される。
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"[:64]
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+
+    def wake(self) -> None:
+        """新しいジョブの登録を通知（次のポーリングを待たずに処理を開始）"""
+        self._wake.set()
+
+    async def run_job(self, job_id: str) -> bool:
+        """ジョブを1件処理（リースを取得できなかった場合はFalse）"""
+        async with open_session() as session:
+            job_repo = PurgeJobRepository(session)
+            if not await job_repo.claim(job_id, self.owner, settings.PURGE_LEASE_SECONDS):
+                return False
+            job = await job_repo.get_by_id(job_id)
+            user_id = job.user_id
+
+            try:
+                while True:
+                    processed = await job_repo.detach_logs_batch(
+                        job_id,
+                        user_id,
+                        settings.PURGE_BATCH_SIZE,
+                        self.owner,
+                        settings.PURGE_LEASE_SECONDS,
+                    )
+                    if processed is None:
+                        # 処理が遅れてリースが切れ、他のプロセスが引き継いだ
+                        logger.warning("purge job %s lost its lease", job_id)
+                        return True
+                    if processed < settings.PURGE_BATCH_SIZE:
+                        break
+                    # 他のトランザクションがロックを取得できるよう間隔を空ける
+                    await asyncio.sleep(settings.PURGE_BATCH_PAUSE_MS / 1000)
+
+                await UserRepository(session).purge(user_id)
+                await job_repo.finish(job_id)
+                await session.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("purge job %s failed", job_id)
+                await session.rollback()
+                await job_repo.fail(
+                    job_id,
+                    error=f"{type(e).__name__}: {e}",
+                    max_attempts=settings.PURGE_MAX_ATTEMPTS,
+                    retry_after_seconds=settings.PURGE_LEASE_SECONDS,
+                )
+        return True
+
+    async def run_tenant(self, tenant: Tenant) -> int:
+        """テナントの処理待ちジョブをすべて処理
+
+        Returns:
+            処理したジョブ数
+        """
+        done = 0
+        with use_tenant(tenant):
+            while True:
+                async with open_session() as session:
+                    job_ids = await PurgeJobRepository(session).get_runnable_ids(limit=100)
+                if not job_ids:
+                    return done
+                claimed = [job_id for job_id in job_ids if await self.run_job(job_id)]
+                done += len(claimed)
+                if not claimed:
+                    return done
+
+    async def run_once(self) -> int:
+        total = 0
+        for tenant in get_tenant_registry().tenants.values():
+            try:
+                total += await self.run_tenant(tenant)
+            except Exception:
+                logger.exception("purge jobs for tenant %s failed", tenant.id)
+        return total
+
+    async def _loop(self) -> None:
+        # 起動直後に前回の未完了ジョブを再開
+        while True:
+            self._wake.clear()
+            await self.run_once()
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), timeout=settings.PURGE_POLL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """停止（処理中のバッチはロールバックされ、リース切れ後に再開される）"""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        # セッションのロールバック・返却を終えてからDB切断へ進む
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+purge_worker = PurgeWorker()
+register_startup_hook(purge_worker.start)
+register_drain_hook(purge_worker.stop)
@@ -0,0 +1,125 @@
+"""auth_logs 挿入スループットのベンチマーク（主キー形式の比較）
+
+CHAR(32)+UUIDv4（移行前）と BINARY(16)+UUIDv7（移行後）の2種類の
+スクラッチテーブルに同じ行を挿入し、スループットとインデックスサイズを比較する。
+設定中のデータベースに一時テーブルを作成し、終了時に削除する。
+
+使用例:
+    uv run python -m benchmarks.bench_id_insert --rows 200000 --batch 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.models.types import generate_uuid7
+
+VARIANTS = {
+    "char32_uuid4": {
+        "column_type": "CHAR(32)",
+        "new_id": lambda: uuid.uuid4().hex,
+        "bind": lambda hex_id: hex_id,
+    },
+    "binary16_uuid7": {
+        "column_type": "BINARY(16)",
+        "new_id": generate_uuid7,
+        "bind": bytes.fromhex,
+    },
+}
+
+
+def _ddl(table: str, column_type: str) -> str:
+    return (
+        f"CREATE TABLE {table} ("
+        f" id {column_type} NOT NULL PRIMARY KEY,"
+        f" user_id {column_type} NULL,"
+        " timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,"
+        " event_type VARCHAR(50) NOT NULL,"
+        " ip_address VARCHAR(45) NULL,"
+        " KEY idx_user_id (user_id),"
+        " KEY idx_event_type (event_type)"
+        ") ENGINE=InnoDB"
+    )
+
+
+async def run_variant(engine, name: str, rows: int, batch: int, user_pool: int) -> dict:
+    variant = VARIANTS[name]
+    table = f"bench_auth_logs_{name}"
+    bind = variant["bind"]
+    user_ids = [variant["new_id"]() for _ in range(user_pool)]
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await conn.execute(text(_ddl(table, variant["column_type"])))
+
+    insert = text(
+        f"INSERT INTO {table} (id, user_id, event_type, ip_address) "
+        "VALUES (:id, :user_id, :event_type, :ip_address)"
+    )
+    try:
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            params = [
+                {
+                    "id": bind(variant["new_id"]()),
+                    "user_id": bind(user_ids[(offset + i) % user_pool]),
+                    "event_type": "LOGIN_SUCCESS",
+                    "ip_address": "192.0.2.1",
+                }
+                for i in range(min(batch, rows - offset))
+            ]
+            async with engine.begin() as conn:
+                await conn.execute(insert, params)
+        elapsed = time.perf_counter() - started
+
+        async with engine.begin() as conn:
+            await conn.execute(text(f"ANALYZE TABLE {table}"))
+            result = await conn.execute(
+                text(
+                    "SELECT data_length, index_length FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = :table"
+                ),
+                {"table": table},
+            )
+            data_length, index_length = result.one()
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+    return {
+        "variant": name,
+        "rows_per_sec": rows / elapsed,
+        "elapsed_sec": elapsed,
+        "data_mb": data_length / 1024 / 1024,
+        "index_mb": index_length / 1024 / 1024,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    parser.add_argument("--users", type=int, default=2_000, help="user_idの種類数")
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+    try:
+        results = [
+            await run_variant(engine, name, args.rows, args.batch, args.users)
+            for name in VARIANTS
+        ]
+    finally:
+        await engine.dispose()
+
+    print(f"{'variant':<16} {'rows/s':>10} {'elapsed(s)':>11} {'data(MB)':>9} {'index(MB)':>10}")
+    for r in results:
+        print(
+            f"{r['variant']:<16} {r['rows_per_sec']:>10.0f} {r['elapsed_sec']:>11.2f} "
+            f"{r['data_mb']:>9.1f} {r['index_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
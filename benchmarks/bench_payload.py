@@ -0,0 +1,91 @@
+"""認証ログ一覧のレスポンスサイズと生成コストのベンチマーク
+
+1ページ分の認証ログ（合成データ）について、全項目をスキーマで検証して返す場合（変更前）と
+fields で項目を絞ったスキーマで返す場合の、JSON生成時間とサイズ
+（非圧縮 / gzip / brotli）を比較する。
+DB接続は不要（SELECT の列を絞ることによるDB側・転送量の削減は含まない）。
+
+使用例:
+    uv run python -m benchmarks.bench_payload --rows 1000 --fields timestamp,event_type
+"""
+import argparse
+import json
+import random
+import timeit
+import zlib
+from datetime import datetime, timedelta
+from fastapi.encoders import jsonable_encoder
+from app.core.compression import _brotli
+from app.models.types import generate_uuid7
+from app.schemas.auth import (
+    AuthLogListResponse,
+    AuthLogPartialListResponse,
+    AuthLogPartialResponse,
+    AuthLogResponse,
+)
+
+_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; CrOS x86_64 14541.0.0) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/125.0.0.0 Safari/537.36",
+]
+_EVENT_TYPES = ["LOGIN_SUCCESS", "LOGOUT", "LOGIN_FAIL_NOT_REGISTERED"]
+
+
+def _rows(n: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": generate_uuid7(),
+            "user_id": generate_uuid7(),
+            "timestamp": now - timedelta(seconds=i),
+            "event_type": random.choice(_EVENT_TYPES),
+            "ip_address": f"10.0.{i % 256}.{i // 256 % 256}",
+            "user_agent": random.choice(_USER_AGENTS),
+            "error_code": None,
+        }
+        for i in range(n)
+    ]
+
+
+def _full(rows: list) -> bytes:
+    response = AuthLogListResponse(
+        logs=[AuthLogResponse.model_validate(row) for row in rows], total=len(rows)
+    )
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def _projected(rows: list, fields: tuple) -> bytes:
+    response = AuthLogPartialListResponse(
+        logs=[AuthLogPartialResponse(**{name: row[name] for name in fields}) for row in rows],
+        total=len(rows),
+    )
+    return json.dumps(jsonable_encoder(response, exclude_unset=True)).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--fields", default="timestamp,event_type,user_id")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    fields = ("id",) + tuple(f for f in args.fields.split(",") if f and f != "id")
+    brotli = _brotli()
+
+    print(f"{'':<12} {'build ms':>10} {'raw KB':>10} {'gzip KB':>10} {'br KB':>10}")
+    builds = (("full", lambda: _full(rows)), ("projected", lambda: _projected(rows, fields)))
+    for label, build in builds:
+        body = build()
+        ms = timeit.timeit(build, number=args.repeat) / args.repeat * 1000
+        gzip_kb = len(zlib.compress(body, 6)) / 1024
+        br_kb = f"{len(brotli.compress(body, quality=4)) / 1024:10.1f}" if brotli else f"{'-':>10}"
+        print(f"{label:<12} {ms:10.2f} {len(body) / 1024:10.1f} {gzip_kb:10.1f} {br_kb}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""認証済みユーザー表現の生成コストのマイクロベンチマーク
+
+get_current_user が返すオブジェクトについて、ORMのUser（属性計装・状態管理付き、変更前）と
+__slots__ のPrincipal（変更後）の1件あたりの生成時間とメモリ確保量を比較する。DB接続は不要。
+実際のリクエストではこれに加え、キャッシュヒット時のクエリとセッション確保が不要になる。
+
+使用例:
+    uv run python -m benchmarks.bench_principal --iterations 50000
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime
+from app.models.principal import Principal
+from app.models.types import generate_uuid7
+from app.models.user import User
+
+
+def _allocated_bytes(fn, n: int) -> float:
+    """n回生成して保持した場合の1件あたりの確保量"""
+    tracemalloc.start()
+    objects = [fn() for _ in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    row = (
+        generate_uuid7(), "student@example.com", 0, "生徒 太郎", "S0001", "1-A", datetime.utcnow()
+    )
+    fields = ("id", "email", "role", "name", "student_id", "class_name", "updated_at")
+
+    def before():
+        return User(**dict(zip(fields, row)))
+
+    def after():
+        return Principal(*row)
+
+    results = {}
+    for name, fn in (("before (ORM User)", before), ("after (Principal)", after)):
+        fn()
+        elapsed = min(timeit.repeat(fn, number=args.iterations, repeat=5))
+        usec = elapsed / args.iterations * 1_000_000
+        results[name] = (usec, _allocated_bytes(fn, min(args.iterations, 10_000)))
+
+    for name, (usec, size) in results.items():
+        print(f"{name:<20} {usec:8.2f} us/obj {size:10.0f} bytes/obj")
+    (before_us, before_size), (after_us, after_size) = results.values()
+    print(f"{'ratio':<20} {before_us / after_us:8.2f}x {before_size / after_size:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
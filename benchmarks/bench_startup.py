@@ -0,0 +1,119 @@
+"""起動時間のベンチマーク
+
+1. `python -X importtime -c "import main"` の結果をモジュールごとに集計し、
+   インポート時間（子モジュールを含む累積）の大きい順に表示する。
+2. 新しいプロセスでアプリを読み込んで最初のリクエスト（GET /health/live）に
+   応答するまでの時間を計測し、予算（--budget-ms）を超えた場合は終了コード1を返す。
+   DB・Googleへの接続は行わない（ライフスパン処理は含まない）。
+
+使用例:
+    uv run python -m benchmarks.bench_startup --top 20 --budget-ms 1500
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# 子プロセスで実行する計測処理（インタプリタ起動後からの時間を出力）
+_FIRST_REQUEST_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+import httpx
+from main import app
+imported = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/health/live")
+        response.raise_for_status()
+
+asyncio.run(first_request())
+finished = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "total_ms": (finished - started) * 1000,
+}))
+"""
+
+
+def import_profile() -> dict:
+    """main のインポートにかかる時間をトップレベルパッケージ単位・モジュール単位で集計"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    packages = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, name = match.groups()
+        modules[name] = int(cumulative_us)
+        packages[name.split(".")[0]] += int(self_us)
+    return {"modules": modules, "packages": dict(packages)}
+
+
+def first_request_timing(runs: int) -> dict:
+    """プロセス起動から最初の応答までの時間（中央値）"""
+    totals, imports, wall = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _FIRST_REQUEST_SCRIPT],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        wall.append((time.perf_counter() - started) * 1000)
+        timing = json.loads(result.stdout.strip().splitlines()[-1])
+        totals.append(timing["total_ms"])
+        imports.append(timing["import_ms"])
+    return {
+        "import_ms": statistics.median(imports),
+        "first_request_ms": statistics.median(totals),
+        "process_wall_ms": statistics.median(wall),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="表示するモジュール数")
+    parser.add_argument("--runs", type=int, default=5, help="初回応答の計測回数")
+    parser.add_argument(
+        "--budget-ms", type=float, default=1500.0, help="プロセス起動から初回応答までの予算"
+    )
+    args = parser.parse_args()
+
+    profile = import_profile()
+    print("import time by package (self, ms)")
+    for name, us in sorted(profile["packages"].items(), key=lambda x: -x[1])[: args.top]:
+        print(f"  {name:<40} {us / 1000:8.1f}")
+    print("import time by module (cumulative, ms)")
+    for name, us in sorted(profile["modules"].items(), key=lambda x: -x[1])[: args.top]:
+        print(f"  {name:<40} {us / 1000:8.1f}")
+
+    timing = first_request_timing(args.runs)
+    print("time to first request (median)")
+    print(f"  {'import main':<40} {timing['import_ms']:8.1f}")
+    print(f"  {'first response':<40} {timing['first_request_ms']:8.1f}")
+    print(f"  {'process wall (incl. interpreter)':<40} {timing['process_wall_ms']:8.1f}")
+    print(f"  {'budget':<40} {args.budget_ms:8.1f}")
+
+    if timing["process_wall_ms"] > args.budget_ms:
+        print("FAIL: startup budget exceeded")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""get_current_user 経路のクエリ構築コストのマイクロベンチマーク
+
+UserRepository.get_by_id が1回の呼び出しで行うPython側の処理
+（SELECT文の構築 → キャッシュキー生成 → コンパイル済みキャッシュの参照）を、
+呼び出しごとに select() を組み立てる方式（変更前）と
+事前構築済みの文を再利用する方式（変更後）で比較する。DB接続は不要。
+
+使用例:
+    uv run python -m benchmarks.bench_statement_cache --iterations 50000
+"""
+import argparse
+import timeit
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql
+from app.models.types import generate_uuid7
+from app.models.user import User
+from app.repositories.user_repository import _SELECT_BY_ID
+
+
+def _compile_cached(stmt, dialect, compiled_cache: dict) -> None:
+    """Connection.execute 内部と同じキャッシュ付きコンパイル"""
+    stmt._compile_w_cache(
+        dialect,
+        compiled_cache=compiled_cache,
+        column_keys=[],
+        for_executemany=False,
+        schema_translate_map=None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50_000)
+    args = parser.parse_args()
+
+    dialect = mysql.dialect()
+    compiled_cache: dict = {}
+    user_id = generate_uuid7()
+
+    def before():
+        stmt = select(User).where(User.id == user_id)
+        _compile_cached(stmt, dialect, compiled_cache)
+
+    def after():
+        _compile_cached(_SELECT_BY_ID, dialect, compiled_cache)
+
+    # キャッシュを温めてから計測
+    before()
+    after()
+
+    results = {}
+    for name, fn in (("before (select per call)", before), ("after (prebuilt)", after)):
+        elapsed = min(timeit.repeat(fn, number=args.iterations, repeat=5))
+        results[name] = elapsed / args.iterations * 1_000_000
+
+    for name, usec in results.items():
+        print(f"{name:<26} {usec:8.2f} us/call")
+    before_us, after_us = results.values()
+    print(f"{'speedup':<26} {before_us / after_us:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,75 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.api import auth, admin, students, teachers
+from app.core import lifecycle
+from app.core.compression import CompressionMiddleware
+from app.core.tenancy import TenantMiddleware, UnknownTenantError, get_tenant_registry
+from app.api import auth, admin, students, teachers, health, well_known, internal
+from app.services import audit_shipper  # noqa: F401 （起動・終了フックを登録）
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時のウォームアップと終了時のドレイン"""
+    await lifecycle.startup()
+    yield
+    await lifecycle.shutdown()
+
 
 # FastAPIアプリケーション作成
 app = FastAPI(
     title="Authentication API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-# CORS設定
+# テナント（学校）の特定（Hostヘッダー、またはアクセストークンの tid）
+app.add_middleware(TenantMiddleware)
+
+# CORS設定（各テナントのフロントエンドを含む）
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins_list,
+    allow_origins=list(
+        dict.fromkeys(
+            settings.cors_origins_list
+            + [t.frontend_url for t in get_tenant_registry().tenants.values()]
+        )
+    ),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# レスポンス圧縮（一定サイズ以上のみ、SSEは対象外）
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# 処理中リクエストの追跡（グレースフルシャットダウン用、最外側に配置）
+app.add_middleware(lifecycle.InFlightMiddleware)
+
+@app.exception_handler(UnknownTenantError)
+async def unknown_tenant_handler(request: Request, exc: UnknownTenantError):
+    """テナントを特定できないリクエスト"""
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={"detail": "テナントが見つかりません"},
+    )
+
+
 # ルーター登録
 app.include_router(auth.router)
 app.include_router(admin.router)
 app.include_router(students.router)
 app.include_router(teachers.router)
+app.include_router(health.router)
+app.include_router(well_known.router)
+app.include_router(internal.router)
 
 
 @app.get("/")
@@ -33,9 +80,3 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
     }
-
-
-@app.get("/health")
-async def health_check():
-    """ヘルスチェック"""
-    return {"status": "ok"}
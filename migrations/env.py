@@ -4,9 +4,9 @@ from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
-from app.core.config import settings
 from app.core.database import Base
-from app.models import User, AuthLog  # noqa
+from app.core.tenancy import get_tenant_registry
+from app.models import User, AuthLog, UserAgent, AuthLogCounter, PurgeJob, SyncState  # noqa
 
 # Alembic Config object
 config = context.config
@@ -18,8 +18,9 @@ if config.config_file_name is not None:
 # MetaData for autogenerate support
 target_metadata = Base.metadata
 
-# Set sqlalchemy.url from settings
-config.set_main_option("sqlalchemy.url", settings.database_url)
+# 対象テナントのDB（`alembic -x tenant=<id> upgrade head`、省略時は既定テナント）
+tenant = get_tenant_registry().get(context.get_x_argument(as_dictionary=True).get("tenant"))
+config.set_main_option("sqlalchemy.url", tenant.database_url.replace("%", "%%"))
 
 
 def run_migrations_offline() -> None:
@@ -0,0 +1,84 @@
+"""Binary ids (expand): add BINARY(16) shadow columns and backfill online
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19
+
+CHAR(32)の主キーをBINARY(16)へ移行する前半ステップ。
+旧バージョンのアプリケーションが稼働したまま実行できる:
+
+1. シャドーカラム（id_bin / user_id_bin）をINPLACE・LOCK=NONEで追加
+2. 新規・更新行をトリガーでシャドーカラムへ反映
+3. 既存行を小さなバッチ単位でコミットしながらUNHEXでバックフィル
+
+切り替え（主キー差し替え）は 003 で行う。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill(sql: str) -> None:
+    """1バッチずつコミットしながら対象行がなくなるまでUPDATEを繰り返す"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        while True:
+            result = bind.execute(sa.text(sql), {"batch": BACKFILL_BATCH_SIZE})
+            if result.rowcount == 0:
+                break
+
+
+def upgrade() -> None:
+    # シャドーカラム追加（オンラインDDL）
+    op.execute(
+        "ALTER TABLE users ADD COLUMN id_bin BINARY(16) NULL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute(
+        "ALTER TABLE auth_logs ADD COLUMN id_bin BINARY(16) NULL, "
+        "ADD COLUMN user_id_bin BINARY(16) NULL, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+    # 移行期間中に書き込まれる行をシャドーカラムへ反映
+    op.execute(
+        "CREATE TRIGGER trg_users_id_bin_ins BEFORE INSERT ON users "
+        "FOR EACH ROW SET NEW.id_bin = UNHEX(NEW.id)"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_auth_logs_id_bin_ins BEFORE INSERT ON auth_logs "
+        "FOR EACH ROW SET NEW.id_bin = UNHEX(NEW.id), NEW.user_id_bin = UNHEX(NEW.user_id)"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_auth_logs_id_bin_upd BEFORE UPDATE ON auth_logs "
+        "FOR EACH ROW SET NEW.user_id_bin = UNHEX(NEW.user_id)"
+    )
+
+    # 既存行のバックフィル（バッチ単位でコミット）
+    _backfill(
+        "UPDATE users SET id_bin = UNHEX(id) WHERE id_bin IS NULL LIMIT :batch"
+    )
+    _backfill(
+        "UPDATE auth_logs SET id_bin = UNHEX(id), user_id_bin = UNHEX(user_id) "
+        "WHERE id_bin IS NULL LIMIT :batch"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_auth_logs_id_bin_upd")
+    op.execute("DROP TRIGGER IF EXISTS trg_auth_logs_id_bin_ins")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_id_bin_ins")
+    op.execute(
+        "ALTER TABLE auth_logs DROP COLUMN user_id_bin, DROP COLUMN id_bin, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute(
+        "ALTER TABLE users DROP COLUMN id_bin, ALGORITHM=INPLACE, LOCK=NONE"
+    )
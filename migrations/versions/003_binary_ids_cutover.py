@@ -0,0 +1,103 @@
+"""Binary ids (cutover): switch primary and foreign keys to BINARY(16)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19
+
+002 でバックフィル済みのシャドーカラムを主キー・外部キーに昇格させる。
+BINARY(16)のIDを扱う新バージョンのアプリケーションのデプロイと同時に実行する。
+主キーの差し替えはテーブル再構築を伴うが、INPLACE・LOCK=NONEで
+読み書きを止めずに実行される。
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # トリガー撤去前に取りこぼし行を反映
+    op.execute("UPDATE users SET id_bin = UNHEX(id) WHERE id_bin IS NULL")
+    op.execute(
+        "UPDATE auth_logs SET id_bin = UNHEX(id), user_id_bin = UNHEX(user_id) "
+        "WHERE id_bin IS NULL"
+    )
+    # ON DELETE SET NULLはトリガーを起動しないため、ここで同期する
+    op.execute(
+        "UPDATE auth_logs SET user_id_bin = NULL "
+        "WHERE user_id IS NULL AND user_id_bin IS NOT NULL"
+    )
+
+    op.execute("DROP TRIGGER IF EXISTS trg_auth_logs_id_bin_upd")
+    op.execute("DROP TRIGGER IF EXISTS trg_auth_logs_id_bin_ins")
+    op.execute("DROP TRIGGER IF EXISTS trg_users_id_bin_ins")
+
+    op.drop_constraint('auth_logs_ibfk_1', 'auth_logs', type_='foreignkey')
+
+    # users: 主キー差し替え
+    op.execute(
+        "ALTER TABLE users "
+        "MODIFY id_bin BINARY(16) NOT NULL FIRST, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id_bin), "
+        "DROP COLUMN id, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute("ALTER TABLE users RENAME COLUMN id_bin TO id")
+
+    # auth_logs: 主キー・外部キーカラム差し替え
+    op.execute(
+        "ALTER TABLE auth_logs "
+        "MODIFY id_bin BINARY(16) NOT NULL FIRST, "
+        "MODIFY user_id_bin BINARY(16) NULL AFTER id_bin, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id_bin), "
+        "DROP INDEX idx_user_id, DROP COLUMN user_id, DROP COLUMN id, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute(
+        "ALTER TABLE auth_logs RENAME COLUMN id_bin TO id, "
+        "RENAME COLUMN user_id_bin TO user_id"
+    )
+    op.create_index('idx_user_id', 'auth_logs', ['user_id'])
+    op.create_foreign_key(
+        'fk_auth_logs_user_id', 'auth_logs', 'users', ['user_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_auth_logs_user_id', 'auth_logs', type_='foreignkey')
+    op.drop_index('idx_user_id', 'auth_logs')
+
+    op.execute(
+        "ALTER TABLE users ADD COLUMN id_hex CHAR(32) NULL AFTER id"
+    )
+    op.execute("UPDATE users SET id_hex = LOWER(HEX(id))")
+    op.execute(
+        "ALTER TABLE users "
+        "MODIFY id_hex CHAR(32) NOT NULL, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id_hex), DROP COLUMN id"
+    )
+    op.execute("ALTER TABLE users RENAME COLUMN id_hex TO id")
+
+    op.execute(
+        "ALTER TABLE auth_logs ADD COLUMN id_hex CHAR(32) NULL AFTER id, "
+        "ADD COLUMN user_id_hex CHAR(32) NULL AFTER id_hex"
+    )
+    op.execute(
+        "UPDATE auth_logs SET id_hex = LOWER(HEX(id)), user_id_hex = LOWER(HEX(user_id))"
+    )
+    op.execute(
+        "ALTER TABLE auth_logs "
+        "MODIFY id_hex CHAR(32) NOT NULL, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id_hex), DROP COLUMN user_id, DROP COLUMN id"
+    )
+    op.execute(
+        "ALTER TABLE auth_logs RENAME COLUMN id_hex TO id, "
+        "RENAME COLUMN user_id_hex TO user_id"
+    )
+    op.create_index('idx_user_id', 'auth_logs', ['user_id'])
+    op.create_foreign_key(
+        'auth_logs_ibfk_1', 'auth_logs', 'users', ['user_id'], ['id'], ondelete='SET NULL'
+    )
@@ -0,0 +1,96 @@
+"""User-Agent dictionary: intern auth_logs.user_agent into user_agents
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+auth_logs.user_agent（TEXT）を辞書テーブル user_agents への整数参照に置き換える前半ステップ。
+旧バージョンのアプリケーションが稼働したまま実行できる:
+
+1. 辞書テーブルと auth_logs.user_agent_id をINPLACE・LOCK=NONEで追加
+2. 既存行を主キー順のバッチ単位でコミットしながら辞書登録・ID付与
+
+旧バージョンは user_agent に書き込み続けるため、TEXTカラムの削除は 009 で行う。
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill() -> None:
+    """主キー順のバッチ単位で辞書登録とauth_logsのID付与を実行
+
+    バッチごとに辞書登録してから同じ主キー範囲を更新し、範囲は1度だけ処理するため、
+    実行中に旧バージョンが書き込み続けてもループは必ず終わる（取りこぼしは 009 で取り込む）。
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        cursor = bytes(16)
+        while True:
+            upper = bind.execute(
+                sa.text(
+                    "SELECT MAX(id) FROM ("
+                    " SELECT id FROM auth_logs WHERE id > :cursor ORDER BY id LIMIT :batch"
+                    ") t"
+                ),
+                {"cursor": cursor, "batch": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if upper is None:
+                break
+            params = {"lower": cursor, "upper": upper}
+            bind.execute(
+                sa.text(
+                    "INSERT IGNORE INTO user_agents (ua_hash, user_agent) "
+                    "SELECT DISTINCT UNHEX(SHA2(user_agent, 256)), user_agent FROM auth_logs "
+                    "WHERE id > :lower AND id <= :upper "
+                    "AND user_agent IS NOT NULL AND user_agent_id IS NULL"
+                ),
+                params,
+            )
+            bind.execute(
+                sa.text(
+                    "UPDATE auth_logs a JOIN user_agents u "
+                    "ON u.ua_hash = UNHEX(SHA2(a.user_agent, 256)) "
+                    "SET a.user_agent_id = u.id "
+                    "WHERE a.id > :lower AND a.id <= :upper AND a.user_agent_id IS NULL"
+                ),
+                params,
+            )
+            cursor = upper
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_agents',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('ua_hash', mysql.BINARY(32), nullable=False),
+        sa.Column('user_agent', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_ua_hash', 'user_agents', ['ua_hash'], unique=True)
+
+    op.execute(
+        "ALTER TABLE auth_logs ADD COLUMN user_agent_id INT NULL AFTER ip_address, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    _backfill()
+    op.create_foreign_key(
+        'fk_auth_logs_user_agent_id', 'auth_logs', 'user_agents', ['user_agent_id'], ['id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_auth_logs_user_agent_id', 'auth_logs', type_='foreignkey')
+    op.execute(
+        "ALTER TABLE auth_logs DROP COLUMN user_agent_id, ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.drop_index('idx_ua_hash', 'user_agents')
+    op.drop_table('user_agents')
@@ -0,0 +1,33 @@
+"""Auth log counters: per-event_type row counts for approximate totals
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'auth_log_counters',
+        sa.Column('event_type', sa.String(50), nullable=False),
+        sa.Column('row_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('event_type'),
+    )
+    # 既存ログから初期値を集計（以降はアプリケーションが書き込み時に加算）
+    op.execute(
+        "INSERT INTO auth_log_counters (event_type, row_count) "
+        "SELECT event_type, COUNT(*) FROM auth_logs GROUP BY event_type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('auth_log_counters')
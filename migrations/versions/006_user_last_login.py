@@ -0,0 +1,71 @@
+"""Users: denormalized last_login_at and login_count
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+既存の LOGIN_SUCCESS ログからの初期値の集計は、ユーザーを主キー順のバッチに分けて
+バッチごとにコミットする（ログイン時の record_login が長時間行ロックを待たないように）。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _backfill() -> None:
+    """主キー順のユーザーのバッチごとに、そのユーザーのログだけを集計して更新"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        cursor = bytes(16)
+        while True:
+            upper = bind.execute(
+                sa.text(
+                    "SELECT MAX(id) FROM ("
+                    " SELECT id FROM users WHERE id > :cursor ORDER BY id LIMIT :batch"
+                    ") t"
+                ),
+                {"cursor": cursor, "batch": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if upper is None:
+                break
+            # auth_logs は idx_user_id で同じ範囲のみ読む
+            bind.execute(
+                sa.text(
+                    "UPDATE users u JOIN ("
+                    " SELECT user_id, MAX(timestamp) AS last_login_at, COUNT(*) AS login_count"
+                    " FROM auth_logs WHERE event_type = 'LOGIN_SUCCESS'"
+                    " AND user_id > :lower AND user_id <= :upper"
+                    " GROUP BY user_id"
+                    ") s ON s.user_id = u.id "
+                    "SET u.last_login_at = s.last_login_at, u.login_count = s.login_count "
+                    "WHERE u.id > :lower AND u.id <= :upper"
+                ),
+                {"lower": cursor, "upper": upper},
+            )
+            cursor = upper
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE users "
+        "ADD COLUMN last_login_at DATETIME NULL, "
+        "ADD COLUMN login_count INT NOT NULL DEFAULT 0, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.create_index('idx_last_login_at', 'users', ['last_login_at'])
+
+    # 既存の LOGIN_SUCCESS ログから初期値を集計（バッチ単位でコミット）
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index('idx_last_login_at', 'users')
+    op.drop_column('users', 'login_count')
+    op.drop_column('users', 'last_login_at')
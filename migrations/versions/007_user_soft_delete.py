@@ -0,0 +1,47 @@
+"""Users: soft delete and background purge jobs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE users ADD COLUMN deleted_at DATETIME NULL, ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.create_index('idx_deleted_at', 'users', ['deleted_at'])
+
+    op.create_table(
+        'purge_jobs',
+        sa.Column('id', sa.BINARY(16), nullable=False),
+        sa.Column('user_id', sa.BINARY(16), nullable=False),
+        sa.Column('requested_by', sa.BINARY(16), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('logs_processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.String(255), nullable=True),
+        sa.Column('lease_owner', sa.String(64), nullable=True),
+        sa.Column('lease_until', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_purge_jobs_user_id', 'purge_jobs', ['user_id'])
+    op.create_index('idx_purge_jobs_status', 'purge_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_table('purge_jobs')
+    op.drop_index('idx_deleted_at', 'users')
+    op.drop_column('users', 'deleted_at')
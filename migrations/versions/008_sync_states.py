@@ -0,0 +1,29 @@
+"""Sync states for incremental roster sync
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_states',
+        sa.Column('source', sa.String(255), nullable=False),
+        sa.Column('token', sa.String(255), nullable=True),
+        sa.Column('synced_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('source'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_states')
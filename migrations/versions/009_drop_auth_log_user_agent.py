@@ -0,0 +1,76 @@
+"""User-Agent dictionary (contract): drop auth_logs.user_agent
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+004 で辞書化した auth_logs.user_agent（TEXT）を削除する後半ステップ。
+旧バージョンのアプリケーションがすべて停止してから実行する。
+削除の直前に、004 の実行後に旧バージョンが書き込んだ行を辞書に取り込む。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def _backfill() -> None:
+    """主キー順のバッチ単位で未変換の行を辞書に取り込み（004 と同じ手順）"""
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        cursor = bytes(16)
+        while True:
+            upper = bind.execute(
+                sa.text(
+                    "SELECT MAX(id) FROM ("
+                    " SELECT id FROM auth_logs WHERE id > :cursor ORDER BY id LIMIT :batch"
+                    ") t"
+                ),
+                {"cursor": cursor, "batch": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if upper is None:
+                break
+            params = {"lower": cursor, "upper": upper}
+            bind.execute(
+                sa.text(
+                    "INSERT IGNORE INTO user_agents (ua_hash, user_agent) "
+                    "SELECT DISTINCT UNHEX(SHA2(user_agent, 256)), user_agent FROM auth_logs "
+                    "WHERE id > :lower AND id <= :upper "
+                    "AND user_agent IS NOT NULL AND user_agent_id IS NULL"
+                ),
+                params,
+            )
+            bind.execute(
+                sa.text(
+                    "UPDATE auth_logs a JOIN user_agents u "
+                    "ON u.ua_hash = UNHEX(SHA2(a.user_agent, 256)) "
+                    "SET a.user_agent_id = u.id "
+                    "WHERE a.id > :lower AND a.id <= :upper AND a.user_agent_id IS NULL"
+                ),
+                params,
+            )
+            cursor = upper
+
+
+def upgrade() -> None:
+    _backfill()
+    op.execute(
+        "ALTER TABLE auth_logs DROP COLUMN user_agent, ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "ALTER TABLE auth_logs ADD COLUMN user_agent TEXT NULL AFTER ip_address, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    op.execute(
+        "UPDATE auth_logs a JOIN user_agents u ON u.id = a.user_agent_id "
+        "SET a.user_agent = u.user_agent"
+    )
@@ -0,0 +1,41 @@
+"""Auth log counters: split each event_type into shards
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+ログイン処理のトランザクション内で加算するカウンタ行がイベント種別ごとに1行だと、
+同時ログインがその行のロックで直列化する。(event_type, shard) を主キーとし、
+書き込み時はランダムな分割行に加算、読み取り時は合計する。既存の件数は shard=0 に残る。
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE auth_log_counters "
+        "ADD COLUMN shard SMALLINT NOT NULL DEFAULT 0 AFTER event_type, "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (event_type, shard)"
+    )
+
+
+def downgrade() -> None:
+    # 分割行を shard=0 に集約してから主キーを戻す
+    op.execute(
+        "INSERT INTO auth_log_counters (event_type, shard, row_count) "
+        "SELECT * FROM ("
+        " SELECT event_type, 0 AS shard, SUM(row_count) AS total FROM auth_log_counters"
+        " WHERE shard <> 0 GROUP BY event_type"
+        ") t ON DUPLICATE KEY UPDATE row_count = auth_log_counters.row_count + t.total"
+    )
+    op.execute("DELETE FROM auth_log_counters WHERE shard <> 0")
+    op.execute(
+        "ALTER TABLE auth_log_counters DROP PRIMARY KEY, ADD PRIMARY KEY (event_type), "
+        "DROP COLUMN shard"
+    )
@@ -0,0 +1,27 @@
+"""Users: row version for ETags
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+
+updated_at は秒精度のため、同じ秒内の更新でもETagが変わるよう版数を持たせる。
+既存行は1から始まる。
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE users ADD COLUMN version INT NOT NULL DEFAULT 1, "
+        "ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'version')
@@ -0,0 +1 @@
+"""Development Scripts"""
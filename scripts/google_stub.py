@@ -0,0 +1,59 @@
+"""Google OAuthエンドポイントのローカルスタブ（遅延・エラー注入用）
+
+タイムアウト・リトライ・サーキットブレーカーの動作確認に使用する。
+
+起動:
+    STUB_LATENCY_MS=3000 STUB_ERROR_RATE=0.5 \\
+        uv run uvicorn scripts.google_stub:app --port 9000
+
+アプリ側の設定（.env）:
+    GOOGLE_TOKEN_ENDPOINT=http://localhost:9000/token
+    GOOGLE_USERINFO_ENDPOINT=http://localhost:9000/userinfo
+
+環境変数:
+    STUB_LATENCY_MS   応答までの遅延（ミリ秒）
+    STUB_ERROR_RATE   503を返す確率（0.0〜1.0）
+    STUB_EMAIL        userinfoが返すメールアドレス
+"""
+import asyncio
+import os
+import random
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Google OAuth Stub")
+
+
+async def _inject_faults():
+    """設定に応じて遅延・エラーを注入（エラー時はレスポンスを返す）"""
+    latency_ms = float(os.getenv("STUB_LATENCY_MS", "0"))
+    if latency_ms:
+        await asyncio.sleep(latency_ms / 1000)
+    if random.random() < float(os.getenv("STUB_ERROR_RATE", "0")):
+        return JSONResponse({"error": "backend_error"}, status_code=503)
+    return None
+
+
+@app.post("/token")
+async def token():
+    if (error := await _inject_faults()) is not None:
+        return error
+    return {
+        "access_token": "stub-access-token",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "scope": "openid email profile",
+    }
+
+
+@app.get("/userinfo")
+async def userinfo():
+    if (error := await _inject_faults()) is not None:
+        return error
+    email = os.getenv("STUB_EMAIL", "student@example.com")
+    return {
+        "sub": "stub-" + email,
+        "email": email,
+        "email_verified": True,
+        "name": "Stub User",
+    }
@@ -0,0 +1,82 @@
+"""テスト共通設定
+
+必須の設定項目はダミー値で補い、DBはSQLite（インメモリ）を使用する。
+"""
+import os
+
+for _name, _value in {
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_HOST": "localhost",
+    "DB_NAME": "test",
+    "JWT_SECRET": "test-secret",
+    "GOOGLE_CLIENT_ID": "test-client-id",
+    "GOOGLE_CLIENT_SECRET": "test-client-secret",
+    "GOOGLE_REDIRECT_URI": "http://localhost:8000/auth/google/callback",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401  全テーブルをメタデータに登録
+from app.core.database import Base  # noqa: E402
+from app.repositories.auth_log_repository import AuthLogRepository  # noqa: E402
+from app.repositories.user_agent_repository import UserAgentRepository  # noqa: E402
+from app.services import auth_service  # noqa: E402
+
+
+@pytest.fixture
+async def sessionmaker():
+    """テーブル作成済みのSQLite（テスト内の全セッションで同じDBを共有）"""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(sessionmaker):
+    async with sessionmaker() as session:
+        yield session
+
+
+@pytest.fixture
+def google(monkeypatch):
+    """Googleとのやり取りを差し替え
+
+    userinfo は google["email"] のメールアドレスを返し、
+    トークン取得回数を google["token_requests"] に数える。
+    認証ログの集計カウンタとUser-Agent辞書（MySQL専用の文）は更新しない。
+    """
+    state = {"email": None, "token_requests": 0}
+
+    class FakeOAuthClient:
+        def register_compliance_hook(self, name, hook):
+            pass
+
+        async def fetch_token(self, url, **kwargs):
+            state["token_requests"] += 1
+            return {"access_token": "token"}
+
+    class UserInfo:
+        def json(self):
+            email = state["email"]
+            return {"email": email, "sub": "sub-" + email, "email_verified": True}
+
+    async def get_userinfo(oauth_client):
+        return UserInfo()
+
+    async def no_counter(self, event_type, n=1):
+        pass
+
+    monkeypatch.setattr(auth_service, "create_google_oauth_client", FakeOAuthClient)
+    monkeypatch.setattr(auth_service.AuthService, "_get_userinfo", staticmethod(get_userinfo))
+    async def no_user_agent_id(self, user_agent):
+        return None
+
+    monkeypatch.setattr(AuthLogRepository, "_increment_counter", no_counter)
+    monkeypatch.setattr(UserAgentRepository, "get_or_create_id", no_user_agent_id)
+    return state
@@ -0,0 +1,101 @@
+"""一覧APIの fields 指定（列の絞り込み）のテスト"""
+from datetime import datetime
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.api.deps import get_current_admin
+from app.core.database import get_db
+from app.models.auth_log import AuthLog
+from app.models.principal import Principal
+from app.models.types import generate_uuid7
+from app.models.user_agent import UserAgent
+from app.repositories.auth_log_repository import AuthLogRepository
+from main import app
+
+
+@pytest.fixture
+async def seeded(session):
+    agent = UserAgent(ua_hash=b"\0" * 32, user_agent="Mozilla/5.0")
+    session.add(agent)
+    await session.flush()
+    session.add(
+        AuthLog(
+            id=generate_uuid7(),
+            event_type="LOGIN_SUCCESS",
+            timestamp=datetime(2026, 10, 1, 9, 0, 0),
+            ip_address="10.0.0.1",
+            user_agent_id=agent.id,
+        )
+    )
+    await session.commit()
+    return session
+
+
+@pytest.fixture
+def statements(session):
+    """実行されたSQL文"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+async def test_projection_selects_only_requested_columns(seeded, statements):
+    page = await AuthLogRepository(seeded).get_page(fields=("id", "timestamp", "event_type"))
+
+    assert list(page.items[0]) == ["id", "timestamp", "event_type"]
+    assert page.total == 1
+    sql = statements[-1]
+    select_list = sql[: sql.index("FROM")]
+    assert "event_type" in select_list
+    assert "ip_address" not in select_list
+    assert "error_code" not in select_list
+    assert "user_agents" not in sql
+
+
+async def test_projection_joins_user_agents_only_when_requested(seeded, statements):
+    page = await AuthLogRepository(seeded).get_page(fields=("id", "user_agent"))
+
+    assert page.items[0]["user_agent"] == "Mozilla/5.0"
+    assert "JOIN user_agents" in statements[-1]
+
+
+async def test_projected_response_omits_unrequested_keys(seeded):
+    async def override_db():
+        yield seeded
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_admin] = lambda: Principal(
+        generate_uuid7(), "admin@example.jp", 2, None, None, None, None
+    )
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            projected = await client.get("/admin/auth-logs", params={"fields": "event_type"})
+            full = await client.get("/admin/auth-logs")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert projected.status_code == 200
+    assert list(projected.json()["logs"][0]) == ["id", "event_type"]
+    assert full.status_code == 200
+    assert full.json()["logs"][0]["ip_address"] == "10.0.0.1"
+    assert full.json()["logs"][0]["user_agent"] == "Mozilla/5.0"
+
+
+def test_openapi_declares_projected_shapes():
+    paths = app.openapi()["paths"]
+    for path, full, partial in (
+        ("/admin/users", "UserListResponse", "UserPartialListResponse"),
+        ("/admin/auth-logs", "AuthLogListResponse", "AuthLogPartialListResponse"),
+    ):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        refs = {option["$ref"].rsplit("/", 1)[-1] for option in schema["anyOf"]}
+        assert refs == {full, partial}
@@ -0,0 +1,161 @@
+"""監査スプール（AuditSpool）と送出処理（AuditShipper）のテスト
+
+DBはSQLiteのため、MySQL専用の集計カウンタ更新（ON DUPLICATE KEY UPDATE）は無効化する。
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from app.core.audit_spool import DEAD_LETTER_FILE, AuditSpool
+from app.core.config import settings
+from app.core.tenancy import get_tenant_registry
+from app.models.auth_log import AuthLog
+from app.models.types import generate_uuid7
+from app.models.user import User
+from app.repositories.auth_log_repository import AuthLogRepository
+from app.services import audit_shipper as shipper_module
+from app.services.audit_shipper import AuditShipper
+
+
+def _event(user_id=None, tenant_id=None, event_type="LOGIN_SUCCESS"):
+    return {
+        "tenant_id": tenant_id or get_tenant_registry().default.id,
+        "id": generate_uuid7(),
+        "user_id": user_id,
+        "event_type": event_type,
+        "ip_address": "10.0.0.1",
+        "user_agent": None,
+        "error_code": None,
+        "timestamp": datetime.utcnow().replace(microsecond=0).isoformat(),
+    }
+
+
+@pytest.fixture
+async def db(sessionmaker, monkeypatch):
+    """送出先をテスト用DBに差し替え（外部キー制約を有効化）"""
+    async with sessionmaker() as session:
+        await session.execute(text("PRAGMA foreign_keys=ON"))
+        await session.commit()
+
+    async def no_counter(self, event_type, n=1):
+        pass
+
+    monkeypatch.setattr(AuthLogRepository, "_increment_counter", no_counter)
+    monkeypatch.setattr(shipper_module, "open_session", sessionmaker)
+    return sessionmaker
+
+
+async def _log_ids(sessionmaker):
+    async with sessionmaker() as session:
+        result = await session.execute(select(AuthLog.id, AuthLog.user_id))
+        return dict(result.all())
+
+
+def _spool(path):
+    return AuditSpool(str(path), fsync_interval_ms=1, max_segment_bytes=600)
+
+
+async def test_group_commit_rotates_segments(tmp_path):
+    spool = _spool(tmp_path)
+    spool.open()
+    writes = []
+    write_and_sync = spool._write_and_sync
+    spool._write_and_sync = lambda data: (writes.append(data), write_and_sync(data))
+    events = [_event() for _ in range(10)]
+
+    # 同じ書き込み間隔内の追記は1回の書き込み・fsyncにまとめられる
+    await asyncio.gather(*(spool.append(event) for event in events))
+    assert len(writes) == 1
+    # 上限サイズを超えたセグメントには追記しない
+    last = _event()
+    await spool.append(last)
+    await spool.close()
+
+    assert len(spool.slot.segments()) == 2
+    read, _, _ = spool.slot.read_batch(100)
+    assert [event["id"] for event in read] == [event["id"] for event in events + [last]]
+    spool.slot.unlock()
+
+
+async def test_replay_after_crash_does_not_duplicate(tmp_path, db, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_SPOOL_SHIP_BATCH_SIZE", 4)
+    spool = _spool(tmp_path)
+    spool.open()
+    events = [_event() for _ in range(10)]
+    for event in events:
+        await spool.append(event)
+    await spool.close()
+
+    # DBへのコミット後、送出済み位置を記録する前にプロセスが停止
+    def crash(segment, position):
+        raise RuntimeError("crash")
+
+    monkeypatch.setattr(spool.slot, "write_offset", crash)
+    with pytest.raises(RuntimeError):
+        await AuditShipper().ship_slot(spool.slot)
+    spool.slot.unlock()
+    assert 0 < len(await _log_ids(db)) < len(events)
+
+    reopened = _spool(tmp_path)
+    reopened.open()
+    assert reopened.slot.path == spool.slot.path
+    shipped = await AuditShipper().ship_slot(reopened.slot)
+    await reopened.close()
+
+    assert shipped == len(events)
+    assert set(await _log_ids(db)) == {event["id"] for event in events}
+    assert not reopened.slot.has_pending()
+    assert reopened.slot.read_offset()[0] is not None
+    reopened.slot.unlock()
+
+
+async def test_deleted_user_is_nulled_on_replay(db):
+    async with db() as session:
+        user = User(email="alive@example.jp", role=0)
+        session.add(user)
+        await session.commit()
+    alive, deleted = _event(user_id=user.id), _event(user_id=generate_uuid7())
+
+    async with db() as session:
+        inserted = await AuthLogRepository(session).insert_spooled([alive, deleted])
+    async with db() as session:
+        replayed = await AuthLogRepository(session).insert_spooled([alive, deleted])
+
+    assert (inserted, replayed) == (2, 0)
+    assert await _log_ids(db) == {alive["id"]: user.id, deleted["id"]: None}
+
+
+async def test_unknown_tenant_is_dead_lettered(tmp_path, db):
+    spool = _spool(tmp_path)
+    spool.open()
+    known, unknown = _event(), _event(tenant_id="closed-school")
+    await spool.append(unknown)
+    await spool.append(known)
+    await spool.close()
+
+    shipped = await AuditShipper().ship_slot(spool.slot)
+
+    assert shipped == 2
+    assert set(await _log_ids(db)) == {known["id"]}
+    lines = (spool.slot.path / DEAD_LETTER_FILE).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"reason": "unknown_tenant", "event": unknown}
+    ]
+    assert not spool.slot.has_pending()
+    spool.slot.unlock()
+
+
+async def test_close_flushes_pending_appends(tmp_path):
+    spool = _spool(tmp_path)
+    spool.open()
+    pending = asyncio.ensure_future(spool.append(_event()))
+    await asyncio.sleep(0)
+
+    await spool.close()
+
+    await pending
+    assert spool.slot.has_pending()
+    spool.slot.unlock()
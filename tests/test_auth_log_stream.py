@@ -0,0 +1,65 @@
+"""認証ログのライブ配信（取りこぼし分のDB読み直し）のテスト"""
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.core.tenancy import get_tenant_registry
+from app.models.auth_log import AuthLog
+from app.models.types import generate_uuid7, uuid7_lower_bound
+from app.repositories.auth_log_repository import AuthLogRepository
+from app.services import auth_log_stream as stream_module
+
+
+@pytest.fixture
+async def logs(session):
+    """UUIDv4のIDを持つ旧形式のログ（大半は新しいUUIDv7より大きい）と直近のログ"""
+    now = datetime.utcnow().replace(microsecond=0)
+    legacy = [
+        AuthLog(id=uuid.uuid4().hex, event_type="LOGIN_SUCCESS", timestamp=now - timedelta(days=30))
+        for _ in range(200)
+    ]
+    recent = [
+        AuthLog(id=log_id, event_type="LOGIN_SUCCESS", timestamp=now + timedelta(seconds=i))
+        for i, log_id in enumerate(sorted(generate_uuid7() for _ in range(3)))
+    ]
+    session.add_all(legacy + recent)
+    await session.commit()
+    return legacy, recent
+
+
+async def test_get_since_skips_legacy_uuid4_rows(session, logs):
+    legacy, recent = logs
+    after = uuid7_lower_bound(time.time_ns() // 1_000_000 - 5000)
+    # IDの範囲だけでは旧形式の行の大半が対象になる
+    assert sum(log.id > after for log in legacy) > len(legacy) // 2
+
+    since = datetime.utcnow() - timedelta(seconds=5)
+    found = await AuthLogRepository(session).get_since(after, since)
+
+    assert [log.id for log in found] == [log.id for log in recent]
+
+
+async def test_catch_up_resumes_after_last_event_id(sessionmaker, logs, monkeypatch):
+    _, recent = logs
+    monkeypatch.setattr(stream_module, "open_session", sessionmaker)
+    monkeypatch.setattr(settings, "STREAM_RESUME_MAX_EVENTS", 50)
+
+    events = await stream_module.AuthLogStream()._catch_up(
+        get_tenant_registry().default, recent[0].id, None, None
+    )
+
+    assert events is not None
+    assert [event["id"] for event in events] == [log.id for log in recent[1:]]
+
+
+async def test_catch_up_unknown_last_event_id_requests_reset(sessionmaker, logs, monkeypatch):
+    monkeypatch.setattr(stream_module, "open_session", sessionmaker)
+
+    events = await stream_module.AuthLogStream()._catch_up(
+        get_tenant_registry().default, generate_uuid7(), None, None
+    )
+
+    assert events is None
@@ -0,0 +1,39 @@
+"""テナントごとのエンジン設定のテスト"""
+from sqlalchemy import event
+
+from app.core.database import _use_utc_session, get_engine
+from app.core.tenancy import get_tenant_registry
+
+
+class _RecordingCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def execute(self, sql):
+        self.statements.append(sql)
+
+    def close(self):
+        pass
+
+
+class _RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return _RecordingCursor(self.statements)
+
+
+def test_mysql_engine_pins_session_time_zone_to_utc():
+    engine = get_engine(get_tenant_registry().default)
+
+    assert engine.dialect.name == "mysql"
+    assert event.contains(engine.sync_engine, "connect", _use_utc_session)
+
+
+def test_utc_session_sets_time_zone():
+    connection = _RecordingConnection()
+
+    _use_utc_session(connection, None)
+
+    assert connection.statements == ["SET time_zone = '+00:00'"]
@@ -0,0 +1,179 @@
+"""名簿の差分同期（FileDirectorySource → DirectorySyncService）のテスト
+
+リポジトリはMySQLの挙動（メールアドレスの照合は大文字・小文字を区別しない、
+一意キーが重複したINSERTは既存行の更新になる）を模したメモリ上の実装に差し替える。
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models.types import generate_uuid7
+from app.models.user import User
+from app.services.directory_source import FileDirectorySource
+from app.services.directory_sync import DirectorySyncService
+
+
+class FakeUserRepository:
+    def __init__(self):
+        self.users = {}
+        self.deleted_ids = []
+
+    def add(self, email, role=0, google_sub=None, **values):
+        user = User(id=generate_uuid7(), email=email, role=role, google_sub=google_sub, **values)
+        self.users[user.id] = user
+        return user
+
+    def by_email(self, email):
+        return next(
+            (u for u in self.users.values() if u.email.casefold() == email.casefold()), None
+        )
+
+    async def get_by_emails_or_google_subs(self, emails, google_subs):
+        emails = {email.casefold() for email in emails}
+        return [
+            u
+            for u in self.users.values()
+            if u.email.casefold() in emails or (u.google_sub and u.google_sub in google_subs)
+        ]
+
+    async def upsert_many(self, rows):
+        for row in rows:
+            # INSERT ... ON DUPLICATE KEY UPDATE: 主キーまたはメールアドレスの一意キーで既存行を更新
+            user = self.users.get(row["id"]) or self.by_email(row["email"])
+            if user is None:
+                user = User(id=row["id"], google_sub=None)
+                self.users[user.id] = user
+            google_sub = row["google_sub"] or user.google_sub
+            for name, value in row.items():
+                if name != "id":
+                    setattr(user, name, value)
+            user.google_sub = google_sub
+
+    async def soft_delete(self, user_ids, requested_by=None):
+        for user_id in user_ids:
+            self.users[user_id].deleted_at = datetime.utcnow()
+        self.deleted_ids.extend(user_ids)
+        return []
+
+
+class FakeSyncStateRepository:
+    def __init__(self):
+        self.tokens = {}
+
+    async def get_token(self, source):
+        return self.tokens.get(source)
+
+    async def save_token(self, source, token):
+        self.tokens[source] = token
+
+
+@pytest.fixture
+def service():
+    service = DirectorySyncService(db=None)
+    service.user_repo = FakeUserRepository()
+    service.sync_state_repo = FakeSyncStateRepository()
+    return service
+
+
+@pytest.fixture
+def roster(tmp_path):
+    path = tmp_path / "roster.jsonl"
+    path.write_text("")
+
+    def append(*records):
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        return FileDirectorySource(str(path))
+
+    return append
+
+
+async def test_first_sync_creates_users_and_saves_token(service, roster):
+    source = roster(
+        {"seq": 1, "email": "taro@example.jp", "class_name": "1-A"},
+        {"seq": 2, "email": "hanako@example.jp", "role": 1},
+    )
+
+    report = await service.sync(source)
+
+    assert (report.full, report.created, report.token_after) == (True, 2, "2")
+    assert service.user_repo.by_email("taro@example.jp").class_name == "1-A"
+    assert service.sync_state_repo.tokens[source.name] == "2"
+
+
+async def test_delta_sync_updates_only_changed_fields(service, roster):
+    await service.sync(roster({"seq": 1, "email": "taro@example.jp", "class_name": "1-A"}))
+
+    report = await service.sync(roster({"seq": 2, "email": "taro@example.jp", "class_name": "2-A"}))
+
+    assert (report.full, report.token_before, report.updated, report.created) == (
+        False, "1", 1, 0
+    )
+    assert report.changes[0].fields == ("class_name",)
+    assert service.user_repo.by_email("taro@example.jp").class_name == "2-A"
+
+
+async def test_delta_sync_deletes_users(service, roster):
+    await service.sync(roster({"seq": 1, "email": "taro@example.jp"}))
+    user = service.user_repo.by_email("taro@example.jp")
+
+    report = await service.sync(roster({"seq": 2, "email": "taro@example.jp", "deleted": True}))
+
+    assert report.deleted == 1
+    assert service.user_repo.deleted_ids == [user.id]
+
+
+async def test_email_case_difference_updates_existing_user(service, roster):
+    existing = service.user_repo.add("Taro@Example.jp", class_name="1-A")
+
+    report = await service.sync(
+        roster({"seq": 1, "email": "taro@EXAMPLE.jp", "class_name": "2-A"})
+    )
+
+    assert (report.created, report.updated) == (0, 1)
+    assert report.changes[0].fields == ("class_name",)
+    assert list(service.user_repo.users) == [existing.id]
+    assert (existing.email, existing.class_name) == ("taro@example.jp", "2-A")
+
+
+async def test_email_case_difference_alone_is_unchanged(service, roster):
+    service.user_repo.add("Taro@Example.jp")
+
+    report = await service.sync(roster({"seq": 1, "email": "taro@example.jp"}))
+
+    assert (report.unchanged, report.updated, report.created) == (1, 0, 0)
+
+
+async def test_email_taken_by_another_user_is_skipped(service, roster):
+    service.user_repo.add("taro@example.jp", google_sub="sub-taro")
+    hanako = service.user_repo.add("hanako@example.jp", google_sub="sub-hanako")
+
+    report = await service.sync(
+        roster({"seq": 1, "email": "TARO@example.jp", "google_sub": "sub-hanako"})
+    )
+
+    assert (report.skipped, report.changes[0].reason) == (1, "email_conflict")
+    assert hanako.email == "hanako@example.jp"
+
+
+async def test_replayed_token_applies_nothing(service, roster):
+    source = roster({"seq": 1, "email": "taro@example.jp", "class_name": "1-A"})
+    await service.sync(source)
+
+    report = await service.sync(source)
+
+    assert (report.full, report.token_before, report.token_after) == (False, "1", "1")
+    assert (report.created, report.updated, report.unchanged) == (0, 0, 0)
+
+
+async def test_expired_token_falls_back_to_full_sync(service, roster):
+    source = roster({"seq": 1, "email": "taro@example.jp"})
+    await service.sync(source)
+    service.sync_state_repo.tokens[source.name] = "99"
+
+    report = await service.sync(source)
+
+    assert (report.full, report.token_after) == (True, "1")
+    assert (report.created, report.unchanged) == (0, 1)
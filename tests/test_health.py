@@ -0,0 +1,69 @@
+"""依存先チェック（HealthMonitor）のテスト"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http
+from app.core.health import HealthMonitor, check_oauth
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self):
+        self.closed = False
+
+    async def __aiter__(self):
+        yield b"{}"
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def google(monkeypatch):
+    """共有トランスポートを差し替え、返したレスポンスを記録する"""
+    streams = []
+    status = {"code": 200}
+
+    def handler(request):
+        stream = _TrackedStream()
+        streams.append(stream)
+        return httpx.Response(status["code"], stream=stream)
+
+    monkeypatch.setattr(http, "_transport", httpx.MockTransport(handler))
+    return streams, status
+
+
+async def test_check_oauth_releases_every_response(google):
+    streams, status = google
+
+    for _ in range(3):
+        assert await check_oauth() is None
+    status["code"] = 503
+    with pytest.raises(RuntimeError, match="status=503"):
+        await check_oauth()
+
+    assert len(streams) == 4
+    assert all(stream.closed for stream in streams)
+
+
+async def test_stop_waits_for_running_check():
+    started = asyncio.Event()
+    finished = []
+
+    async def slow_check():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            finished.append(True)
+
+    monitor = HealthMonitor()
+    monitor.checks = [("slow", slow_check, True)]
+    await monitor.start()
+    await started.wait()
+
+    await monitor.stop()
+
+    assert finished == [True]
+    assert monitor._task is None
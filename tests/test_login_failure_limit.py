@@ -0,0 +1,79 @@
+"""未登録メールアドレスのログイン失敗制限と否定キャッシュのテスト"""
+from sqlalchemy import func, select
+
+from app.core.rate_limit import login_email_failures, tenant_limiter_key
+from app.models.auth_log import AuthLog
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from app.services.auth_service import AuthService
+
+
+async def test_negative_cache_hit_is_reported(session):
+    repo = UserRepository(session)
+
+    assert await repo.get_by_email_for_login("cache@example.jp") == (None, False)
+    assert await repo.get_by_email_for_login("cache@example.jp") == (None, True)
+
+
+async def test_create_clears_failures_and_negative_cache(session):
+    repo = UserRepository(session)
+    email = "late@example.jp"
+    key = tenant_limiter_key(email)
+    await repo.get_by_email_for_login(email)
+    for _ in range(login_email_failures.limit):
+        await login_email_failures.hit(key)
+    assert await login_email_failures.is_limited(key)
+
+    user = await repo.create(User(email=email, role=0))
+
+    assert not await login_email_failures.is_limited(key)
+    assert await repo.get_by_email_for_login(email) == (user, False)
+
+
+async def test_update_clears_failures(session):
+    repo = UserRepository(session)
+    user = await repo.create(User(email="old@example.jp", role=0))
+    key = tenant_limiter_key("new@example.jp")
+    for _ in range(login_email_failures.limit):
+        await login_email_failures.hit(key)
+
+    user.email = "new@example.jp"
+    await repo.update(user)
+
+    assert not await login_email_failures.is_limited(key)
+
+
+async def _not_registered_logs(session):
+    result = await session.execute(
+        select(func.count()).where(AuthLog.event_type == "LOGIN_FAIL_NOT_REGISTERED")
+    )
+    return result.scalar_one()
+
+
+async def test_cached_misses_count_toward_limit_without_logging(session, google):
+    google["email"] = "bot@example.jp"
+    service = AuthService(session)
+
+    results = [
+        (await service.login_with_google(f"code-{i}", "verifier")).error_code
+        for i in range(login_email_failures.limit + 1)
+    ]
+
+    # 否定キャッシュで判定した失敗も数え、上限に達した以降はDBに問い合わせない
+    assert results == ["USER_NOT_REGISTERED"] * login_email_failures.limit + ["RATE_LIMITED"]
+    # 記録するのはDBで未登録と確認した初回のみ
+    assert await _not_registered_logs(session) == 1
+
+
+async def test_registration_lifts_the_limit(session, google):
+    google["email"] = "new-student@example.jp"
+    service = AuthService(session)
+    for i in range(login_email_failures.limit):
+        await service.login_with_google(f"code-{i}", "verifier")
+    assert (await service.login_with_google("code-x", "verifier")).error_code == "RATE_LIMITED"
+
+    await UserRepository(session).create(User(email="new-student@example.jp", role=0))
+    result = await service.login_with_google("code-y", "verifier")
+
+    assert result.error_code is None
+    assert result.access_token
@@ -0,0 +1,76 @@
+"""Googleコールバック（state Cookieの照合と再送）のテスト"""
+import httpx
+import pytest
+
+from app.core.database import get_db
+from app.core.oauth_state import OAUTH_STATE_COOKIE, encode_oauth_state, new_oauth_state
+from app.core.tenancy import get_tenant_registry
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+from main import app
+
+
+@pytest.fixture
+async def client(session, google):
+    async def override_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_db
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+async def _callback(client, oauth_state, code="code-1"):
+    return await client.get(
+        "/auth/google/callback",
+        params={"code": code, "state": oauth_state.state},
+        headers={"Cookie": f"{OAUTH_STATE_COOKIE}={encode_oauth_state(oauth_state)}"},
+    )
+
+
+async def test_repeated_callback_returns_the_same_success(session, google, client):
+    google["email"] = "student@example.jp"
+    await UserRepository(session).create(User(email="student@example.jp", role=0))
+    tenant = get_tenant_registry().default
+    oauth_state = new_oauth_state(tenant.id, "verifier")
+
+    # 再読み込み・二重リダイレクトは同じ state Cookie と認可コードで届く
+    first = await _callback(client, oauth_state)
+    second = await _callback(client, oauth_state)
+
+    for response in (first, second):
+        assert response.status_code == 303
+        assert response.headers["location"] == f"{tenant.frontend_url}/students"
+        assert "access_token" in response.cookies
+    # state Cookieは削除しない
+    assert OAUTH_STATE_COOKIE not in first.headers.get("set-cookie", "")
+    assert google["token_requests"] == 1
+
+
+async def test_cookie_from_another_tenant_is_rejected(google, client):
+    tenant = get_tenant_registry().default
+    oauth_state = new_oauth_state("other-school", "verifier")
+
+    response = await _callback(client, oauth_state)
+
+    assert response.status_code == 303
+    assert response.headers["location"] == f"{tenant.frontend_url}/login?error=auth_failed"
+    assert google["token_requests"] == 0
+
+
+async def test_mismatched_state_is_rejected(google, client):
+    tenant = get_tenant_registry().default
+    oauth_state = new_oauth_state(tenant.id, "verifier")
+
+    response = await client.get(
+        "/auth/google/callback",
+        params={"code": "code-1", "state": "another-attempt"},
+        headers={"Cookie": f"{OAUTH_STATE_COOKIE}={encode_oauth_state(oauth_state)}"},
+    )
+
+    assert response.headers["location"] == f"{tenant.frontend_url}/login?error=auth_failed"
+    assert google["token_requests"] == 0
@@ -0,0 +1,81 @@
+"""ログイン試行の状態Cookie（署名・期限・テナント・遷移先）のテスト"""
+import time
+
+import pytest
+
+from app.core.oauth_state import (
+    _b64decode,
+    _b64encode,
+    decode_oauth_state,
+    encode_oauth_state,
+    new_oauth_state,
+    safe_return_path,
+)
+
+
+def _cookie():
+    oauth_state = new_oauth_state("default", "verifier", return_to="/admin/users")
+    return oauth_state, encode_oauth_state(oauth_state)
+
+
+def test_round_trip():
+    oauth_state, cookie = _cookie()
+
+    assert decode_oauth_state(cookie) == oauth_state
+
+
+def test_tampered_payload_is_rejected():
+    _, cookie = _cookie()
+    payload, _, signature = cookie.partition(".")
+    forged = _b64decode(payload).replace(b'"t":"default"', b'"t":"other"')
+
+    assert forged != _b64decode(payload)
+    assert decode_oauth_state(f"{_b64encode(forged)}.{signature}") is None
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "no-signature", "a.b", ".", "not base64!.sig"],
+)
+def test_malformed_cookie_is_rejected(value):
+    assert decode_oauth_state(value) is None
+
+
+def test_tampered_signature_is_rejected():
+    _, cookie = _cookie()
+    payload, _, signature = cookie.partition(".")
+    flipped = ("A" if signature[0] != "A" else "B") + signature[1:]
+
+    assert decode_oauth_state(f"{payload}.{flipped}") is None
+
+
+def test_expired_cookie_is_rejected(monkeypatch):
+    oauth_state, cookie = _cookie()
+
+    monkeypatch.setattr(time, "time", lambda: oauth_state.expires_at)
+
+    assert decode_oauth_state(cookie) is None
+
+
+@pytest.mark.parametrize("path", ["/admin/users", "/students?tab=1", "/"])
+def test_relative_paths_are_allowed(path):
+    assert safe_return_path(path) == path
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        None,
+        "",
+        "//evil.com",
+        "/\\evil.com",
+        "https://evil.com/admin",
+        "http:/evil.com",
+        "javascript:alert(1)",
+        "admin/users",
+        "/admin\r\nSet-Cookie: x=1",
+        "/" + "a" * 512,
+    ],
+)
+def test_unsafe_return_paths_are_rejected(path):
+    assert safe_return_path(path) is None
@@ -0,0 +1,43 @@
+"""ユーザーのETag（id と版数）のテスト"""
+from app.api.etag import user_etag
+from app.models.user import User
+from app.repositories.user_repository import UserRepository
+
+
+async def test_version_changes_on_every_update(session):
+    repo = UserRepository(session)
+    user = await repo.create(User(email="etag@example.jp", role=0))
+    assert user.version == 1
+    before = user_etag(user.id, user.version)
+
+    # 同じ秒内の連続した更新でもETagが変わる
+    user.class_name = "1-A"
+    await repo.update(user)
+    first = user_etag(user.id, user.version)
+    user.class_name = "1-B"
+    await repo.update(user)
+
+    assert user.version == 3
+    assert len({before, first, user_etag(user.id, user.version)}) == 3
+
+
+async def test_record_login_bumps_version(session):
+    repo = UserRepository(session)
+    user = await repo.create(User(email="login@example.jp", role=0))
+
+    await repo.record_login(user)
+    await session.commit()
+    await session.refresh(user)
+
+    assert (user.login_count, user.version) == (1, 2)
+
+
+async def test_principal_carries_version(session):
+    repo = UserRepository(session)
+    user = await repo.create(User(email="principal@example.jp", role=0))
+    user.name = "太郎"
+    await repo.update(user)
+
+    principal = await repo.get_principal(user.id)
+
+    assert principal.version == 2